@@ -2,19 +2,30 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
 from alembic import context
 import os
+import re
 import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
-from core.database import Base
-from models import tracing
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.core.database import Base
+from app.models import tracing, rollups
 
 config = context.config
 fileConfig(config.config_file_name)
+config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL", config.get_main_option("sqlalchemy.url")))
 target_metadata = Base.metadata
 
+# Partitions are created and dropped at runtime by app.services.partitions
+PARTITION_TABLE = re.compile(r"_(p\d{8}|default)$")
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and reflected and compare_to is None and PARTITION_TABLE.search(name):
+        return False
+    return True
+
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=target_metadata, literal_binds=True, compare_type=True
+        url=url, target_metadata=target_metadata, literal_binds=True, compare_type=True,
+        include_object=include_object,
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -27,7 +38,8 @@ def run_migrations_online():
     )
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata, compare_type=True
+            connection=connection, target_metadata=target_metadata, compare_type=True,
+            include_object=include_object,
         )
         with context.begin_transaction():
             context.run_migrations()
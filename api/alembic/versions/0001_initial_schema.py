@@ -0,0 +1,82 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.create_table(
+        'prompts',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_query', sa.String(), nullable=False),
+        sa.Column('system_prompt', sa.String(), nullable=True),
+        sa.Column('final_prompt', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_prompts_id', 'prompts', ['id'])
+    op.create_table(
+        'embeddings',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('vector', Vector(1536), nullable=False),
+        sa.Column('prompt_id', sa.Integer(), sa.ForeignKey('prompts.id'), nullable=False),
+        sa.Column('retrieval_candidates', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_embeddings_id', 'embeddings', ['id'])
+    op.create_table(
+        'retrievals',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('prompt_id', sa.Integer(), sa.ForeignKey('prompts.id'), nullable=False),
+        sa.Column('document_id', sa.String(), nullable=False),
+        sa.Column('similarity_score', sa.Float(), nullable=False),
+        sa.Column('metadata', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_retrievals_id', 'retrievals', ['id'])
+    op.create_table(
+        'responses',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('prompt_id', sa.Integer(), sa.ForeignKey('prompts.id'), nullable=False),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.Column('token_stream', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_responses_id', 'responses', ['id'])
+    op.create_table(
+        'hallucination_checks',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('response_id', sa.Integer(), sa.ForeignKey('responses.id'), nullable=False),
+        sa.Column('groundedness_score', sa.Float(), nullable=False),
+        sa.Column('unsupported_sentences', sa.JSON(), nullable=True),
+        sa.Column('entailment_results', sa.JSON(), nullable=True),
+        sa.Column('checked_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_hallucination_checks_id', 'hallucination_checks', ['id'])
+    op.create_table(
+        'telemetry',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('prompt_id', sa.Integer(), sa.ForeignKey('prompts.id'), nullable=False),
+        sa.Column('embedding_latency_ms', sa.Float(), nullable=True),
+        sa.Column('retrieval_latency_ms', sa.Float(), nullable=True),
+        sa.Column('llm_latency_ms', sa.Float(), nullable=True),
+        sa.Column('total_latency_ms', sa.Float(), nullable=True),
+        sa.Column('embedding_tokens', sa.Integer(), nullable=True),
+        sa.Column('completion_tokens', sa.Integer(), nullable=True),
+        sa.Column('api_cost', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_telemetry_id', 'telemetry', ['id'])
+
+def downgrade():
+    for table in ('telemetry', 'hallucination_checks', 'responses', 'retrievals', 'embeddings', 'prompts'):
+        op.drop_table(table)
@@ -0,0 +1,35 @@
+"""trace list indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = [
+    ('ix_prompts_created_at_id', 'prompts', ['created_at', 'id']),
+    ('ix_embeddings_prompt_id', 'embeddings', ['prompt_id']),
+    ('ix_retrievals_prompt_id', 'retrievals', ['prompt_id']),
+    ('ix_responses_prompt_id', 'responses', ['prompt_id']),
+    ('ix_telemetry_prompt_id', 'telemetry', ['prompt_id']),
+    ('ix_hallucination_checks_response_id_checked_at', 'hallucination_checks', ['response_id', 'checked_at']),
+    ('ix_telemetry_total_latency_ms', 'telemetry', ['total_latency_ms']),
+    ('ix_telemetry_api_cost', 'telemetry', ['api_cost']),
+]
+
+def upgrade():
+    # Build concurrently so existing tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
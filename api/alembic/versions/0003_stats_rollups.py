@@ -0,0 +1,53 @@
+"""stats rollup tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'telemetry_rollups',
+        sa.Column('granularity', sa.String(), primary_key=True),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), primary_key=True),
+        sa.Column('trace_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('sum_embedding_latency_ms', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sum_retrieval_latency_ms', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sum_llm_latency_ms', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sum_total_latency_ms', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sum_embedding_tokens', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('sum_completion_tokens', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('sum_api_cost', sa.Float(), nullable=False, server_default='0'),
+    )
+    op.create_table(
+        'latency_histogram_rollups',
+        sa.Column('granularity', sa.String(), primary_key=True),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), primary_key=True),
+        sa.Column('metric', sa.String(), primary_key=True),
+        sa.Column('bin', sa.Integer(), primary_key=True),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    op.create_table(
+        'groundedness_rollups',
+        sa.Column('granularity', sa.String(), primary_key=True),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), primary_key=True),
+        sa.Column('bin', sa.Integer(), primary_key=True),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    # Starting from watermark 0, the first refresh run backfills existing rows
+    op.create_table(
+        'rollup_watermarks',
+        sa.Column('source', sa.String(), primary_key=True),
+        sa.Column('last_id', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+def downgrade():
+    for table in ('rollup_watermarks', 'groundedness_rollups', 'latency_histogram_rollups', 'telemetry_rollups'):
+        op.drop_table(table)
@@ -0,0 +1,31 @@
+"""embedding hnsw index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # HNSW needs pgvector >= 0.5. Built concurrently so ingestion keeps running;
+    # raise maintenance_work_mem for the session if the build spills to disk.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_embeddings_vector_hnsw',
+            'embeddings',
+            ['vector'],
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'vector': 'vector_cosine_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_embeddings_vector_hnsw', table_name='embeddings', postgresql_concurrently=True, if_exists=True)
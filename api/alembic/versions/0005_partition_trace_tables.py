@@ -0,0 +1,112 @@
+"""partition trace tables by time
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+
+Rewrites every trace table as a range-partitioned table keyed on created_at
+(checked_at for hallucination_checks). Primary keys become (id, timestamp)
+and the database-level foreign keys are dropped, because Postgres cannot
+reference a partitioned table's key without its partition column. Existing
+rows are copied in this transaction, so run it during a maintenance window.
+Later partitions are created by app.services.partitions.ensure_partitions.
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime, timedelta, timezone
+import os
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+TABLES = [
+    ('prompts', 'created_at'),
+    ('embeddings', 'created_at'),
+    ('retrievals', 'created_at'),
+    ('responses', 'created_at'),
+    ('hallucination_checks', 'checked_at'),
+    ('telemetry', 'created_at'),
+]
+FOREIGN_KEYS = [
+    ('embeddings', 'prompt_id', 'prompts'),
+    ('retrievals', 'prompt_id', 'prompts'),
+    ('responses', 'prompt_id', 'prompts'),
+    ('hallucination_checks', 'response_id', 'responses'),
+    ('telemetry', 'prompt_id', 'prompts'),
+]
+STEP = {'day': timedelta(days=1), 'week': timedelta(weeks=1)}[os.getenv('PARTITION_INTERVAL', 'day')]
+PREMAKE = int(os.getenv('PARTITION_PREMAKE', '7'))
+
+
+def _interval_start(ts):
+    ts = ts.astimezone(timezone.utc)
+    day = datetime(ts.year, ts.month, ts.day, tzinfo=timezone.utc)
+    if STEP == timedelta(weeks=1):
+        day -= timedelta(days=day.weekday())
+    return day
+
+
+def _secondary_indexes(conn, table):
+    """(name, definition) of every index on table except its primary key."""
+    return conn.execute(
+        sa.text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :table AND indexname <> :pkey"
+        ),
+        {'table': table, 'pkey': f'{table}_pkey'},
+    ).all()
+
+
+def _rebuild(conn, table, partition_column):
+    """Move table's rows into a fresh table with the same columns, then drop the old one."""
+    old = f'{table}_old'
+    indexes = _secondary_indexes(conn, table)
+    # Index names are schema-wide; drop them here and recreate them on the new table
+    for name, _ in indexes:
+        op.execute(f'DROP INDEX {name}')
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+    if partition_column:
+        op.execute(f'UPDATE {old} SET {partition_column} = now() WHERE {partition_column} IS NULL')
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ({partition_column})')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {partition_column} SET NOT NULL, ADD PRIMARY KEY (id, {partition_column})')
+        now = datetime.now(timezone.utc)
+        oldest = conn.execute(sa.text(f'SELECT min({partition_column}) FROM {old}')).scalar() or now
+        lower, horizon = _interval_start(oldest), _interval_start(now) + STEP * (PREMAKE + 1)
+        while lower < horizon:
+            op.execute(
+                f"CREATE TABLE {table}_p{lower:%Y%m%d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{(lower + STEP).isoformat()}')"
+            )
+            lower += STEP
+        # Catches rows beyond the premade partitions if maintenance falls behind
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+    else:
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)')
+        op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id)')
+    # The id sequence must not be dropped along with the old table
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    op.execute(f'DROP TABLE {old} CASCADE')
+    for _, definition in indexes:
+        # Indexes of a partitioned parent are reported as "ON ONLY"
+        op.execute(definition.replace(' ON ONLY ', ' ON '))
+
+
+def upgrade():
+    conn = op.get_bind()
+    for table, _ in TABLES:
+        for fk in sa.inspect(conn).get_foreign_keys(table):
+            op.drop_constraint(fk['name'], table, type_='foreignkey')
+    for table, column in TABLES:
+        _rebuild(conn, table, column)
+
+
+def downgrade():
+    conn = op.get_bind()
+    for table, _ in TABLES:
+        _rebuild(conn, table, None)
+    for table, column, referenced in FOREIGN_KEYS:
+        op.create_foreign_key(f'{table}_{column}_fkey', table, referenced, [column], ['id'])
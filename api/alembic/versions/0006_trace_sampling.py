@@ -0,0 +1,41 @@
+"""trace sampling weights
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+
+Adds prompts.sample_rate and switches the rollup counts and token sums to
+float, since rollups now weight each row by 1/sample_rate.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs that hold weighted sums after this revision
+WEIGHTED_COLUMNS = [
+    ('telemetry_rollups', 'sum_embedding_tokens'),
+    ('telemetry_rollups', 'sum_completion_tokens'),
+    ('latency_histogram_rollups', 'count'),
+    ('groundedness_rollups', 'count'),
+]
+
+def upgrade():
+    # A constant default is stored in the catalog, so this does not rewrite the partitions
+    op.add_column('prompts', sa.Column('sample_rate', sa.Float(), nullable=False, server_default='1.0'))
+    op.add_column('telemetry_rollups', sa.Column('estimated_count', sa.Float(), nullable=False, server_default='0'))
+    op.execute('UPDATE telemetry_rollups SET estimated_count = trace_count')
+    for table, column in WEIGHTED_COLUMNS:
+        op.alter_column(table, column, type_=sa.Float(), existing_type=sa.BigInteger(), existing_nullable=False)
+
+def downgrade():
+    for table, column in reversed(WEIGHTED_COLUMNS):
+        op.alter_column(
+            table, column, type_=sa.BigInteger(), existing_type=sa.Float(), existing_nullable=False,
+            postgresql_using=f'round({column})::bigint',
+        )
+    op.drop_column('telemetry_rollups', 'estimated_count')
+    op.drop_column('prompts', 'sample_rate')
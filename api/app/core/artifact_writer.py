@@ -0,0 +1,161 @@
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, List, Optional, Tuple, Union
+from prometheus_client import Counter, Histogram
+from . import minio_utils
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_QUEUE_SIZE = int(os.getenv("ARTIFACT_QUEUE_SIZE", "10000"))
+ARTIFACT_BATCH_SIZE = int(os.getenv("ARTIFACT_BATCH_SIZE", "32"))
+ARTIFACT_UPLOAD_THREADS = int(os.getenv("ARTIFACT_UPLOAD_THREADS", "4"))
+ARTIFACT_MAX_RETRIES = int(os.getenv("ARTIFACT_MAX_RETRIES", "5"))
+ARTIFACT_BACKOFF_BASE = float(os.getenv("ARTIFACT_BACKOFF_BASE", "0.5"))
+ARTIFACT_BACKOFF_MAX = float(os.getenv("ARTIFACT_BACKOFF_MAX", "30"))
+
+ARTIFACT_UPLOAD_DURATION = Histogram(
+    "artifact_upload_duration_seconds",
+    "Duration of one MinIO put (each attempt), by bucket",
+    ["bucket"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+ARTIFACT_UPLOAD_BYTES = Histogram(
+    "artifact_upload_bytes",
+    "Size of uploaded MinIO objects, by bucket",
+    ["bucket"],
+    buckets=(1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+ARTIFACT_UPLOADS = Counter(
+    "artifact_uploads_total",
+    "Artifacts by outcome: uploaded, failed (after retries) or dropped (queue full)",
+    ["result"],
+)
+
+# Object payloads may be passed as bytes or as a callable that produces them,
+# so serialization happens on the writer threads instead of the request path.
+Payload = Union[bytes, Callable[[], bytes]]
+Upload = Tuple[str, str, Payload, str]
+
+
+class ArtifactWriter:
+    """
+    Write-behind uploader for MinIO artifacts.
+
+    Uploads are queued in memory and drained in batches by a small pool of
+    threads, retrying transient put failures with exponential backoff. The
+    request path only pays for the enqueue.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = ARTIFACT_QUEUE_SIZE,
+        batch_size: int = ARTIFACT_BATCH_SIZE,
+        num_threads: int = ARTIFACT_UPLOAD_THREADS,
+        max_retries: int = ARTIFACT_MAX_RETRIES,
+        backoff_base: float = ARTIFACT_BACKOFF_BASE,
+        backoff_max: float = ARTIFACT_BACKOFF_MAX,
+    ):
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._queue: "queue.Queue[Optional[Upload]]" = queue.Queue(maxsize=max_queue_size)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.uploaded = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.num_threads):
+            thread = threading.Thread(target=self._run, name=f"artifact-writer-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = 10.0):
+        """Drain queued uploads and stop the writer threads."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, bucket: str, object_name: str, data: Payload, content_type: str = "application/octet-stream") -> bool:
+        """Queue an upload. Returns False if the queue is full and the object was dropped."""
+        try:
+            self._queue.put_nowait((bucket, object_name, data, content_type))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            ARTIFACT_UPLOADS.labels("dropped").inc()
+            logger.warning("Artifact queue full, dropping %s/%s", bucket, object_name)
+            return False
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _next_batch(self) -> Tuple[List[Upload], bool]:
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        stop = False
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            for item in batch:
+                self._upload(item)
+            if stop:
+                return
+
+    def _upload(self, item: Upload):
+        bucket, object_name, data, content_type = item
+        try:
+            payload = data() if callable(data) else data
+        except Exception:
+            logger.exception("Could not serialize %s/%s", bucket, object_name)
+            with self._lock:
+                self.failed += 1
+            ARTIFACT_UPLOADS.labels("failed").inc()
+            return
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                minio_utils.upload_data(bucket, object_name, payload, content_type)
+                ARTIFACT_UPLOAD_DURATION.labels(bucket).observe(time.perf_counter() - start)
+                ARTIFACT_UPLOAD_BYTES.labels(bucket).observe(len(payload))
+                with self._lock:
+                    self.uploaded += 1
+                ARTIFACT_UPLOADS.labels("uploaded").inc()
+                return
+            except Exception as e:
+                ARTIFACT_UPLOAD_DURATION.labels(bucket).observe(time.perf_counter() - start)
+                if attempt == self.max_retries or not minio_utils.is_transient(e):
+                    logger.exception("Giving up on %s/%s after %d attempts", bucket, object_name, attempt + 1)
+                    with self._lock:
+                        self.failed += 1
+                    ARTIFACT_UPLOADS.labels("failed").inc()
+                    return
+                minio_utils.forget_bucket(bucket)
+                time.sleep(min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+artifact_writer = ArtifactWriter()
@@ -0,0 +1,128 @@
+import gzip
+import io
+import json
+import os
+import zlib
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+try:
+    import zstandard
+except ImportError:  # zstd request bodies are rejected with 415 without it
+    zstandard = None
+
+# Limits apply to the body as sent and after decompression (guards against zip bombs)
+REQUEST_MAX_BODY_BYTES = int(os.getenv("REQUEST_MAX_BODY_BYTES", str(32 * 1024 * 1024)))
+REQUEST_MAX_DECOMPRESSED_BYTES = int(os.getenv("REQUEST_MAX_DECOMPRESSED_BYTES", str(256 * 1024 * 1024)))
+# Smaller bodies are decompressed inline; larger ones in the threadpool
+REQUEST_INLINE_DECOMPRESS_BYTES = 64 * 1024
+ARTIFACT_GZIP_LEVEL = int(os.getenv("ARTIFACT_GZIP_LEVEL", "6"))
+
+
+def _read_limited(reader, limit: int) -> bytes:
+    chunks, size = [], 0
+    while size <= limit:
+        chunk = reader.read(min(1024 * 1024, limit + 1 - size))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks)
+
+def _gunzip(data: bytes, limit: int) -> bytes:
+    return _read_limited(gzip.GzipFile(fileobj=io.BytesIO(data)), limit)
+
+def _inflate(data: bytes, limit: int) -> bytes:
+    # zlib-wrapped, as the HTTP "deflate" coding specifies
+    return zlib.decompressobj().decompress(data, limit + 1)
+
+def _unzstd(data: bytes, limit: int) -> bytes:
+    return _read_limited(zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)), limit)
+
+_DECODERS = {"gzip": _gunzip, "x-gzip": _gunzip, "deflate": _inflate}
+if zstandard is not None:
+    _DECODERS["zstd"] = _unzstd
+
+
+class _TooLarge(Exception):
+    pass
+
+
+def decompress(encoding: str, data: bytes, limit: int = REQUEST_MAX_DECOMPRESSED_BYTES) -> bytes:
+    """Decode a request body, raising _TooLarge if it grows past limit."""
+    out = _DECODERS[encoding](data, limit)
+    if len(out) > limit:
+        raise _TooLarge()
+    return out
+
+
+def gzip_json(data) -> bytes:
+    """JSON-encode and gzip a MinIO log object."""
+    return gzip.compress(json.dumps(data).encode('utf-8'), compresslevel=ARTIFACT_GZIP_LEVEL, mtime=0)
+
+
+class DecompressionMiddleware:
+    """
+    Accept gzip, deflate and zstd request bodies (Content-Encoding) on any route.
+
+    The body is read and decoded before the app sees the request, and the
+    Content-Encoding header is dropped (Content-Length is rewritten), so
+    handlers and validation work on plain JSON. Uncompressed requests pass
+    straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"content-encoding":
+                encoding = value.decode("latin-1").strip().lower()
+                break
+        if encoding in (None, "", "identity"):
+            return await self.app(scope, receive, send)
+        if encoding not in _DECODERS:
+            response = JSONResponse({"detail": f"unsupported Content-Encoding: {encoding}"}, status_code=415)
+            return await response(scope, receive, send)
+
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return  # client went away
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > REQUEST_MAX_BODY_BYTES:
+                return await JSONResponse({"detail": "request body too large"}, status_code=413)(scope, receive, send)
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        data = b"".join(chunks)
+        try:
+            if len(data) > REQUEST_INLINE_DECOMPRESS_BYTES:
+                body = await run_in_threadpool(decompress, encoding, data)
+            else:
+                body = decompress(encoding, data)
+        except _TooLarge:
+            return await JSONResponse({"detail": "decompressed body too large"}, status_code=413)(scope, receive, send)
+        except Exception:
+            return await JSONResponse({"detail": f"invalid {encoding} body"}, status_code=400)(scope, receive, send)
+
+        headers = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        replayed = False
+
+        async def receive_decompressed():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        # Mutate rather than copy the scope: outer middleware (metrics) reads the
+        # "route" the router sets on it
+        scope["headers"] = headers
+        await self.app(scope, receive_decompressed, send)
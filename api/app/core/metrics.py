@@ -0,0 +1,82 @@
+import os
+import time
+from prometheus_client import CollectorRegistry, Histogram, REGISTRY, make_asgi_app, multiprocess
+
+# With PROMETHEUS_MULTIPROC_DIR set, every uvicorn worker process writes its
+# samples to files in that directory and /metrics serves the aggregate of all
+# of them. The directory must be emptied before the server starts (see the
+# Dockerfile); each process marks itself dead on shutdown (see main.py).
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUEST_SIZE = Histogram(
+    "http_request_size_bytes",
+    "HTTP request body bytes as received (before decompression), by route template",
+    ["route"],
+    buckets=_SIZE_BUCKETS,
+)
+
+
+def metrics_app():
+    """The /metrics ASGI app, aggregating across processes in multiprocess mode."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return make_asgi_app(registry=registry)
+    return make_asgi_app(registry=REGISTRY)
+
+
+def mark_process_dead() -> None:
+    """Drop this process's live gauges from the aggregate when it exits."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """
+    Record latency and body size of every HTTP request.
+
+    Requests are labelled by the matched route template (/traces/{prompt_id}),
+    never the raw path, so label cardinality stays bounded; anything that
+    matched no route (404s, mounts such as /metrics) is labelled "other".
+    Add it last so it is outermost and times the whole stack, and counts the
+    body as it arrives on the wire.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        received = 0
+        status = 500
+
+        async def counting_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def recording_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, recording_send)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "other"
+            REQUEST_LATENCY.labels(scope["method"], template, str(status)).observe(time.perf_counter() - start)
+            REQUEST_SIZE.labels(template).observe(received)
@@ -1,6 +1,9 @@
+import io
 import os
+import threading
+import urllib3
 from minio import Minio
-from minio.error import S3Error
+from minio.error import InvalidResponseError, S3Error, ServerError
 
 MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio:9000")
 MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
@@ -14,9 +17,36 @@ client = Minio(
     secure=MINIO_SECURE
 )
 
+# Buckets already known to exist, so uploads skip the bucket_exists round-trip
+_known_buckets = set()
+_bucket_lock = threading.Lock()
+
 def ensure_bucket(bucket_name: str):
-    if not client.bucket_exists(bucket_name):
-        client.make_bucket(bucket_name)
+    if bucket_name in _known_buckets:
+        return
+    with _bucket_lock:
+        if bucket_name in _known_buckets:
+            return
+        if not client.bucket_exists(bucket_name):
+            try:
+                client.make_bucket(bucket_name)
+            except S3Error as e:
+                if e.code not in ("BucketAlreadyOwnedByYou", "BucketAlreadyExists"):
+                    raise
+        _known_buckets.add(bucket_name)
+
+def forget_bucket(bucket_name: str):
+    _known_buckets.discard(bucket_name)
+
+# S3 error codes worth retrying: server trouble, throttling, or a bucket that
+# was removed (ensure_bucket recreates it once it is forgotten)
+_TRANSIENT_S3_CODES = frozenset({"InternalError", "ServiceUnavailable", "SlowDown", "RequestTimeout", "NoSuchBucket"})
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed MinIO call may succeed when retried."""
+    if isinstance(error, S3Error):
+        return error.code in _TRANSIENT_S3_CODES
+    return isinstance(error, (ServerError, InvalidResponseError, urllib3.exceptions.HTTPError, OSError))
 
 def upload_file(bucket: str, object_name: str, file_path: str):
     ensure_bucket(bucket)
@@ -24,7 +54,8 @@ def upload_file(bucket: str, object_name: str, file_path: str):
 
 def upload_data(bucket: str, object_name: str, data: bytes, content_type: str = "application/octet-stream"):
     ensure_bucket(bucket)
-    client.put_object(bucket, object_name, data, length=len(data), content_type=content_type)
+    # put_object reads from a stream
+    client.put_object(bucket, object_name, io.BytesIO(data), length=len(data), content_type=content_type)
 
 def download_file(bucket: str, object_name: str, file_path: str):
     client.fget_object(bucket, object_name, file_path)
@@ -0,0 +1,45 @@
+import json
+import tempfile
+from typing import Callable, Dict, Iterable, Sequence
+from . import minio_utils
+
+# pyarrow is only needed by the export/archive jobs, so it is imported lazily
+
+
+def json_string(value):
+    return None if value is None else json.dumps(value)
+
+
+def stream_to_minio(
+    batches: Iterable[Sequence],
+    schema,
+    bucket: str,
+    object_name: str,
+    converters: Dict[str, Callable] = None,
+) -> int:
+    """
+    Write row batches to one Parquet object in MinIO and return the row count.
+
+    Each batch of DB rows (tuples in schema column order) becomes one row
+    group, so only a batch is held in memory at a time; the file is spooled
+    to local disk and uploaded when complete. converters map column name to a
+    per-value function applied before the Arrow conversion.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    converters = converters or {}
+    rows_written = 0
+    with tempfile.NamedTemporaryFile(suffix=".parquet") as tmp:
+        with pq.ParquetWriter(tmp.name, schema, compression="zstd") as writer:
+            for rows in batches:
+                data = {}
+                for i, name in enumerate(schema.names):
+                    values = [row[i] for row in rows]
+                    if name in converters:
+                        values = [converters[name](v) for v in values]
+                    data[name] = values
+                writer.write_table(pa.Table.from_pydict(data, schema=schema))
+                rows_written += len(rows)
+        minio_utils.upload_file(bucket, object_name, tmp.name)
+    return rows_written
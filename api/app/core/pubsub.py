@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+from typing import List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Messages buffered per live subscriber before the oldest are dropped
+WS_SUBSCRIBER_BUFFER = int(os.getenv("WS_SUBSCRIBER_BUFFER", "1000"))
+# Redis carrying the live feed between API processes (the Celery broker by default); empty keeps it in-process
+LIVE_TRACES_REDIS_URL = os.getenv("LIVE_TRACES_REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0"))
+LIVE_TRACES_CHANNEL = os.getenv("LIVE_TRACES_CHANNEL", "rag_tracer:live_traces")
+# How often an idle relay checks whether any process has live subscribers
+LIVE_TRACES_POLL_SECONDS = float(os.getenv("LIVE_TRACES_POLL_SECONDS", "1"))
+
+
+class Subscription:
+    """A subscriber's bounded mailbox. When full, the oldest message is dropped."""
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def put(self, message: str) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+
+class PubSub:
+    """
+    In-process fan-out of pre-serialized messages to websocket subscribers.
+
+    publish() never awaits, so a slow subscriber only loses its own oldest
+    messages and cannot hold up the publisher. Must be used from the event
+    loop thread. Each API process has its own subscribers.
+    """
+
+    def __init__(self, buffer_size: int = WS_SUBSCRIBER_BUFFER):
+        self.buffer_size = buffer_size
+        self._subscribers: Set[Subscription] = set()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, message: str) -> None:
+        for subscription in list(self._subscribers):
+            subscription.put(message)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+class RedisRelay:
+    """
+    Fan-out of a local PubSub across API processes over Redis pub/sub.
+
+    publish() queues the message and returns; a sender task publishes the
+    queue to the channel in pipelined batches. While this process has local
+    subscribers it subscribes to the channel and hands every message,
+    including its own, to them. listening says whether any process is
+    subscribed (from the last PUBLISH, or PUBSUB NUMSUB when idle), so
+    publishers can skip serializing messages nobody reads. Until start(), or
+    without a URL, messages go straight to the local PubSub.
+    """
+
+    def __init__(
+        self,
+        local: PubSub,
+        url: str = LIVE_TRACES_REDIS_URL,
+        channel: str = LIVE_TRACES_CHANNEL,
+        poll_seconds: float = LIVE_TRACES_POLL_SECONDS,
+    ):
+        self.local = local
+        self.url = url
+        self.channel = channel
+        self.poll_seconds = poll_seconds
+        self.listeners = 0
+        self._redis = None
+        self._outbox: Optional[Subscription] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def listening(self) -> bool:
+        if self._redis is None:
+            return self.local.subscriber_count > 0
+        # A new local subscriber counts before its process has subscribed to the channel
+        return self.listeners > 0 or self.local.subscriber_count > 0
+
+    def publish(self, message: str) -> None:
+        if self._redis is None:
+            self.local.publish(message)
+        else:
+            # Bounded like a subscriber: with Redis down, the oldest messages go first
+            self._outbox.put(message)
+
+    async def start(self, client=None) -> None:
+        """Start relaying; client defaults to a redis.asyncio client for url."""
+        if self._redis is not None or not (client or self.url):
+            return
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.Redis.from_url(self.url, decode_responses=True, socket_connect_timeout=2)
+        self._redis = client
+        self._outbox = Subscription(self.local.buffer_size)
+        self._tasks = [asyncio.create_task(self._send()), asyncio.create_task(self._receive())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _send(self) -> None:
+        while True:
+            try:
+                try:
+                    messages = [await asyncio.wait_for(self._outbox.get(), self.poll_seconds)]
+                except asyncio.TimeoutError:
+                    [(_, self.listeners)] = await self._redis.pubsub_numsub(self.channel)
+                    continue
+                while not self._outbox.queue.empty():
+                    messages.append(self._outbox.queue.get_nowait())
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for message in messages:
+                        pipe.publish(self.channel, message)
+                    self.listeners = (await pipe.execute())[-1]
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Could not publish live traces to Redis")
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _receive(self) -> None:
+        while True:
+            try:
+                while not self.local.subscriber_count:
+                    await asyncio.sleep(self.poll_seconds / 2)
+                async with self._redis.pubsub() as channel:
+                    await channel.subscribe(self.channel)
+                    try:
+                        while self.local.subscriber_count:
+                            message = await channel.get_message(ignore_subscribe_messages=True, timeout=self.poll_seconds)
+                            if message is not None:
+                                self.local.publish(message["data"])
+                    finally:
+                        await channel.unsubscribe(self.channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Lost the live traces Redis subscription; retrying")
+                await asyncio.sleep(self.poll_seconds)
+
+
+# Summaries of newly stored traces, consumed by /ws/traces/live
+trace_events = PubSub()
+# Publishes them to every API process, not only the one that stored the trace
+trace_relay = RedisRelay(trace_events)
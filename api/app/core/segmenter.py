@@ -0,0 +1,121 @@
+import re
+from typing import List, Tuple
+
+# Rule-based sentence segmentation for the hallucination check, shared by the
+# worker (whole responses) and the streaming ingestion path (token deltas).
+# A '.', '!' or '?' run ends a sentence only when followed by whitespace and
+# then something that can start one, so decimals (3.14), URLs and file names
+# (example.com/a.html) never split; known abbreviations and initials do not
+# end a sentence either. Blank lines and list items always do.
+
+ABBREVIATIONS = frozenset(
+    "mr mrs ms dr prof sr jr st vs etc e.g i.e cf al inc ltd co corp llc dept univ "
+    "no nos vol fig figs eq approx est min max ca op pp ed eds rev gen col lt sgt capt "
+    "jan feb mar apr jun jul aug sep sept oct nov dec mon tue wed thu fri sat sun "
+    "u.s u.k u.n a.m p.m".split()
+)
+
+# Terminator run, optional closing quotes/brackets, then the whitespace after it
+_CANDIDATE = re.compile(r"[.!?…]+[\"'”’)\]]*(\s+)")
+# Paragraph breaks and newline-led list items ("- ", "* ", "1. ", "2) ")
+_HARD_BREAK = re.compile(r"\n\s*\n|\n(?=[ \t]*(?:[-*•]|\d{1,3}[.)])[ \t])")
+_WORD_BEFORE = re.compile(r"(\S+?)[.!?…]+[\"'”’)\]]*$")
+# Characters that may open a sentence after a terminator
+_STARTER = re.compile(r"[A-Z0-9\"'“‘(\[*\-•]|[^\x00-\x7f]")
+
+
+def _is_boundary(text: str, match: re.Match, at_line_start: bool) -> bool:
+    """Whether a terminator candidate really ends a sentence (the next char is known)."""
+    nxt = text[match.end()]
+    if not _STARTER.match(nxt):
+        return False
+    terminator = text[match.start():match.start(1)]
+    if terminator[0] != ".":
+        return True
+    start = match.start()
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    word = _WORD_BEFORE.search(text, start, match.start(1))
+    if word is None:
+        return True
+    token = word.group(1).lstrip("\"'(“‘[").lower()
+    if token in ABBREVIATIONS:
+        return False
+    if len(token) == 1 and token.isalpha():
+        return False  # an initial, as in "J. K. Rowling"
+    if token.isdigit() and len(token) <= 3:
+        # "1. Item" at the start of a line is a list marker, not a sentence
+        newline = text.rfind("\n", 0, word.start(1))
+        if (newline >= 0 or at_line_start) and not text[newline + 1:word.start(1)].strip():
+            return False
+    return True
+
+
+def _boundaries(text: str, final: bool, at_line_start: bool = True) -> List[int]:
+    """
+    End offsets of the sentences in text.
+
+    A terminator at the very end of the text can only be confirmed once the
+    next character is known, so unless final is set it is left undecided.
+    at_line_start tells whether text begins a line (nothing but whitespace
+    before it on its line).
+    """
+    ends = [m.end() for m in _HARD_BREAK.finditer(text)]
+    for match in _CANDIDATE.finditer(text):
+        if match.end() < len(text) and _is_boundary(text, match, at_line_start):
+            ends.append(match.end())
+    if final:
+        ends.append(len(text))
+    return sorted(set(ends))
+
+
+def _split(text: str, ends: List[int]) -> Tuple[List[str], int]:
+    sentences, start = [], 0
+    for end in ends:
+        sentence = " ".join(text[start:end].split())
+        if any(c.isalnum() for c in sentence):
+            sentences.append(sentence)
+        start = end
+    return sentences, start
+
+
+def segment(text: str) -> List[str]:
+    """Split a complete response into whitespace-normalized sentences."""
+    return _split(text, _boundaries(text, final=True))[0]
+
+
+class IncrementalSegmenter:
+    """
+    Segment text that arrives in pieces (LLM token deltas).
+
+    feed() returns the sentences completed by the new text; finish() returns
+    the rest. Only the unfinished tail is kept and rescanned, and the output
+    matches segment() on the whole text.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._at_line_start = True
+
+    def _take(self, final: bool) -> List[str]:
+        text = self._buffer
+        sentences, consumed = _split(text, _boundaries(text, final, self._at_line_start))
+        if consumed:
+            done = text[:consumed]
+            newline = done.rfind("\n")
+            if newline >= 0:
+                self._at_line_start = not done[newline + 1:].strip()
+            else:
+                self._at_line_start = self._at_line_start and not done.strip()
+            self._buffer = text[consumed:]
+        return sentences
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        return self._take(final=False)
+
+    def finish(self) -> List[str]:
+        sentences = self._take(final=True)
+        self._buffer = ""
+        self._at_line_start = True
+        return sentences
@@ -0,0 +1,121 @@
+from celery import Celery
+from prometheus_client import Counter
+from typing import List, Sequence, Tuple
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+# Worker task that checks responses; it is micro-batched on the worker side
+HALLUCINATION_TASK = os.getenv("HALLUCINATION_TASK", "worker.check_hallucination_batch")
+# Priority -> queue. Workers consume them in this order (see workers/worker.py)
+HALLUCINATION_QUEUES = {
+    "high": "hallucination.high",
+    "default": "hallucination.default",
+    "low": "hallucination.low",
+}
+# Sentences completed while a response streams are pre-scored ahead of the backlog
+PRECHECK_TASK = os.getenv("PRECHECK_TASK", "worker.precheck_sentences")
+PRECHECK_QUEUE = os.getenv("PRECHECK_QUEUE", HALLUCINATION_QUEUES["high"])
+# A response is enqueued at most once per this many seconds, however often it is submitted
+HALLUCINATION_DEDUP_TTL = int(os.getenv("HALLUCINATION_DEDUP_TTL", "3600"))
+_DEDUP_KEY = "hallucination:enqueued:{}"
+
+# Producer-only client: the API never consumes tasks, it only publishes by name
+celery_client = Celery("rag_tracer_api", broker=CELERY_BROKER_URL)
+celery_client.conf.broker_transport_options = {"socket_timeout": 2, "socket_connect_timeout": 2}
+
+CHECKS_ENQUEUED = Counter(
+    "hallucination_checks_enqueued_total",
+    "Hallucination check tasks published, by priority",
+    ["priority"],
+)
+CHECKS_DEDUPLICATED = Counter(
+    "hallucination_checks_deduplicated_total",
+    "Check requests skipped because the response was already enqueued",
+)
+PRECHECKS_ENQUEUED = Counter(
+    "hallucination_precheck_sentences_enqueued_total",
+    "Streamed sentences published for pre-scoring",
+)
+ENQUEUE_ERRORS = Counter(
+    "hallucination_enqueue_errors_total",
+    "Check tasks that could not be published (the sweeper retries them later)",
+)
+
+_redis = None
+
+def _redis_client():
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(CELERY_BROKER_URL, socket_timeout=2, socket_connect_timeout=2)
+    return _redis
+
+
+def enqueue_checks(items: Sequence[Tuple[int, str]]) -> int:
+    """
+    Publish hallucination checks for (response_id, priority) pairs; returns how many were sent.
+
+    Each response first claims a Redis key with SET NX, so a response that is
+    re-submitted (by a retried ingest or the sweeper) while a check is pending
+    is not enqueued twice. The worker is idempotent as well; this only saves
+    the duplicate work. Never raises: failures are logged and counted, and
+    the claim is released so the sweeper can pick the response up.
+    """
+    if not items:
+        return 0
+    try:
+        r = _redis_client()
+        with r.pipeline(transaction=False) as pipe:
+            for response_id, _ in items:
+                pipe.set(_DEDUP_KEY.format(response_id), 1, nx=True, ex=HALLUCINATION_DEDUP_TTL)
+            claimed = pipe.execute()
+    except Exception:
+        logger.exception("Could not claim %d hallucination checks", len(items))
+        ENQUEUE_ERRORS.inc(len(items))
+        return 0
+
+    sent = 0
+    enqueued_at = time.time()
+    with celery_client.producer_or_acquire() as producer:
+        for (response_id, priority), is_new in zip(items, claimed):
+            if not is_new:
+                CHECKS_DEDUPLICATED.inc()
+                continue
+            try:
+                celery_client.send_task(
+                    HALLUCINATION_TASK,
+                    args=[response_id],
+                    kwargs={"enqueued_at": enqueued_at, "priority": priority},
+                    queue=HALLUCINATION_QUEUES[priority],
+                    producer=producer,
+                    retry=False,
+                )
+            except Exception:
+                logger.exception("Could not enqueue hallucination check for response %s", response_id)
+                ENQUEUE_ERRORS.inc()
+                try:
+                    r.delete(_DEDUP_KEY.format(response_id))
+                except Exception:
+                    pass
+                continue
+            CHECKS_ENQUEUED.labels(priority).inc()
+            sent += 1
+    return sent
+
+
+def enqueue_precheck(sentences: List[str], docs: List[str]) -> bool:
+    """Publish a precheck of streamed sentences against their documents. Never raises."""
+    if not sentences or not docs:
+        return False
+    try:
+        celery_client.send_task(PRECHECK_TASK, args=[sentences, docs], queue=PRECHECK_QUEUE, retry=False)
+    except Exception:
+        # Only a warm-up: the check after ingest scores these sentences anyway
+        logger.warning("Could not enqueue precheck of %d sentences", len(sentences), exc_info=True)
+        return False
+    PRECHECKS_ENQUEUED.inc(len(sentences))
+    return True
@@ -0,0 +1,28 @@
+import base64
+import io
+import numpy as np
+
+# Little-endian wire formats accepted for binary embedding vectors
+VECTOR_DTYPES = {
+    "float32": np.dtype("<f4"),
+    "float16": np.dtype("<f2"),
+}
+
+def decode_vector(data: str, dtype: str = "float32") -> np.ndarray:
+    """Decode a base64 little-endian vector into a float32 array."""
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"vector_dtype must be one of {sorted(VECTOR_DTYPES)}")
+    raw = base64.b64decode(data, validate=True)
+    if len(raw) % VECTOR_DTYPES[dtype].itemsize:
+        raise ValueError(f"vector_b64 length is not a multiple of the {dtype} item size")
+    return np.frombuffer(raw, dtype=VECTOR_DTYPES[dtype]).astype(np.float32)
+
+def encode_vector(vector, dtype: str = "float32") -> str:
+    """Encode a vector as base64 little-endian bytes."""
+    return base64.b64encode(np.asarray(vector, dtype=VECTOR_DTYPES[dtype]).tobytes()).decode("ascii")
+
+def to_npy(vector) -> bytes:
+    """Serialize a vector in NumPy .npy format."""
+    buf = io.BytesIO()
+    np.save(buf, np.asarray(vector, dtype=np.float32), allow_pickle=False)
+    return buf.getvalue()
@@ -1,26 +1,39 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from prometheus_client import make_asgi_app
-from .routers import traces
-import json
+from fastapi import FastAPI
+from .routers import stats, traces, ws
+from .core.artifact_writer import artifact_writer
+from .core.compression import DecompressionMiddleware
+from .core.metrics import MetricsMiddleware, mark_process_dead, metrics_app
+from .core.pubsub import trace_relay
 
 app = FastAPI(title="RAG Tracing & Hallucination Detection API")
+# SDK clients may gzip/zstd-compress trace bodies
+app.add_middleware(DecompressionMiddleware)
+# Outermost, so it times the whole stack and sees bodies as sent
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(traces.router)
+app.include_router(stats.router)
+app.include_router(ws.router)
 
-# Prometheus metrics endpoint
-app.mount("/metrics", make_asgi_app())
+@app.on_event("startup")
+def start_artifact_writer():
+    artifact_writer.start()
 
-# WebSocket endpoint for real-time trace updates
-@app.websocket("/ws/traces")
-async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
-    try:
-        while True:
-            data = await websocket.receive_text()
-            # Process trace data
-            trace_data = json.loads(data)
-            # Echo back processed data (in a real implementation, this would be stored)
-            await websocket.send_text(f"Trace received: {trace_data.get('user_query', '')}")
-    except WebSocketDisconnect:
-        print("WebSocket client disconnected")
+@app.on_event("shutdown")
+def stop_artifact_writer():
+    # Drain queued MinIO uploads before the process exits
+    artifact_writer.stop()
+    mark_process_dead()
+
+@app.on_event("startup")
+async def start_trace_relay():
+    # Live traces reach subscribers on every API worker
+    await trace_relay.start()
+
+@app.on_event("shutdown")
+async def stop_trace_relay():
+    await trace_relay.stop()
+
+# Prometheus metrics endpoint (aggregated over all worker processes)
+app.mount("/metrics", metrics_app())
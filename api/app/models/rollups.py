@@ -0,0 +1,40 @@
+from sqlalchemy import Column, String, Float, Integer, BigInteger, DateTime
+from ..core.database import Base
+
+# Rollup tables behind the /stats endpoints. They are maintained incrementally by
+# app.services.rollups.refresh_rollups, one row per (granularity, bucket_start, ...).
+
+class TelemetryRollup(Base):
+    __tablename__ = 'telemetry_rollups'
+    granularity = Column(String, primary_key=True)  # "minute" | "hour"
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    trace_count = Column(BigInteger, nullable=False, default=0)  # stored traces
+    # Sums below are weighted by 1/sample_rate, so they estimate the unsampled totals
+    estimated_count = Column(Float, nullable=False, default=0)
+    sum_embedding_latency_ms = Column(Float, nullable=False, default=0)
+    sum_retrieval_latency_ms = Column(Float, nullable=False, default=0)
+    sum_llm_latency_ms = Column(Float, nullable=False, default=0)
+    sum_total_latency_ms = Column(Float, nullable=False, default=0)
+    sum_embedding_tokens = Column(Float, nullable=False, default=0)
+    sum_completion_tokens = Column(Float, nullable=False, default=0)
+    sum_api_cost = Column(Float, nullable=False, default=0)
+
+class LatencyHistogramRollup(Base):
+    __tablename__ = 'latency_histogram_rollups'
+    granularity = Column(String, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    metric = Column(String, primary_key=True)  # "embedding" | "retrieval" | "llm" | "total"
+    bin = Column(Integer, primary_key=True)  # log-scale latency bin
+    count = Column(Float, nullable=False, default=0)  # weighted by 1/sample_rate
+
+class GroundednessRollup(Base):
+    __tablename__ = 'groundedness_rollups'
+    granularity = Column(String, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    bin = Column(Integer, primary_key=True)  # 0..GROUNDEDNESS_BINS-1
+    count = Column(Float, nullable=False, default=0)  # weighted by 1/sample_rate
+
+class RollupWatermark(Base):
+    __tablename__ = 'rollup_watermarks'
+    source = Column(String, primary_key=True)  # source table name
+    last_id = Column(BigInteger, nullable=False, default=0)
@@ -1,68 +1,115 @@
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, String, Float, Integer, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from pgvector.sqlalchemy import Vector
 from ..core.database import Base
 
+EMBEDDING_DIM = 1536
+
+# Every trace table is range-partitioned by its timestamp (see
+# app.services.partitions), so the primary keys include that column. Postgres
+# cannot enforce foreign keys against those keys, so the relationships below
+# declare the join columns with foreign() instead of ForeignKey.
+
 class Prompt(Base):
     __tablename__ = 'prompts'
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_query = Column(String, nullable=False)
     system_prompt = Column(String, nullable=True)
     final_prompt = Column(String, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    embeddings = relationship("Embedding", back_populates="prompt", cascade="all, delete-orphan")
-    retrievals = relationship("Retrieval", back_populates="prompt", cascade="all, delete-orphan")
-    responses = relationship("Response", back_populates="prompt", cascade="all, delete-orphan")
-    telemetry = relationship("Telemetry", back_populates="prompt", uselist=False, cascade="all, delete-orphan")
+    # Probability the trace was kept by sampling; rollups weight it by 1/sample_rate
+    sample_rate = Column(Float, nullable=False, server_default="1.0")
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    embeddings = relationship(
+        "Embedding", primaryjoin="Prompt.id == foreign(Embedding.prompt_id)", back_populates="prompt", cascade="all, delete-orphan"
+    )
+    retrievals = relationship(
+        "Retrieval", primaryjoin="Prompt.id == foreign(Retrieval.prompt_id)", back_populates="prompt", cascade="all, delete-orphan"
+    )
+    responses = relationship(
+        "Response", primaryjoin="Prompt.id == foreign(Response.prompt_id)", back_populates="prompt", cascade="all, delete-orphan"
+    )
+    telemetry = relationship(
+        "Telemetry", primaryjoin="Prompt.id == foreign(Telemetry.prompt_id)", back_populates="prompt", uselist=False, cascade="all, delete-orphan"
+    )
+    __table_args__ = (
+        # Keyset pagination of the trace list (newest first)
+        Index("ix_prompts_created_at_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
 class Embedding(Base):
     __tablename__ = 'embeddings'
-    id = Column(Integer, primary_key=True, index=True)
-    vector = Column(Vector(1536), nullable=False)
-    prompt_id = Column(Integer, ForeignKey('prompts.id'), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    vector = Column(Vector(EMBEDDING_DIM), nullable=False)
+    prompt_id = Column(Integer, nullable=False, index=True)
     retrieval_candidates = Column(JSON, nullable=True)  # [{doc_id, score}, ...]
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    prompt = relationship("Prompt", back_populates="embeddings")
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    prompt = relationship("Prompt", primaryjoin="Prompt.id == foreign(Embedding.prompt_id)", back_populates="embeddings")
+    __table_args__ = (
+        # Approximate nearest-neighbour search for /traces/similar
+        Index(
+            "ix_embeddings_vector_hnsw",
+            "vector",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"vector": "vector_cosine_ops"},
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
 class Retrieval(Base):
     __tablename__ = 'retrievals'
 
-    id = Column(Integer, primary_key=True, index=True)
-    prompt_id = Column(Integer, ForeignKey('prompts.id'), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    prompt_id = Column(Integer, nullable=False, index=True)
     document_id = Column(String, nullable=False)
     similarity_score = Column(Float, nullable=False)
 
     # Use safe Python attribute, map to DB column "metadata"
     meta_data = Column("metadata", JSON, nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    prompt = relationship("Prompt", back_populates="retrievals")
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    prompt = relationship("Prompt", primaryjoin="Prompt.id == foreign(Retrieval.prompt_id)", back_populates="retrievals")
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
 class Response(Base):
     __tablename__ = 'responses'
-    id = Column(Integer, primary_key=True, index=True)
-    prompt_id = Column(Integer, ForeignKey('prompts.id'), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    prompt_id = Column(Integer, nullable=False, index=True)
     text = Column(String, nullable=False)
     token_stream = Column(JSON, nullable=True)  # List of tokens
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    prompt = relationship("Prompt", back_populates="responses")
-    hallucination_checks = relationship("HallucinationCheck", back_populates="response", cascade="all, delete-orphan")
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    prompt = relationship("Prompt", primaryjoin="Prompt.id == foreign(Response.prompt_id)", back_populates="responses")
+    hallucination_checks = relationship(
+        "HallucinationCheck",
+        primaryjoin="Response.id == foreign(HallucinationCheck.response_id)",
+        back_populates="response",
+        cascade="all, delete-orphan",
+    )
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
 class HallucinationCheck(Base):
     __tablename__ = 'hallucination_checks'
-    id = Column(Integer, primary_key=True, index=True)
-    response_id = Column(Integer, ForeignKey('responses.id'), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    response_id = Column(Integer, nullable=False)
     groundedness_score = Column(Float, nullable=False)
     unsupported_sentences = Column(JSON, nullable=True)  # List of unsupported sentences
     entailment_results = Column(JSON, nullable=True)  # Sentence-level entailment
-    checked_at = Column(DateTime(timezone=True), server_default=func.now())
-    response = relationship("Response", back_populates="hallucination_checks")
+    checked_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    response = relationship(
+        "Response", primaryjoin="Response.id == foreign(HallucinationCheck.response_id)", back_populates="hallucination_checks"
+    )
+    __table_args__ = (
+        # Latest check per response
+        Index("ix_hallucination_checks_response_id_checked_at", "response_id", "checked_at"),
+        {"postgresql_partition_by": "RANGE (checked_at)"},
+    )
 
 class Telemetry(Base):
     __tablename__ = 'telemetry'
-    id = Column(Integer, primary_key=True, index=True)
-    prompt_id = Column(Integer, ForeignKey('prompts.id'), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    prompt_id = Column(Integer, nullable=False, index=True)
     embedding_latency_ms = Column(Float, nullable=True)
     retrieval_latency_ms = Column(Float, nullable=True)
     llm_latency_ms = Column(Float, nullable=True)
@@ -70,5 +117,11 @@ class Telemetry(Base):
     embedding_tokens = Column(Integer, nullable=True)
     completion_tokens = Column(Integer, nullable=True)
     api_cost = Column(Float, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    prompt = relationship("Prompt", back_populates="telemetry")
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    prompt = relationship("Prompt", primaryjoin="Prompt.id == foreign(Telemetry.prompt_id)", back_populates="telemetry")
+    __table_args__ = (
+        # Latency and cost filters of the trace list
+        Index("ix_telemetry_total_latency_ms", "total_latency_ms"),
+        Index("ix_telemetry_api_cost", "api_cost"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
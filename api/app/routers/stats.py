@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import List, Literal, Optional
+from ..core.database import get_async_db
+from ..models import rollups
+from ..schemas import stats as schemas
+from ..services.rollups import GROUNDEDNESS_BINS, histogram_percentiles
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+Granularity = Literal["minute", "hour"]
+
+def _time_range(start: Optional[datetime], end: Optional[datetime]):
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(hours=24)
+    return start, end
+
+@router.get("/latency", response_model=List[schemas.LatencyBucket])
+async def latency_stats(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: Granularity = "minute",
+    metric: Literal["embedding", "retrieval", "llm", "total"] = "total",
+    db: AsyncSession = Depends(get_async_db),
+):
+    start, end = _time_range(start, end)
+    h = rollups.LatencyHistogramRollup
+    rows = (await db.execute(
+        select(h.bucket_start, h.bin, h.count)
+        .where(h.granularity == granularity, h.metric == metric, h.bucket_start >= start, h.bucket_start < end)
+        .order_by(h.bucket_start, h.bin)
+    )).all()
+    buckets = []
+    for bucket_start, group in groupby(rows, key=lambda r: r.bucket_start):
+        bins = [(r.bin, r.count) for r in group]
+        p50, p95, p99 = histogram_percentiles(bins, (0.5, 0.95, 0.99))
+        buckets.append(schemas.LatencyBucket(
+            bucket_start=bucket_start, count=round(sum(c for _, c in bins)), p50_ms=p50, p95_ms=p95, p99_ms=p99
+        ))
+    return buckets
+
+@router.get("/usage", response_model=List[schemas.UsageBucket])
+async def usage_stats(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: Granularity = "minute",
+    db: AsyncSession = Depends(get_async_db),
+):
+    start, end = _time_range(start, end)
+    t = rollups.TelemetryRollup
+    rows = (await db.scalars(
+        select(t)
+        .where(t.granularity == granularity, t.bucket_start >= start, t.bucket_start < end)
+        .order_by(t.bucket_start)
+    )).all()
+    # Counts and sums are estimates weighted by 1/sample_rate; stored_traces is exact
+    return [
+        schemas.UsageBucket(
+            bucket_start=r.bucket_start,
+            traces=round(r.estimated_count),
+            stored_traces=r.trace_count,
+            embedding_tokens=round(r.sum_embedding_tokens),
+            completion_tokens=round(r.sum_completion_tokens),
+            api_cost=r.sum_api_cost,
+            avg_embedding_latency_ms=r.sum_embedding_latency_ms / r.estimated_count if r.estimated_count else None,
+            avg_retrieval_latency_ms=r.sum_retrieval_latency_ms / r.estimated_count if r.estimated_count else None,
+            avg_llm_latency_ms=r.sum_llm_latency_ms / r.estimated_count if r.estimated_count else None,
+            avg_total_latency_ms=r.sum_total_latency_ms / r.estimated_count if r.estimated_count else None,
+        )
+        for r in rows
+    ]
+
+@router.get("/groundedness", response_model=List[schemas.GroundednessBin])
+async def groundedness_stats(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: Granularity = "minute",
+    db: AsyncSession = Depends(get_async_db),
+):
+    start, end = _time_range(start, end)
+    g = rollups.GroundednessRollup
+    counts = dict((await db.execute(
+        select(g.bin, func.sum(g.count))
+        .where(g.granularity == granularity, g.bucket_start >= start, g.bucket_start < end)
+        .group_by(g.bin)
+    )).all())
+    width = 1.0 / GROUNDEDNESS_BINS
+    return [
+        schemas.GroundednessBin(lower=i * width, upper=(i + 1) * width, count=round(counts.get(i, 0)))
+        for i in range(GROUNDEDNESS_BINS)
+    ]
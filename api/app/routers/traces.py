@@ -1,127 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-import json
-from ..core.database import get_db
-from ..models import tracing
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Optional
+from ..core.database import get_async_db
+from ..models.tracing import EMBEDDING_DIM
 from ..schemas import traces as schemas
-from ..core import minio_utils
+from ..services import ingest, queries
 
 router = APIRouter(prefix="/traces", tags=["traces"])
 
-@router.post("/", response_model=schemas.TraceOut)
-def create_trace(trace: schemas.TraceIn, db: Session = Depends(get_db)):
-    # Create Prompt
-    prompt = tracing.Prompt(
-        user_query=trace.user_query,
-        system_prompt=trace.system_prompt,
-        final_prompt=trace.final_prompt
-    )
-    db.add(prompt)
-    db.commit()
-    db.refresh(prompt)
-    # Add Embedding
-    embedding = tracing.Embedding(
-        vector=trace.embedding.vector,
-        prompt_id=prompt.id,
-        retrieval_candidates=trace.embedding.retrieval_candidates
-    )
-    db.add(embedding)
-    db.commit()
-    db.refresh(embedding)
-    # Add Retrievals
-    for r in trace.retrievals:
-        retrieval = tracing.Retrieval(
-            prompt_id=prompt.id,
-            document_id=r.document_id,
-            similarity_score=r.similarity_score,
-            metadata=r.metadata
-        )
-        db.add(retrieval)
-    db.commit()
-    # Add Response
-    response = tracing.Response(
-        prompt_id=prompt.id,
-        text=trace.response.text,
-        token_stream=trace.response.token_stream
-    )
-    db.add(response)
-    db.commit()
-    db.refresh(response)
-    # Add HallucinationCheck
-    if trace.response.hallucination_check:
-        hc = trace.response.hallucination_check
-        hallucination = tracing.HallucinationCheck(
-            response_id=response.id,
-            groundedness_score=hc.groundedness_score,
-            unsupported_sentences=hc.unsupported_sentences,
-            entailment_results=hc.entailment_results
-        )
-        db.add(hallucination)
-        db.commit()
-    # Add Telemetry
-    telemetry = tracing.Telemetry(
-        prompt_id=prompt.id,
-        embedding_latency_ms=trace.telemetry.embedding_latency_ms,
-        retrieval_latency_ms=trace.telemetry.retrieval_latency_ms,
-        llm_latency_ms=trace.telemetry.llm_latency_ms,
-        total_latency_ms=trace.telemetry.total_latency_ms,
-        embedding_tokens=trace.telemetry.embedding_tokens,
-        completion_tokens=trace.telemetry.completion_tokens,
-        api_cost=trace.telemetry.api_cost
+def _trace_response(document: str) -> Response:
+    # Postgres already serialized the TraceOut document; skip validation and encoding
+    return Response(content=document, media_type="application/json")
+
+@router.post(
+    "/",
+    response_model=None,
+    responses={200: {"model": schemas.TraceOut, "description": "The stored trace, serialized by Postgres."}},
+)
+async def create_trace(trace: schemas.TraceIn, db: AsyncSession = Depends(get_async_db)):
+    prompt_id = (await ingest.store_traces(db, [trace]))[0]
+    return _trace_response(await queries.trace_json(db, prompt_id))
+
+@router.post("/batch", response_model=schemas.TraceBatchOut)
+async def create_traces(traces: List[schemas.TraceIn], db: AsyncSession = Depends(get_async_db)):
+    return schemas.TraceBatchOut(ids=await ingest.store_traces(db, traces))
+
+@router.post("/similar", response_model=List[schemas.SimilarTrace])
+async def similar_traces(query: schemas.SimilarTracesIn, db: AsyncSession = Depends(get_async_db)):
+    vector = query.array()
+    if vector is None:
+        vector = await queries.trace_vector(db, query.trace_id)
+        if vector is None:
+            raise HTTPException(status_code=404, detail="Trace embedding not found")
+    if vector.shape != (EMBEDDING_DIM,):
+        raise HTTPException(status_code=422, detail=f"vector must have {EMBEDDING_DIM} dimensions")
+    return await queries.similar_traces(
+        db,
+        vector,
+        k=query.k,
+        ef_search=query.ef_search,
+        exact=query.exact,
+        exclude_prompt_id=query.trace_id,
     )
-    db.add(telemetry)
-    db.commit()
-    db.refresh(telemetry)
-    
-    # Store data in MinIO if requested
-    if trace.store_embedding_dump:
-        embedding_data = {
-            "prompt_id": prompt.id,
-            "vector": trace.embedding.vector,
-            "retrieval_candidates": trace.embedding.retrieval_candidates
-        }
-        minio_utils.upload_data(
-            "embeddings",
-            f"embedding_{prompt.id}.json",
-            json.dumps(embedding_data).encode('utf-8'),
-            "application/json"
-        )
-    
-    if trace.store_retrieval_logs:
-        retrieval_data = [
-            {
-                "document_id": r.document_id,
-                "similarity_score": r.similarity_score,
-                "metadata": r.metadata
-            }
-            for r in trace.retrievals
-        ]
-        minio_utils.upload_data(
-            "retrievals",
-            f"retrieval_{prompt.id}.json",
-            json.dumps(retrieval_data).encode('utf-8'),
-            "application/json"
-        )
-    
-    if trace.store_response_logs:
-        response_data = {
-            "prompt_id": prompt.id,
-            "text": trace.response.text,
-            "token_stream": trace.response.token_stream,
-            "hallucination_check": trace.response.hallucination_check
-        }
-        minio_utils.upload_data(
-            "responses",
-            f"response_{prompt.id}.json",
-            json.dumps(response_data).encode('utf-8'),
-            "application/json"
+
+@router.get("", response_model=schemas.TracePage)
+async def list_traces(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    min_latency_ms: Optional[float] = None,
+    max_latency_ms: Optional[float] = None,
+    min_cost: Optional[float] = None,
+    max_cost: Optional[float] = None,
+    min_groundedness: Optional[float] = None,
+    max_groundedness: Optional[float] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        items, next_cursor = await queries.list_traces(
+            db,
+            limit=limit,
+            cursor=cursor,
+            start=start,
+            end=end,
+            min_latency_ms=min_latency_ms,
+            max_latency_ms=max_latency_ms,
+            min_cost=min_cost,
+            max_cost=max_cost,
+            min_groundedness=min_groundedness,
+            max_groundedness=max_groundedness,
         )
-    
-    return schemas.TraceOut.from_orm(prompt)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return schemas.TracePage(items=items, next_cursor=next_cursor)
 
-@router.get("/{prompt_id}", response_model=schemas.TraceOut)
-def get_trace(prompt_id: int, db: Session = Depends(get_db)):
-    prompt = db.query(tracing.Prompt).filter(tracing.Prompt.id == prompt_id).first()
-    if not prompt:
+@router.get(
+    "/{prompt_id}",
+    response_model=None,
+    responses={200: {
+        "model": schemas.TraceFieldsOut,
+        "description": "The trace as in TraceOut. Keys not listed in fields are absent, and with "
+        "include_vectors=false every embedding has a null vector.",
+    }},
+)
+async def get_trace(
+    prompt_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return; id is always included"),
+    include_vectors: bool = True,
+    db: AsyncSession = Depends(get_async_db),
+):
+    selected = None
+    if fields is not None:
+        selected = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = selected - set(queries.TRACE_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    document = await queries.trace_json(db, prompt_id, fields=selected, include_vectors=include_vectors)
+    if document is None:
         raise HTTPException(status_code=404, detail="Trace not found")
-    return schemas.TraceOut.from_orm(prompt)
+    return _trace_response(document)
@@ -0,0 +1,222 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+import asyncio
+import json
+import logging
+import os
+from ..core.database import AsyncSessionLocal
+from ..core.pubsub import trace_events
+from ..core.segmenter import IncrementalSegmenter
+from ..core.tasks import enqueue_precheck
+from ..schemas import traces as schemas
+from ..services import ingest
+
+router = APIRouter(tags=["websocket"])
+
+logger = logging.getLogger(__name__)
+
+# Batch frames a client may have in flight before it waits for acks
+WS_INGEST_WINDOW = int(os.getenv("WS_INGEST_WINDOW", "8"))
+WS_MAX_BATCH_SIZE = int(os.getenv("WS_MAX_BATCH_SIZE", "500"))
+# Responses a /ws/stream connection may stream at once, and the text accepted per response
+WS_MAX_STREAMS = int(os.getenv("WS_MAX_STREAMS", "16"))
+WS_MAX_STREAM_CHARS = int(os.getenv("WS_MAX_STREAM_CHARS", "200000"))
+
+
+async def _send(websocket: WebSocket, message: dict) -> None:
+    # Batches already received are stored even if the client has gone away
+    try:
+        await websocket.send_json(message)
+    except Exception:
+        logger.debug("Dropped websocket frame for a closed connection")
+
+
+async def _send_error(websocket: WebSocket, seq, detail) -> None:
+    await _send(websocket, {"type": "error", "seq": seq, "detail": detail})
+
+
+async def _store_batches(websocket: WebSocket, frames: asyncio.Queue) -> None:
+    """Persist queued batch frames in order and ack each with its prompt ids."""
+    while True:
+        frame = await frames.get()
+        if frame is None:
+            return
+        seq = frame.get("seq")
+        try:
+            traces = [schemas.TraceIn.parse_obj(t) for t in frame.get("traces") or []]
+        except ValidationError as e:
+            await _send_error(websocket, seq, json.loads(e.json()))
+            continue
+        try:
+            async with AsyncSessionLocal() as db:
+                ids = await ingest.store_traces(db, traces)
+        except Exception:
+            logger.exception("Failed to store websocket batch %s", seq)
+            await _send_error(websocket, seq, "Failed to store batch")
+            continue
+        await _send(websocket, {"type": "ack", "seq": seq, "ids": ids})
+
+
+@router.websocket("/ws/traces")
+async def ingest_traces(websocket: WebSocket):
+    """
+    Persistent ingestion channel.
+
+    The client sends {"type": "batch", "seq": n, "traces": [...]} frames, where
+    each trace has the POST /traces/ body, and receives {"type": "ack", "seq": n,
+    "ids": [...]} or {"type": "error", "seq": n, "detail": ...} per frame, in
+    order. The opening {"type": "ready", "window": w} frame tells the client how
+    many unacknowledged batches it may send; beyond that the server stops
+    reading and TCP backpressure applies.
+    """
+    await websocket.accept()
+    await websocket.send_json({"type": "ready", "window": WS_INGEST_WINDOW, "max_batch_size": WS_MAX_BATCH_SIZE})
+    frames = asyncio.Queue(WS_INGEST_WINDOW)
+    writer = asyncio.create_task(_store_batches(websocket, frames))
+    try:
+        while not writer.done():
+            try:
+                frame = json.loads(await websocket.receive_text())
+            except ValueError:
+                await _send_error(websocket, None, "Invalid JSON")
+                continue
+            if not isinstance(frame, dict) or frame.get("type") != "batch":
+                await _send_error(websocket, None, "Expected a batch frame")
+                continue
+            if len(frame.get("traces") or []) > WS_MAX_BATCH_SIZE:
+                await _send_error(websocket, frame.get("seq"), f"Batch exceeds {WS_MAX_BATCH_SIZE} traces")
+                continue
+            await frames.put(frame)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if not writer.done():
+            await frames.put(None)
+        await writer
+
+
+def _documents(retrievals) -> list:
+    # The premises the worker checks against: the text of each retrieval with metadata
+    docs = []
+    for r in retrievals:
+        metadata = schemas.RetrievalIn.parse_obj(r).metadata
+        if metadata:
+            docs.append(metadata.get("text", "") if isinstance(metadata, dict) else "")
+    return docs
+
+
+async def _stream_error(websocket: WebSocket, stream_id, detail) -> None:
+    await _send(websocket, {"type": "error", "stream": stream_id, "detail": detail})
+
+
+class _ResponseStream:
+    __slots__ = ("docs", "segmenter", "chars")
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.segmenter = IncrementalSegmenter()
+        self.chars = 0
+
+
+@router.websocket("/ws/stream")
+async def stream_responses(websocket: WebSocket):
+    """
+    Pre-check LLM responses while they are generated.
+
+    The client opens a response with {"type": "stream_start", "stream": id,
+    "retrievals": [...]}, sends its deltas as {"type": "tokens", "stream": id,
+    "text": "..."} and closes it with {"type": "stream_end", "stream": id}.
+    Each sentence is published to the worker as soon as it is complete, which
+    scores it into the entailment cache; the check that runs when the trace
+    is stored then only has the last sentences left. Nothing is stored here
+    and only {"type": "error", ...} frames are sent back.
+    """
+    await websocket.accept()
+    loop = asyncio.get_running_loop()
+    streams = {}
+
+    def precheck(stream: _ResponseStream, sentences):
+        if sentences and stream.docs:
+            # Publishing blocks on the broker; keep it off the event loop
+            loop.run_in_executor(None, enqueue_precheck, sentences, stream.docs)
+
+    try:
+        while True:
+            try:
+                frame = json.loads(await websocket.receive_text())
+            except ValueError:
+                await _send_error(websocket, None, "Invalid JSON")
+                continue
+            if not isinstance(frame, dict):
+                await _send_error(websocket, None, "Expected an object")
+                continue
+            kind, stream_id = frame.get("type"), frame.get("stream")
+            if kind == "stream_start":
+                if len(streams) >= WS_MAX_STREAMS:
+                    await _stream_error(websocket, stream_id, f"More than {WS_MAX_STREAMS} open streams")
+                    continue
+                try:
+                    docs = _documents(frame.get("retrievals") or [])
+                except ValidationError as e:
+                    await _stream_error(websocket, stream_id, json.loads(e.json()))
+                    continue
+                streams[stream_id] = _ResponseStream(docs)
+            elif kind in ("tokens", "stream_end"):
+                stream = streams.get(stream_id)
+                if stream is None:
+                    await _stream_error(websocket, stream_id, "Unknown stream")
+                    continue
+                if kind == "stream_end":
+                    del streams[stream_id]
+                    precheck(stream, stream.segmenter.finish())
+                    continue
+                delta = frame.get("text") or ""
+                stream.chars += len(delta)
+                if stream.chars > WS_MAX_STREAM_CHARS:
+                    del streams[stream_id]
+                    await _stream_error(websocket, stream_id, f"Stream exceeds {WS_MAX_STREAM_CHARS} characters")
+                    continue
+                precheck(stream, stream.segmenter.feed(delta))
+            else:
+                await _stream_error(websocket, stream_id, "Expected a stream_start, tokens or stream_end frame")
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/ws/traces/live")
+async def live_traces(websocket: WebSocket):
+    """
+    Stream summaries of newly stored traces as {"type": "trace", "trace": {...}}.
+
+    Each subscriber has a bounded buffer. If the client falls behind, the oldest
+    summaries are dropped and a {"type": "dropped", "count": n} frame reports
+    how many were lost. Traces stored by every API process are seen; they
+    reach this one through trace_relay.
+    """
+    await websocket.accept()
+    subscription = trace_events.subscribe()
+
+    async def forward():
+        reported = 0
+        while True:
+            message = await subscription.get()
+            if subscription.dropped != reported:
+                await websocket.send_json({"type": "dropped", "count": subscription.dropped - reported})
+                reported = subscription.dropped
+            await websocket.send_text(message)
+
+    async def wait_disconnect():
+        # Clients do not send anything; receiving only detects the close
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    tasks = [asyncio.create_task(forward()), asyncio.create_task(wait_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        trace_events.unsubscribe(subscription)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class LatencyBucket(BaseModel):
+    bucket_start: datetime
+    count: int
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    p99_ms: Optional[float]
+
+class UsageBucket(BaseModel):
+    bucket_start: datetime
+    traces: int  # estimated from sampled traces
+    stored_traces: int
+    embedding_tokens: int
+    completion_tokens: int
+    api_cost: float
+    avg_embedding_latency_ms: Optional[float]
+    avg_retrieval_latency_ms: Optional[float]
+    avg_llm_latency_ms: Optional[float]
+    avg_total_latency_ms: Optional[float]
+
+class GroundednessBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
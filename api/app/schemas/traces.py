@@ -1,10 +1,41 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Any
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+from typing import List, Literal, Optional, Any
+from datetime import datetime
+import numpy as np
+from ..core.vectors import VECTOR_DTYPES, decode_vector
+from ..models.tracing import EMBEDDING_DIM
 
-class EmbeddingIn(BaseModel):
-    vector: List[float]
+class EmbeddingBase(BaseModel):
+    # Either a JSON float list or base64 little-endian bytes (vector_b64 + vector_dtype)
+    vector: Optional[List[float]] = None
+    vector_b64: Optional[str] = None
+    vector_dtype: Optional[str] = None
     retrieval_candidates: Optional[List[Any]] = None
 
+class EmbeddingIn(EmbeddingBase):
+    _array: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def check_vector(self):
+        # Decoded once here and kept for the insert; an empty vector means no embedding
+        if self.vector_b64 is not None:
+            dtype = self.vector_dtype or "float32"
+            if dtype not in VECTOR_DTYPES:
+                raise ValueError(f"vector_dtype must be one of {sorted(VECTOR_DTYPES)}")
+            array = decode_vector(self.vector_b64, dtype)
+        elif self.vector is not None:
+            array = np.asarray(self.vector, dtype=np.float32)
+        else:
+            raise ValueError("either vector or vector_b64 is required")
+        if array.size and array.shape != (EMBEDDING_DIM,):
+            raise ValueError(f"vector must have {EMBEDDING_DIM} dimensions, got {array.size}")
+        self._array = array
+        return self
+
+    def array(self) -> np.ndarray:
+        """The embedding as a float32 array, whichever encoding it arrived in."""
+        return self._array
+
 class RetrievalIn(BaseModel):
     document_id: str
     similarity_score: float
@@ -33,10 +64,15 @@ class TraceIn(BaseModel):
     user_query: str
     system_prompt: Optional[str] = None
     final_prompt: str
-    embedding: EmbeddingIn
-    retrievals: List[RetrievalIn]
+    # Compact payloads leave out what was not recorded
+    embedding: Optional[EmbeddingIn] = None
+    retrievals: List[RetrievalIn] = []
     response: ResponseIn
-    telemetry: TelemetryIn
+    telemetry: TelemetryIn = TelemetryIn()
+    # Probability the trace survived client-side sampling; stats weight it by 1/sample_rate
+    sample_rate: float = Field(1.0, gt=0, le=1)
+    # Queue for the worker's hallucination check when none is supplied (default: risk-based)
+    check_priority: Optional[Literal["high", "default", "low"]] = None
     # MinIO storage fields
     store_embedding_dump: Optional[bool] = False
     store_retrieval_logs: Optional[bool] = False
@@ -44,6 +80,9 @@ class TraceIn(BaseModel):
 
 
 # Output Schemas
+class TraceBatchOut(BaseModel):
+    ids: List[int]
+
 class HallucinationCheckOut(HallucinationCheckIn):
     id: int
     class Config:
@@ -60,7 +99,8 @@ class RetrievalOut(RetrievalIn):
     class Config:
         orm_mode = True
 
-class EmbeddingOut(EmbeddingIn):
+class EmbeddingOut(EmbeddingBase):
+    # No input validation: vector is null in GET /traces/{id}?include_vectors=false
     id: int
     class Config:
         orm_mode = True
@@ -81,3 +121,69 @@ class TraceOut(BaseModel):
     telemetry: Optional[TelemetryOut]
     class Config:
         orm_mode = True
+
+class TraceFieldsOut(BaseModel):
+    # GET /traces/{id}: TraceOut limited to ?fields= (id always present);
+    # embeddings carry a null vector with ?include_vectors=false
+    id: int
+    user_query: Optional[str] = None
+    system_prompt: Optional[str] = None
+    final_prompt: Optional[str] = None
+    embeddings: Optional[List[EmbeddingOut]] = None
+    retrievals: Optional[List[RetrievalOut]] = None
+    responses: Optional[List[ResponseOut]] = None
+    telemetry: Optional[TelemetryOut] = None
+
+class TraceSummary(BaseModel):
+    # List-view projection: no vectors, token streams or final prompt
+    id: int
+    created_at: datetime
+    user_query: str
+    system_prompt: Optional[str]
+    response_text: Optional[str]
+    groundedness_score: Optional[float]
+    embedding_latency_ms: Optional[float]
+    retrieval_latency_ms: Optional[float]
+    llm_latency_ms: Optional[float]
+    total_latency_ms: Optional[float]
+    embedding_tokens: Optional[int]
+    completion_tokens: Optional[int]
+    api_cost: Optional[float]
+    class Config:
+        orm_mode = True
+
+class SimilarTracesIn(BaseModel):
+    # Query by an explicit embedding (JSON or base64, as in EmbeddingIn) or by a stored trace
+    vector: Optional[List[float]] = None
+    vector_b64: Optional[str] = None
+    vector_dtype: Optional[str] = None
+    trace_id: Optional[int] = None
+    k: int = Field(10, ge=1, le=100)
+    ef_search: Optional[int] = Field(None, ge=1, le=1000)
+    exact: bool = False
+    _array: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def check_query(self):
+        given = [name for name in ("vector", "vector_b64", "trace_id") if getattr(self, name) is not None]
+        if len(given) != 1:
+            raise ValueError("exactly one of vector, vector_b64 or trace_id is required")
+        if self.vector_b64 is not None:
+            dtype = self.vector_dtype or "float32"
+            if dtype not in VECTOR_DTYPES:
+                raise ValueError(f"vector_dtype must be one of {sorted(VECTOR_DTYPES)}")
+            self._array = decode_vector(self.vector_b64, dtype)
+        elif self.vector is not None:
+            self._array = np.asarray(self.vector, dtype=np.float32)
+        return self
+
+    def array(self) -> Optional[np.ndarray]:
+        """The query vector as a float32 array, or None when querying by trace_id."""
+        return self._array
+
+class SimilarTrace(TraceSummary):
+    distance: float
+
+class TracePage(BaseModel):
+    items: List[TraceSummary]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,59 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import os
+from ..schemas import traces as schemas
+
+# Responses stored without a client-supplied hallucination_check are checked by
+# the worker. Ingest publishes them right after the commit; the sweeper below
+# catches any that were lost (broker down, API restarted before publishing).
+HALLUCINATION_AUTO_CHECK = os.getenv("HALLUCINATION_AUTO_CHECK", "true").lower() in ("1", "true", "yes")
+# Retrieval similarity bounds for the risk-based priority: weak best matches are
+# checked first, strong ones are deferred
+HALLUCINATION_HIGH_RISK_SIMILARITY = float(os.getenv("HALLUCINATION_HIGH_RISK_SIMILARITY", "0.5"))
+HALLUCINATION_LOW_RISK_SIMILARITY = float(os.getenv("HALLUCINATION_LOW_RISK_SIMILARITY", "0.85"))
+# The sweeper looks back this far, leaving responses younger than the grace period to ingest
+HALLUCINATION_SWEEP_WINDOW_HOURS = float(os.getenv("HALLUCINATION_SWEEP_WINDOW_HOURS", "24"))
+HALLUCINATION_SWEEP_GRACE_SECONDS = int(os.getenv("HALLUCINATION_SWEEP_GRACE_SECONDS", "300"))
+HALLUCINATION_SWEEP_MAX_ROWS = int(os.getenv("HALLUCINATION_SWEEP_MAX_ROWS", "10000"))
+
+
+def check_priority(trace: schemas.TraceIn, stripped: bool = False) -> Optional[str]:
+    """
+    Queue priority for checking a trace's response, or None if it needs no check.
+
+    An explicit check_priority on the trace wins. Otherwise traces stored
+    without their heavy fields by sampling are deferred, and the rest are
+    ranked by their best retrieval similarity.
+    """
+    if trace.response.hallucination_check is not None:
+        return None
+    if trace.check_priority is not None:
+        return trace.check_priority
+    if stripped:
+        return "low"
+    best = max((r.similarity_score for r in trace.retrievals), default=None)
+    if best is None or best < HALLUCINATION_HIGH_RISK_SIMILARITY:
+        return "high"
+    if best >= HALLUCINATION_LOW_RISK_SIMILARITY:
+        return "low"
+    return "default"
+
+
+def missing_checks(db: Session) -> List[int]:
+    """Ids of recent responses that have no hallucination check yet, oldest first."""
+    return db.execute(
+        text(
+            "SELECT r.id FROM responses r "
+            "WHERE r.created_at >= now() - make_interval(secs => :window) "
+            "AND r.created_at < now() - make_interval(secs => :grace) "
+            "AND NOT EXISTS (SELECT 1 FROM hallucination_checks hc "
+            "WHERE hc.response_id = r.id AND hc.checked_at >= r.created_at) "
+            "ORDER BY r.created_at LIMIT :max_rows"
+        ),
+        {
+            "window": HALLUCINATION_SWEEP_WINDOW_HOURS * 3600,
+            "grace": HALLUCINATION_SWEEP_GRACE_SECONDS,
+            "max_rows": HALLUCINATION_SWEEP_MAX_ROWS,
+        },
+    ).scalars().all()
@@ -0,0 +1,141 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Optional
+import os
+from ..core.parquet import json_string, stream_to_minio
+from ..models.tracing import EMBEDDING_DIM
+
+EXPORT_BUCKET = os.getenv("EXPORT_BUCKET", "trace-exports")
+EXPORT_PREFIX = os.getenv("EXPORT_PREFIX", "traces")
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+
+# One row per trace. Child rows are never older than their prompt, so the
+# "created_at >= p.created_at" bounds let Postgres skip older partitions.
+_EXPORT_SQL = """
+SELECT p.id AS trace_id,
+       p.created_at,
+       p.user_query,
+       p.system_prompt,
+       p.final_prompt,
+       r.text AS response_text,
+       e.vector::real[] AS embedding,
+       e.retrieval_candidates,
+       (SELECT json_agg(json_build_object(
+                   'document_id', rt.document_id,
+                   'similarity_score', rt.similarity_score,
+                   'metadata', rt.metadata) ORDER BY rt.id)
+          FROM retrievals rt
+         WHERE rt.prompt_id = p.id AND rt.created_at >= p.created_at) AS retrievals,
+       t.embedding_latency_ms,
+       t.retrieval_latency_ms,
+       t.llm_latency_ms,
+       t.total_latency_ms,
+       t.embedding_tokens,
+       t.completion_tokens,
+       t.api_cost,
+       p.sample_rate,
+       hc.groundedness_score,
+       hc.unsupported_sentences,
+       hc.entailment_results,
+       hc.checked_at
+FROM prompts p
+LEFT JOIN LATERAL (
+    SELECT id, text, created_at FROM responses
+    WHERE prompt_id = p.id AND created_at >= p.created_at ORDER BY id LIMIT 1
+) r ON true
+LEFT JOIN LATERAL (
+    SELECT vector, retrieval_candidates FROM embeddings
+    WHERE prompt_id = p.id AND created_at >= p.created_at ORDER BY id LIMIT 1
+) e ON true
+LEFT JOIN LATERAL (
+    SELECT * FROM telemetry
+    WHERE prompt_id = p.id AND created_at >= p.created_at ORDER BY id LIMIT 1
+) t ON true
+LEFT JOIN LATERAL (
+    SELECT groundedness_score, unsupported_sentences, entailment_results, checked_at FROM hallucination_checks
+    WHERE response_id = r.id AND checked_at >= r.created_at ORDER BY checked_at DESC, id DESC LIMIT 1
+) hc ON true
+WHERE p.created_at >= :start AND p.created_at < :end
+ORDER BY p.created_at, p.id
+"""
+
+
+def export_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("trace_id", pa.int64()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("user_query", pa.string()),
+        ("system_prompt", pa.string()),
+        ("final_prompt", pa.string()),
+        ("response_text", pa.string()),
+        ("embedding", pa.list_(pa.float32(), EMBEDDING_DIM)),
+        ("retrieval_candidates", pa.string()),  # JSON
+        ("retrievals", pa.list_(pa.struct([
+            ("document_id", pa.string()),
+            ("similarity_score", pa.float64()),
+            ("metadata", pa.string()),  # JSON
+        ]))),
+        ("embedding_latency_ms", pa.float64()),
+        ("retrieval_latency_ms", pa.float64()),
+        ("llm_latency_ms", pa.float64()),
+        ("total_latency_ms", pa.float64()),
+        ("embedding_tokens", pa.int64()),
+        ("completion_tokens", pa.int64()),
+        ("api_cost", pa.float64()),
+        ("sample_rate", pa.float64()),  # weight rows by 1/sample_rate for totals
+        ("groundedness_score", pa.float64()),
+        ("unsupported_sentences", pa.list_(pa.string())),
+        ("entailment_results", pa.string()),  # JSON
+        ("checked_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+def _retrievals(value):
+    if value is None:
+        return []
+    return [dict(r, metadata=json_string(r.get("metadata"))) for r in value]
+
+
+_CONVERTERS = {
+    "retrieval_candidates": json_string,
+    "retrievals": _retrievals,
+    "entailment_results": json_string,
+}
+
+
+def object_name(day: date) -> str:
+    """Hive-style date partition, so readers can prune by date from the path alone."""
+    return f"{EXPORT_PREFIX}/date={day.isoformat()}/part-0.parquet"
+
+
+def export_day(db: Session, day: date, bucket: str = EXPORT_BUCKET) -> int:
+    """
+    Export the traces created on day (UTC) to one Parquet object; returns the row count.
+
+    Rows are read through a server-side cursor in batches of EXPORT_BATCH_ROWS
+    and written one row group per batch, so memory stays flat regardless of
+    volume. Re-running a day overwrites its object.
+    """
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    result = db.connection().execution_options(
+        stream_results=True, yield_per=EXPORT_BATCH_ROWS
+    ).execute(text(_EXPORT_SQL), {"start": start, "end": start + timedelta(days=1)})
+    try:
+        return stream_to_minio(result.partitions(), export_schema(), bucket, object_name(day), _CONVERTERS)
+    finally:
+        result.close()
+        db.rollback()
+
+
+def export_traces(db: Session, start: date, end: Optional[date] = None, bucket: str = EXPORT_BUCKET) -> Dict[str, int]:
+    """Export every UTC day in [start, end) (just start when end is omitted); returns rows per day."""
+    end = end or start + timedelta(days=1)
+    exported = {}
+    day = start
+    while day < end:
+        exported[day.isoformat()] = export_day(db, day, bucket)
+        day += timedelta(days=1)
+    return exported
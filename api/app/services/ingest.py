@@ -0,0 +1,229 @@
+from prometheus_client import Counter, Histogram
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from functools import partial
+from typing import List, Tuple
+import asyncio
+import time
+from ..models import tracing
+from ..schemas import traces as schemas
+from ..core.artifact_writer import artifact_writer
+from ..core.compression import gzip_json
+from ..core.pubsub import trace_relay
+from ..core.tasks import enqueue_checks
+from ..core.vectors import to_npy
+from .checks import HALLUCINATION_AUTO_CHECK, check_priority
+from .sampling import sample_traces
+
+TRACES_INGESTED = Counter("traces_ingested_total", "Traces stored (HTTP and websocket)")
+TRACES_FAILED = Counter("trace_ingest_failures_total", "Traces whose transaction failed")
+INGEST_BATCH_SIZE = Histogram(
+    "trace_ingest_batch_size",
+    "Traces per store_traces call (1 for POST /traces/, the batch size otherwise)",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+INGEST_DB_DURATION = Histogram(
+    "trace_ingest_db_duration_seconds",
+    "Time spent in the ingest transaction: the INSERTs, then the COMMIT",
+    ["phase"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+
+async def store_traces(db: AsyncSession, traces: List[schemas.TraceIn]) -> List[int]:
+    """
+    Insert all rows for a list of traces in a single transaction.
+
+    Each table gets one multi-row INSERT; prompt and response ids come back
+    through RETURNING (in parameter order) to fill in the foreign keys of the
+    dependent rows. Ingestion-side sampling strips heavy fields first (see
+    app.services.sampling). Once the commit lands, requested MinIO artifacts are
+    handed to the write-behind artifact writer, hallucination checks are
+    enqueued for responses that arrived without one, and trace summaries are
+    published to live subscribers. Returns the created prompt ids in input
+    order.
+    """
+    if not traces:
+        return []
+    INGEST_BATCH_SIZE.observe(len(traces))
+    try:
+        prompt_rows, response_ids, stripped = await _insert_traces(db, traces)
+    except Exception:
+        TRACES_FAILED.inc(len(traces))
+        raise
+    TRACES_INGESTED.inc(len(traces))
+    prompt_ids = [row.id for row in prompt_rows]
+
+    for prompt_id, t in zip(prompt_ids, traces):
+        for upload in artifact_uploads(prompt_id, t):
+            artifact_writer.submit(*upload)
+    if HALLUCINATION_AUTO_CHECK:
+        checks = [
+            (response_id, priority)
+            for response_id, t, was_stripped in zip(response_ids, traces, stripped)
+            if (priority := check_priority(t, was_stripped)) is not None
+        ]
+        if checks:
+            # Published off the request path; the sweeper retries anything lost
+            asyncio.get_running_loop().run_in_executor(None, enqueue_checks, checks)
+    if trace_relay.listening:
+        # Serialized once here, not once per subscriber
+        for row, t in zip(prompt_rows, traces):
+            trace_relay.publish(f'{{"type": "trace", "trace": {trace_summary(row, t).json()}}}')
+    return prompt_ids
+
+
+async def _insert_traces(db: AsyncSession, traces: List[schemas.TraceIn]) -> Tuple[list, List[int], List[bool]]:
+    """Sample, insert and commit; returns the prompt rows, response ids and stripped flags."""
+    start = time.perf_counter()
+    stripped = sample_traces(traces)
+    prompt_rows = (await db.execute(
+        insert(tracing.Prompt).returning(
+            tracing.Prompt.id, tracing.Prompt.created_at, sort_by_parameter_order=True
+        ),
+        [
+            {
+                "user_query": t.user_query,
+                "system_prompt": t.system_prompt,
+                "final_prompt": t.final_prompt,
+                "sample_rate": t.sample_rate,
+            }
+            for t in traces
+        ],
+    )).all()
+    prompt_ids = [row.id for row in prompt_rows]
+
+    embeddings = [
+        {
+            "prompt_id": prompt_id,
+            "vector": t.embedding.array(),
+            "retrieval_candidates": t.embedding.retrieval_candidates,
+        }
+        for prompt_id, t in zip(prompt_ids, traces)
+        if t.embedding is not None and t.embedding.array().size
+    ]
+    if embeddings:
+        await db.execute(insert(tracing.Embedding), embeddings)
+
+    retrievals = [
+        {
+            "prompt_id": prompt_id,
+            "document_id": r.document_id,
+            "similarity_score": r.similarity_score,
+            "meta_data": r.metadata,
+        }
+        for prompt_id, t in zip(prompt_ids, traces)
+        for r in t.retrievals
+    ]
+    if retrievals:
+        await db.execute(insert(tracing.Retrieval), retrievals)
+
+    response_ids = (await db.scalars(
+        insert(tracing.Response).returning(tracing.Response.id, sort_by_parameter_order=True),
+        [
+            {
+                "prompt_id": prompt_id,
+                "text": t.response.text,
+                "token_stream": t.response.token_stream,
+            }
+            for prompt_id, t in zip(prompt_ids, traces)
+        ],
+    )).all()
+
+    checks = [
+        {
+            "response_id": response_id,
+            "groundedness_score": t.response.hallucination_check.groundedness_score,
+            "unsupported_sentences": t.response.hallucination_check.unsupported_sentences,
+            "entailment_results": t.response.hallucination_check.entailment_results,
+        }
+        for response_id, t in zip(response_ids, traces)
+        if t.response.hallucination_check
+    ]
+    if checks:
+        await db.execute(insert(tracing.HallucinationCheck), checks)
+
+    await db.execute(
+        insert(tracing.Telemetry),
+        [
+            {"prompt_id": prompt_id, **t.telemetry.dict()}
+            for prompt_id, t in zip(prompt_ids, traces)
+        ],
+    )
+    committing = time.perf_counter()
+    INGEST_DB_DURATION.labels("insert").observe(committing - start)
+    await db.commit()
+    INGEST_DB_DURATION.labels("commit").observe(time.perf_counter() - committing)
+    return prompt_rows, response_ids, stripped
+
+
+def trace_summary(prompt_row, trace: schemas.TraceIn) -> schemas.TraceSummary:
+    """The list-view summary of a just-stored trace, built without reading it back."""
+    hc = trace.response.hallucination_check
+    return schemas.TraceSummary(
+        id=prompt_row.id,
+        created_at=prompt_row.created_at,
+        user_query=trace.user_query,
+        system_prompt=trace.system_prompt,
+        response_text=trace.response.text,
+        groundedness_score=hc.groundedness_score if hc else None,
+        **trace.telemetry.dict(),
+    )
+
+
+def artifact_uploads(prompt_id: int, trace: schemas.TraceIn) -> List[tuple]:
+    """
+    Build the (bucket, object_name, data, content_type) uploads requested by a trace.
+
+    Payloads are deferred so JSON encoding runs on the artifact writer threads.
+    JSON logs are stored gzipped (.json.gz); prompts and passage text compress
+    several-fold.
+    """
+    uploads = []
+    if trace.store_embedding_dump and trace.embedding is not None:
+        # The vector is stored as .npy; candidates stay JSON next to it
+        uploads.append((
+            "embeddings",
+            f"embedding_{prompt_id}.npy",
+            partial(to_npy, trace.embedding.array()),
+            "application/x-npy"
+        ))
+        if trace.embedding.retrieval_candidates is not None:
+            uploads.append((
+                "embeddings",
+                f"embedding_{prompt_id}_candidates.json.gz",
+                partial(gzip_json, trace.embedding.retrieval_candidates),
+                "application/gzip"
+            ))
+
+    if trace.store_retrieval_logs:
+        retrieval_data = [
+            {
+                "document_id": r.document_id,
+                "similarity_score": r.similarity_score,
+                "metadata": r.metadata
+            }
+            for r in trace.retrievals
+        ]
+        uploads.append((
+            "retrievals",
+            f"retrieval_{prompt_id}.json.gz",
+            partial(gzip_json, retrieval_data),
+            "application/gzip"
+        ))
+
+    if trace.store_response_logs:
+        hc = trace.response.hallucination_check
+        response_data = {
+            "prompt_id": prompt_id,
+            "text": trace.response.text,
+            "token_stream": trace.response.token_stream,
+            "hallucination_check": hc.dict() if hc else None
+        }
+        uploads.append((
+            "responses",
+            f"response_{prompt_id}.json.gz",
+            partial(gzip_json, response_data),
+            "application/gzip"
+        ))
+    return uploads
@@ -0,0 +1,272 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+from ..core.parquet import json_string, stream_to_minio
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES = {
+    "prompts": "created_at",
+    "embeddings": "created_at",
+    "retrievals": "created_at",
+    "responses": "created_at",
+    "hallucination_checks": "checked_at",
+    "telemetry": "created_at",
+}
+PARTITION_INTERVALS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+PARTITION_INTERVAL = os.getenv("PARTITION_INTERVAL", "day")
+# Partitions created ahead of now, so inserts never land in the default partition
+PARTITION_PREMAKE = int(os.getenv("PARTITION_PREMAKE", "7"))
+# Partitions whose whole range is older than this are dropped; 0 keeps everything
+PARTITION_RETENTION_DAYS = int(os.getenv("PARTITION_RETENTION_DAYS", "0"))
+PARTITION_ARCHIVE = os.getenv("PARTITION_ARCHIVE", "false").lower() in ("1", "true", "yes")
+PARTITION_ARCHIVE_BUCKET = os.getenv("PARTITION_ARCHIVE_BUCKET", "trace-archive")
+PARTITION_ARCHIVE_BATCH_ROWS = int(os.getenv("PARTITION_ARCHIVE_BATCH_ROWS", "10000"))
+
+_PARTITIONS_SQL = """
+SELECT c.relname AS name,
+       (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'FROM \\(''([^'']+)''\\)'))[1]::timestamptz AS lower,
+       (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \\(''([^'']+)''\\)'))[1]::timestamptz AS upper
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = CAST(:table AS regclass)
+ORDER BY lower NULLS FIRST
+"""
+
+
+def partition_name(table: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y%m%d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def interval_start(ts: datetime, interval: str = PARTITION_INTERVAL) -> datetime:
+    """Start (UTC midnight, Monday for weeks) of the interval containing ts."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    day = datetime(ts.year, ts.month, ts.day, tzinfo=timezone.utc)
+    if interval == "week":
+        day -= timedelta(days=day.weekday())
+    return day
+
+
+def list_partitions(db: Session, table: str) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """(name, lower, upper) of each range partition; the default partition has no bounds."""
+    return [tuple(row) for row in db.execute(text(_PARTITIONS_SQL), {"table": table}).all()]
+
+
+def create_partition(db: Session, table: str, lower: datetime, upper: datetime) -> str:
+    """
+    Create and attach the partition for [lower, upper).
+
+    Rows that already landed in the default partition for that range are
+    moved into the new partition first, otherwise ATTACH would fail.
+    """
+    column = PARTITIONED_TABLES[table]
+    name = partition_name(table, lower)
+    bounds = {"lower": lower, "upper": upper}
+    db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default_partition_name(table)} "
+            f"WHERE {column} >= :lower AND {column} < :upper RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    db.execute(text(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    ))
+    return name
+
+
+def ensure_partitions(db: Session, now: Optional[datetime] = None) -> List[str]:
+    """
+    Create partitions up to PARTITION_PREMAKE intervals ahead of now.
+
+    New ranges continue from the upper bound of the newest partition, so
+    changing PARTITION_INTERVAL only affects ranges not created yet.
+    """
+    now = now or datetime.now(timezone.utc)
+    step = PARTITION_INTERVALS[PARTITION_INTERVAL]
+    horizon = interval_start(now) + step * (PARTITION_PREMAKE + 1)
+    created = []
+    for table in PARTITIONED_TABLES:
+        uppers = [upper for _, _, upper in list_partitions(db, table) if upper is not None]
+        lower = max(uppers) if uppers else interval_start(now)
+        while lower < horizon:
+            created.append(create_partition(db, table, lower, lower + step))
+            lower += step
+        db.commit()
+    return created
+
+
+def retention_windows(
+    partitions: Dict[str, List[Tuple[str, Optional[datetime], Optional[datetime]]]], cutoff: datetime
+) -> List[Tuple[str, datetime, datetime, Dict[str, List[str]]]]:
+    """
+    Group expired partitions by the prompts partition whose rows they belong to.
+
+    partitions maps each table to its list_partitions() result. Each window is
+    (prompts partition, lower, upper, {table: partitions to drop}), oldest
+    first. Children are never older than their prompt, so a child partition
+    goes with the first prompts window whose upper bound covers its own; one
+    that no expired prompts partition covers is kept until its prompts expire.
+    """
+    windows = []
+    taken = set()
+    for prompts_partition, lower, upper in partitions.get("prompts", []):
+        if upper is None or upper > cutoff:
+            continue
+        tables = {}
+        for table in PARTITIONED_TABLES:
+            names = [
+                name
+                for name, _, child_upper in partitions.get(table, [])
+                if child_upper is not None and child_upper <= upper and (table, name) not in taken
+            ]
+            taken.update((table, name) for name in names)
+            tables[table] = names
+        windows.append((prompts_partition, lower, upper, tables))
+    return windows
+
+
+def expired_windows(db: Session, now: Optional[datetime] = None, retention_days: int = PARTITION_RETENTION_DAYS):
+    """retention_windows() of the partitions whose whole range is older than the retention period."""
+    if retention_days <= 0:
+        return []
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+    return retention_windows({table: list_partitions(db, table) for table in PARTITIONED_TABLES}, cutoff)
+
+
+def late_rows_filter(table: str, prompts_partition: str) -> str:
+    """
+    WHERE clause for rows of table newer than their prompts partition.
+
+    These belong to prompts in prompts_partition but landed in a later child
+    partition: a response written just after midnight, or a check run days
+    after its response. Binds :upper, the prompts partition's upper bound.
+    """
+    prompts = f"SELECT id FROM {prompts_partition}"
+    if table == "hallucination_checks":
+        parents = f"response_id IN (SELECT id FROM responses WHERE prompt_id IN ({prompts}))"
+    else:
+        parents = f"prompt_id IN ({prompts})"
+    return f"{PARTITIONED_TABLES[table]} >= :upper AND {parents}"
+
+
+# Checks reference responses, and every child references prompts, so parents go last
+_DROP_ORDER = ["hallucination_checks", "embeddings", "retrievals", "telemetry", "responses", "prompts"]
+
+
+def drop_expired_partitions(
+    db: Session,
+    now: Optional[datetime] = None,
+    retention_days: int = PARTITION_RETENTION_DAYS,
+    archive: bool = PARTITION_ARCHIVE,
+) -> List[str]:
+    """
+    Drop expired partitions one prompts window at a time, archiving first when enabled.
+
+    Retention follows the prompts partition: with it go the child partitions
+    of the same range and the late rows of its prompts in newer child
+    partitions, so no check, response or other child outlives its prompt.
+    Late rows are archived to <table>/<table partition>_late.parquet next to
+    the window's partitions. Each window is one transaction; one whose
+    archive fails is kept, along with every newer window, and retried on the
+    next run.
+    """
+    dropped = []
+    for prompts_partition, lower, upper, tables in expired_windows(db, now, retention_days):
+        bounds = {"upper": upper}
+        if archive:
+            try:
+                for table in _DROP_ORDER:
+                    for name in tables[table]:
+                        archive_partition(db, table, name)
+                    if table != "prompts":
+                        archive_rows(
+                            db, table, f"{table}/{partition_name(table, lower)}_late.parquet",
+                            late_rows_filter(table, prompts_partition), bounds,
+                        )
+            except Exception:
+                logger.exception("Failed to archive partitions up to %s; keeping them", prompts_partition)
+                db.rollback()
+                break
+        for table in _DROP_ORDER:
+            if table != "prompts":
+                db.execute(text(f"DELETE FROM {table} WHERE {late_rows_filter(table, prompts_partition)}"), bounds)
+        for table in _DROP_ORDER:
+            for name in tables[table]:
+                db.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+        db.commit()
+    return dropped
+
+
+def maintain_partitions(db: Session, now: Optional[datetime] = None) -> Dict[str, List[str]]:
+    return {"created": ensure_partitions(db, now), "dropped": drop_expired_partitions(db, now)}
+
+
+def _arrow_type(pa, data_type: str, udt_name: str):
+    if udt_name == "vector":
+        return pa.list_(pa.float32())
+    return {
+        "integer": pa.int32(),
+        "bigint": pa.int64(),
+        "smallint": pa.int16(),
+        "double precision": pa.float64(),
+        "real": pa.float32(),
+        "boolean": pa.bool_(),
+        "timestamp with time zone": pa.timestamp("us", tz="UTC"),
+        "timestamp without time zone": pa.timestamp("us"),
+    }.get(data_type, pa.string())
+
+
+def archive_partition(db: Session, table: str, partition: str) -> str:
+    """
+    Export a partition to Parquet in MinIO and return the object name.
+
+    Rows are streamed through a server-side cursor in batches of
+    PARTITION_ARCHIVE_BATCH_ROWS, so memory stays flat. Vectors become
+    float32 lists and JSON columns JSON strings.
+    """
+    return archive_rows(db, partition, f"{table}/{partition}.parquet")
+
+
+def archive_rows(
+    db: Session, source: str, object_name: str, where: Optional[str] = None, params: Optional[dict] = None
+) -> str:
+    """Export the rows of source (a table or partition) matching where to object_name, as archive_partition."""
+    import pyarrow as pa
+
+    columns = db.execute(
+        text(
+            "SELECT column_name, data_type, udt_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table ORDER BY ordinal_position"
+        ),
+        {"table": source},
+    ).all()
+    schema = pa.schema([(name, _arrow_type(pa, data_type, udt)) for name, data_type, udt in columns])
+    converters = {name: json_string for name, data_type, _ in columns if data_type in ("json", "jsonb")}
+    select_list = ", ".join(
+        f'"{name}"::real[] AS "{name}"' if udt == "vector" else f'"{name}"'
+        for name, _, udt in columns
+    )
+    query = f"SELECT {select_list} FROM {source}" + (f" WHERE {where}" if where else "")
+    result = db.connection().execution_options(
+        stream_results=True, yield_per=PARTITION_ARCHIVE_BATCH_ROWS
+    ).execute(text(query), params or {})
+    try:
+        stream_to_minio(result.partitions(), schema, PARTITION_ARCHIVE_BUCKET, object_name, converters)
+    finally:
+        # The DROP that follows runs in this transaction; never leave the cursor open
+        result.close()
+    return object_name
@@ -0,0 +1,277 @@
+from sqlalchemy import REAL, Text, and_, cast, func, literal_column, null, or_, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+import base64
+import numpy as np
+from ..models import tracing
+
+
+def encode_cursor(created_at: datetime, prompt_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{prompt_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    created_at, prompt_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+    return datetime.fromisoformat(created_at), int(prompt_id)
+
+
+def _latest_groundedness():
+    return (
+        select(tracing.HallucinationCheck.groundedness_score)
+        .join(tracing.Response, tracing.Response.id == tracing.HallucinationCheck.response_id)
+        .where(tracing.Response.prompt_id == tracing.Prompt.id)
+        .order_by(tracing.HallucinationCheck.checked_at.desc(), tracing.HallucinationCheck.id.desc())
+        .limit(1)
+        .correlate(tracing.Prompt)
+        .scalar_subquery()
+    )
+
+
+def _first_response_text():
+    return (
+        select(tracing.Response.text)
+        .where(tracing.Response.prompt_id == tracing.Prompt.id)
+        .order_by(tracing.Response.id)
+        .limit(1)
+        .correlate(tracing.Prompt)
+        .scalar_subquery()
+    )
+
+
+def _summary_columns():
+    return [
+        tracing.Prompt.id,
+        tracing.Prompt.created_at,
+        tracing.Prompt.user_query,
+        tracing.Prompt.system_prompt,
+        _first_response_text().label("response_text"),
+        _latest_groundedness().label("groundedness_score"),
+        tracing.Telemetry.embedding_latency_ms,
+        tracing.Telemetry.retrieval_latency_ms,
+        tracing.Telemetry.llm_latency_ms,
+        tracing.Telemetry.total_latency_ms,
+        tracing.Telemetry.embedding_tokens,
+        tracing.Telemetry.completion_tokens,
+        tracing.Telemetry.api_cost,
+    ]
+
+
+async def list_traces(
+    db: AsyncSession,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    min_latency_ms: Optional[float] = None,
+    max_latency_ms: Optional[float] = None,
+    min_cost: Optional[float] = None,
+    max_cost: Optional[float] = None,
+    min_groundedness: Optional[float] = None,
+    max_groundedness: Optional[float] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Newest-first page of trace summaries using keyset pagination on
+    (created_at, id). Returns the rows and the cursor of the next page.
+    """
+    stmt = (
+        select(*_summary_columns())
+        .outerjoin(tracing.Telemetry, tracing.Telemetry.prompt_id == tracing.Prompt.id)
+        .order_by(tracing.Prompt.created_at.desc(), tracing.Prompt.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            tracing.Prompt.created_at < cursor_created_at,
+            and_(tracing.Prompt.created_at == cursor_created_at, tracing.Prompt.id < cursor_id),
+        ))
+    if start is not None:
+        stmt = stmt.where(tracing.Prompt.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(tracing.Prompt.created_at < end)
+    if min_latency_ms is not None:
+        stmt = stmt.where(tracing.Telemetry.total_latency_ms >= min_latency_ms)
+    if max_latency_ms is not None:
+        stmt = stmt.where(tracing.Telemetry.total_latency_ms <= max_latency_ms)
+    if min_cost is not None:
+        stmt = stmt.where(tracing.Telemetry.api_cost >= min_cost)
+    if max_cost is not None:
+        stmt = stmt.where(tracing.Telemetry.api_cost <= max_cost)
+    if min_groundedness is not None:
+        stmt = stmt.where(_latest_groundedness() >= min_groundedness)
+    if max_groundedness is not None:
+        stmt = stmt.where(_latest_groundedness() <= max_groundedness)
+
+    rows = [dict(row) for row in (await db.execute(stmt)).mappings().all()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+# Top-level keys of GET /traces/{prompt_id}, in TraceOut order; "id" is always returned
+TRACE_FIELDS = ("id", "user_query", "system_prompt", "final_prompt", "embeddings", "retrievals", "responses", "telemetry")
+
+
+def _json_object(**columns):
+    """json_build_object() over keyword arguments, keys rendered as literals."""
+    args = []
+    for key, column in columns.items():
+        args += [literal_column(f"'{key}'"), column]
+    return func.json_build_object(*args)
+
+
+def _json_list(obj, order_by, where):
+    """Correlated subquery aggregating one child table into a JSON array ([] when empty)."""
+    return (
+        select(func.coalesce(func.json_agg(aggregate_order_by(obj, order_by)), literal_column("'[]'::json")))
+        .where(where)
+        .scalar_subquery()
+    )
+
+
+def _trace_document(fields: Iterable[str], include_vectors: bool):
+    """
+    The TraceOut document as one json_build_object() over correlated
+    subqueries, so Postgres assembles it in a single round trip. Child
+    objects carry the same keys as the TraceOut schema.
+    """
+    Prompt, Embedding, Retrieval = tracing.Prompt, tracing.Embedding, tracing.Retrieval
+    Response, Check, Telemetry = tracing.Response, tracing.HallucinationCheck, tracing.Telemetry
+    columns = {}
+    for field in fields:
+        if field == "embeddings":
+            vector = cast(Embedding.vector, ARRAY(REAL)) if include_vectors else null()
+            columns[field] = _json_list(
+                _json_object(
+                    vector=vector,
+                    vector_b64=null(),
+                    vector_dtype=null(),
+                    retrieval_candidates=Embedding.retrieval_candidates,
+                    id=Embedding.id,
+                ),
+                Embedding.id,
+                Embedding.prompt_id == Prompt.id,
+            )
+        elif field == "retrievals":
+            columns[field] = _json_list(
+                _json_object(
+                    document_id=Retrieval.document_id,
+                    similarity_score=Retrieval.similarity_score,
+                    metadata=Retrieval.meta_data,
+                    id=Retrieval.id,
+                ),
+                Retrieval.id,
+                Retrieval.prompt_id == Prompt.id,
+            )
+        elif field == "responses":
+            checks = _json_list(
+                _json_object(
+                    groundedness_score=Check.groundedness_score,
+                    unsupported_sentences=Check.unsupported_sentences,
+                    entailment_results=Check.entailment_results,
+                    id=Check.id,
+                ),
+                Check.id,
+                Check.response_id == Response.id,
+            )
+            columns[field] = _json_list(
+                _json_object(
+                    text=Response.text,
+                    token_stream=Response.token_stream,
+                    hallucination_check=null(),
+                    id=Response.id,
+                    hallucination_checks=checks,
+                ),
+                Response.id,
+                Response.prompt_id == Prompt.id,
+            )
+        elif field == "telemetry":
+            columns[field] = (
+                select(_json_object(
+                    embedding_latency_ms=Telemetry.embedding_latency_ms,
+                    retrieval_latency_ms=Telemetry.retrieval_latency_ms,
+                    llm_latency_ms=Telemetry.llm_latency_ms,
+                    total_latency_ms=Telemetry.total_latency_ms,
+                    embedding_tokens=Telemetry.embedding_tokens,
+                    completion_tokens=Telemetry.completion_tokens,
+                    api_cost=Telemetry.api_cost,
+                    id=Telemetry.id,
+                ))
+                .where(Telemetry.prompt_id == Prompt.id)
+                .order_by(Telemetry.id)
+                .limit(1)
+                .scalar_subquery()
+            )
+        else:
+            columns[field] = getattr(Prompt, field)
+    return _json_object(**columns)
+
+
+async def trace_json(
+    db: AsyncSession,
+    prompt_id: int,
+    fields: Optional[Iterable[str]] = None,
+    include_vectors: bool = True,
+) -> Optional[str]:
+    """
+    A trace serialized by Postgres as the TraceOut JSON text, or None.
+
+    fields limits the top-level keys (default: all of TRACE_FIELDS; id is
+    always included); child collections that are left out are not read.
+    include_vectors=False returns embeddings with a null vector. The text is
+    sent to the client as is: no ORM objects, validation or JSON encoding in
+    Python.
+    """
+    wanted = set(fields) if fields is not None else set(TRACE_FIELDS)
+    document = _trace_document([f for f in TRACE_FIELDS if f == "id" or f in wanted], include_vectors)
+    stmt = select(cast(document, Text)).where(tracing.Prompt.id == prompt_id).limit(1)
+    return (await db.scalars(stmt)).first()
+
+
+async def trace_vector(db: AsyncSession, prompt_id: int) -> Optional[np.ndarray]:
+    """The query embedding stored with a trace, or None."""
+    return (await db.scalars(
+        select(tracing.Embedding.vector)
+        .where(tracing.Embedding.prompt_id == prompt_id)
+        .order_by(tracing.Embedding.id)
+        .limit(1)
+    )).first()
+
+
+async def similar_traces(
+    db: AsyncSession,
+    vector: np.ndarray,
+    k: int = 10,
+    ef_search: Optional[int] = None,
+    exact: bool = False,
+    exclude_prompt_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    The k traces whose query embedding is closest to vector by cosine distance.
+
+    The ORDER BY distance LIMIT k scan is served by the HNSW index on
+    embeddings.vector. ef_search widens the candidate list per query (more
+    recall, more latency); exact disables index scans for a full, exact
+    comparison. Both settings are transaction-local.
+    """
+    if ef_search is not None:
+        await db.execute(text("SELECT set_config('hnsw.ef_search', :value, true)"), {"value": str(ef_search)})
+    if exact:
+        await db.execute(text("SET LOCAL enable_indexscan = off"))
+    distance = tracing.Embedding.vector.cosine_distance(vector).label("distance")
+    nearest = select(tracing.Embedding.prompt_id, distance)
+    if exclude_prompt_id is not None:
+        nearest = nearest.where(tracing.Embedding.prompt_id != exclude_prompt_id)
+    nearest = nearest.order_by(distance).limit(k).subquery()
+    stmt = (
+        select(*_summary_columns(), nearest.c.distance)
+        .join(nearest, nearest.c.prompt_id == tracing.Prompt.id)
+        .outerjoin(tracing.Telemetry, tracing.Telemetry.prompt_id == tracing.Prompt.id)
+        .order_by(nearest.c.distance)
+    )
+    return [dict(row) for row in (await db.execute(stmt)).mappings().all()]
@@ -0,0 +1,153 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from typing import Dict, List, Sequence, Tuple
+import os
+
+GRANULARITIES = ("minute", "hour")
+LATENCY_METRICS = ("embedding", "retrieval", "llm", "total")
+# Latency bins grow geometrically by this factor (about +/-5% percentile error)
+LATENCY_BIN_BASE = 1.1
+GROUNDEDNESS_BINS = 10
+# Rows younger than this are left for the next run, so transactions still in
+# flight when a run starts are not skipped by the id watermark
+ROLLUP_SAFETY_LAG_SECONDS = int(os.getenv("ROLLUP_SAFETY_LAG_SECONDS", "10"))
+ROLLUP_MAX_ROWS = int(os.getenv("ROLLUP_MAX_ROWS", "100000"))
+
+# Rows are weighted by 1/sample_rate of their prompt so sampled traffic still
+# estimates the totals. The prompt lookup bounds created_at so it can skip
+# partitions newer than the row (prompts are always stored first).
+_WEIGHT = "1.0 / coalesce(p.sample_rate, 1.0)"
+
+_TELEMETRY_ROLLUP = f"""
+INSERT INTO telemetry_rollups (
+    granularity, bucket_start, trace_count, estimated_count,
+    sum_embedding_latency_ms, sum_retrieval_latency_ms, sum_llm_latency_ms, sum_total_latency_ms,
+    sum_embedding_tokens, sum_completion_tokens, sum_api_cost
+)
+SELECT :granularity, date_trunc(:granularity, t.created_at), count(*), sum({_WEIGHT}),
+       coalesce(sum(t.embedding_latency_ms * {_WEIGHT}), 0), coalesce(sum(t.retrieval_latency_ms * {_WEIGHT}), 0),
+       coalesce(sum(t.llm_latency_ms * {_WEIGHT}), 0), coalesce(sum(t.total_latency_ms * {_WEIGHT}), 0),
+       coalesce(sum(t.embedding_tokens * {_WEIGHT}), 0), coalesce(sum(t.completion_tokens * {_WEIGHT}), 0),
+       coalesce(sum(t.api_cost * {_WEIGHT}), 0)
+FROM telemetry t
+LEFT JOIN prompts p ON p.id = t.prompt_id AND p.created_at <= t.created_at
+WHERE t.id > :lo AND t.id <= :hi
+GROUP BY 2
+ON CONFLICT (granularity, bucket_start) DO UPDATE SET
+    trace_count = telemetry_rollups.trace_count + excluded.trace_count,
+    estimated_count = telemetry_rollups.estimated_count + excluded.estimated_count,
+    sum_embedding_latency_ms = telemetry_rollups.sum_embedding_latency_ms + excluded.sum_embedding_latency_ms,
+    sum_retrieval_latency_ms = telemetry_rollups.sum_retrieval_latency_ms + excluded.sum_retrieval_latency_ms,
+    sum_llm_latency_ms = telemetry_rollups.sum_llm_latency_ms + excluded.sum_llm_latency_ms,
+    sum_total_latency_ms = telemetry_rollups.sum_total_latency_ms + excluded.sum_total_latency_ms,
+    sum_embedding_tokens = telemetry_rollups.sum_embedding_tokens + excluded.sum_embedding_tokens,
+    sum_completion_tokens = telemetry_rollups.sum_completion_tokens + excluded.sum_completion_tokens,
+    sum_api_cost = telemetry_rollups.sum_api_cost + excluded.sum_api_cost
+"""
+
+_LATENCY_HISTOGRAM_ROLLUP = f"""
+INSERT INTO latency_histogram_rollups (granularity, bucket_start, metric, bin, count)
+SELECT :granularity, date_trunc(:granularity, t.created_at), m.metric,
+       floor(ln(greatest(m.value, 1.0)) / ln(:base))::int, sum({_WEIGHT})
+FROM telemetry t
+LEFT JOIN prompts p ON p.id = t.prompt_id AND p.created_at <= t.created_at
+CROSS JOIN LATERAL (VALUES
+    ('embedding', t.embedding_latency_ms),
+    ('retrieval', t.retrieval_latency_ms),
+    ('llm', t.llm_latency_ms),
+    ('total', t.total_latency_ms)
+) AS m(metric, value)
+WHERE t.id > :lo AND t.id <= :hi AND m.value IS NOT NULL
+GROUP BY 2, 3, 4
+ON CONFLICT (granularity, bucket_start, metric, bin) DO UPDATE SET
+    count = latency_histogram_rollups.count + excluded.count
+"""
+
+_GROUNDEDNESS_ROLLUP = f"""
+INSERT INTO groundedness_rollups (granularity, bucket_start, bin, count)
+SELECT :granularity, date_trunc(:granularity, hc.checked_at),
+       least(greatest(floor(hc.groundedness_score * :bins)::int, 0), :bins - 1), sum({_WEIGHT})
+FROM hallucination_checks hc
+LEFT JOIN responses r ON r.id = hc.response_id AND r.created_at <= hc.checked_at
+LEFT JOIN prompts p ON p.id = r.prompt_id AND p.created_at <= r.created_at
+WHERE hc.id > :lo AND hc.id <= :hi
+GROUP BY 2, 3
+ON CONFLICT (granularity, bucket_start, bin) DO UPDATE SET
+    count = groundedness_rollups.count + excluded.count
+"""
+
+# source table -> (timestamp column, rollup statements)
+_SOURCES = {
+    "telemetry": ("created_at", (_TELEMETRY_ROLLUP, _LATENCY_HISTOGRAM_ROLLUP)),
+    "hallucination_checks": ("checked_at", (_GROUNDEDNESS_ROLLUP,)),
+}
+
+
+def refresh_rollups(db: Session) -> Dict[str, int]:
+    """
+    Fold rows added since the last run into the rollup tables.
+
+    Each source table keeps an id watermark in rollup_watermarks, locked for
+    the duration of the run so concurrent runs cannot double count. Returns
+    the width of the id range folded in per table.
+    """
+    processed = {}
+    for source, (ts_column, statements) in _SOURCES.items():
+        db.execute(
+            text("INSERT INTO rollup_watermarks (source, last_id) VALUES (:source, 0) ON CONFLICT DO NOTHING"),
+            {"source": source},
+        )
+        lo = db.execute(
+            text("SELECT last_id FROM rollup_watermarks WHERE source = :source FOR UPDATE"),
+            {"source": source},
+        ).scalar_one()
+        hi = db.execute(
+            text(
+                f"SELECT max(id) FROM (SELECT id FROM {source} WHERE id > :lo "
+                f"AND {ts_column} < now() - make_interval(secs => :lag) ORDER BY id LIMIT :max_rows) AS pending"
+            ),
+            {"lo": lo, "lag": ROLLUP_SAFETY_LAG_SECONDS, "max_rows": ROLLUP_MAX_ROWS},
+        ).scalar()
+        if hi is None:
+            processed[source] = 0
+            db.commit()
+            continue
+        for statement in statements:
+            for granularity in GRANULARITIES:
+                db.execute(
+                    text(statement),
+                    {"granularity": granularity, "lo": lo, "hi": hi,
+                     "base": LATENCY_BIN_BASE, "bins": GROUNDEDNESS_BINS},
+                )
+        db.execute(
+            text("UPDATE rollup_watermarks SET last_id = :hi WHERE source = :source"),
+            {"hi": hi, "source": source},
+        )
+        db.commit()
+        processed[source] = hi - lo
+    return processed
+
+
+def latency_bin_value(bin_index: int) -> float:
+    """Representative latency (geometric midpoint) of a histogram bin."""
+    return LATENCY_BIN_BASE ** (bin_index + 0.5)
+
+
+def histogram_percentiles(bins: Sequence[Tuple[int, float]], quantiles: Sequence[float]) -> List[float]:
+    """Estimate quantiles (0..1) from (bin, weighted count) pairs sorted by bin."""
+    total = sum(count for _, count in bins)
+    if not total:
+        return [None for _ in quantiles]
+    results = []
+    for q in quantiles:
+        # Counts are weighted by 1/sample_rate, so they and the target are fractional;
+        # rounding the target up could overshoot the total and find no bin
+        target = q * total
+        seen = 0
+        for bin_index, count in bins:
+            seen += count
+            if count and seen >= target:
+                break
+        # Without a break (float error near q = 1) this is the last bin
+        results.append(latency_bin_value(bin_index))
+    return results
@@ -0,0 +1,75 @@
+from prometheus_client import Counter
+from typing import List, Optional
+import os
+import random
+from ..schemas import traces as schemas
+
+# Ingestion-side sampling. Unlike the SDK Sampler it never drops a trace (callers
+# get an id for every trace they send); traces that are not sampled and match no
+# keep rule are stored without their embedding vector and token stream.
+
+def _optional_float(name: str) -> Optional[float]:
+    value = os.getenv(name, "")
+    return float(value) if value else None
+
+INGEST_SAMPLE_RATE = float(os.getenv("INGEST_SAMPLE_RATE", "1.0"))
+INGEST_KEEP_LATENCY_MS = _optional_float("INGEST_KEEP_LATENCY_MS")
+INGEST_KEEP_COST = _optional_float("INGEST_KEEP_COST")
+INGEST_KEEP_GROUNDEDNESS_BELOW = _optional_float("INGEST_KEEP_GROUNDEDNESS_BELOW")
+
+INGEST_SAMPLING = Counter(
+    "trace_ingest_sampling_total",
+    "Ingested traces by sampling decision",
+    ["decision"],
+)
+# Sum of 1/sample_rate: the traffic the ingested traces stand for before SDK sampling
+INGEST_ESTIMATED_TRACES = Counter(
+    "trace_ingest_estimated_traces_total",
+    "Traces represented by ingested traces, weighted by 1/sample_rate",
+)
+
+
+def keep_rule_matches(trace: schemas.TraceIn) -> bool:
+    """Whether a trace is slow, expensive or poorly grounded enough to keep in full."""
+    telemetry = trace.telemetry
+    if (INGEST_KEEP_LATENCY_MS is not None and telemetry.total_latency_ms is not None
+            and telemetry.total_latency_ms >= INGEST_KEEP_LATENCY_MS):
+        return True
+    if (INGEST_KEEP_COST is not None and telemetry.api_cost is not None
+            and telemetry.api_cost >= INGEST_KEEP_COST):
+        return True
+    check = trace.response.hallucination_check
+    return (INGEST_KEEP_GROUNDEDNESS_BELOW is not None and check is not None
+            and check.groundedness_score < INGEST_KEEP_GROUNDEDNESS_BELOW)
+
+
+def strip_heavy_fields(trace: schemas.TraceIn) -> None:
+    trace.embedding = None
+    trace.response.token_stream = None
+    trace.store_embedding_dump = False
+
+
+def sample_traces(traces: List[schemas.TraceIn]) -> List[bool]:
+    """
+    Apply ingestion-side sampling to a batch in place and count the decisions.
+
+    Returns, per trace, whether its heavy fields were stripped.
+    """
+    flags = []
+    sampled = tail_kept = stripped = 0
+    for trace in traces:
+        if INGEST_SAMPLE_RATE >= 1.0 or random.random() < INGEST_SAMPLE_RATE:
+            sampled += 1
+            flags.append(False)
+        elif keep_rule_matches(trace):
+            tail_kept += 1
+            flags.append(False)
+        else:
+            strip_heavy_fields(trace)
+            stripped += 1
+            flags.append(True)
+    for decision, count in (("sampled", sampled), ("tail_kept", tail_kept), ("stripped", stripped)):
+        if count:
+            INGEST_SAMPLING.labels(decision).inc(count)
+    INGEST_ESTIMATED_TRACES.inc(sum(1.0 / trace.sample_rate for trace in traces))
+    return flags
@@ -0,0 +1,75 @@
+"""
+Request body compression: bytes on the wire, SDK compress time and API decompress time.
+
+Uses realistic synthetic traces (full final prompt, passage text in the
+retrieval metadata, 1536-dim vector) for single traces and batches. Runs
+locally without a server; zstd rows need zstandard installed:
+
+    python benchmarks/bench_compression.py --batch-size 100 --iterations 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+from synthetic import make_traces  # noqa: E402
+from tracer_sdk.compression import BodyEncoder, zstandard  # noqa: E402
+from tracer_sdk.encoding import embedding_payload  # noqa: E402
+from app.core.compression import decompress  # noqa: E402
+
+CODECS = [("none", None, None), ("gzip-1", "gzip", 1), ("gzip-6", "gzip", 6)]
+if zstandard is not None:
+    CODECS += [("zstd-1", "zstd", 1), ("zstd-3", "zstd", 3), ("zstd-9", "zstd", 9)]
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e3
+
+
+def with_vector_encoding(trace, encoding):
+    embedding = trace["embedding"]
+    return dict(trace, embedding=embedding_payload(embedding["vector"], embedding["retrieval_candidates"], encoding))
+
+
+def measure(payload, iterations):
+    results = {}
+    raw = len(BodyEncoder().encode(payload)[0])
+    for name, codec, level in CODECS:
+        encoder = BodyEncoder(codec, threshold=0, level=level)
+        body, headers = encoder.encode(payload)
+        encoding = headers.get("Content-Encoding")
+        results[name] = {
+            "bytes": len(body),
+            "ratio": round(raw / len(body), 2),
+            "encode_ms": timed(lambda: encoder.encode(payload), iterations),
+            "decode_ms": timed(lambda: decompress(encoding, body), iterations) if encoding else 0.0,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    traces = make_traces(args.batch_size, dim=args.dim)
+    report = {"batch_size": args.batch_size, "codecs": [name for name, _, _ in CODECS], "results": {}}
+    for vector_encoding in ("json", "float32"):
+        batch = [with_vector_encoding(t, vector_encoding) for t in traces]
+        report["results"][vector_encoding] = {
+            "single": measure(batch[0], args.iterations * 10),
+            "batch": measure(batch, args.iterations),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
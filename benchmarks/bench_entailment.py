@@ -0,0 +1,76 @@
+"""
+CPU entailment throughput: one pipeline call per pair versus the batched EntailmentEngine.
+
+    python benchmarks/bench_entailment.py --pairs 200 --threads 4
+    python benchmarks/bench_entailment.py --pairs 200 --quantize
+    python benchmarks/bench_entailment.py --pairs 200 --backend onnx --skip-baseline
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "workers"))
+from entailment import ENTAILMENT_MODEL, EntailmentEngine  # noqa: E402
+
+from synthetic import _passage, _sentence  # noqa: E402
+
+
+def make_pairs(n, seed=0):
+    rng = random.Random(seed)
+    return [(_passage(rng, rng.randint(200, 1500)), _sentence(rng, rng.randint(6, 18))) for _ in range(n)]
+
+
+def bench_baseline(pairs, model_name):
+    from transformers import pipeline
+    pipe = pipeline("text-classification", model=model_name)
+    pipe(f"{pairs[0][1]} </s></s> {pairs[0][0]}")  # warm-up
+    start = time.perf_counter()
+    for premise, hypothesis in pairs:
+        pipe(f"{hypothesis} </s></s> {premise}")
+    return len(pairs) / (time.perf_counter() - start)
+
+
+def bench_engine(pairs, engine, batch_size):
+    engine.predict(pairs[:batch_size])  # warm-up
+    start = time.perf_counter()
+    engine.predict(pairs, batch_size=batch_size)
+    return len(pairs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--model", default=ENTAILMENT_MODEL)
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx"])
+    parser.add_argument("--quantize", action="store_true")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    pairs = make_pairs(args.pairs)
+    results = {"pairs": args.pairs, "model": args.model}
+    if not args.skip_baseline:
+        results["baseline_pairs_per_sec"] = bench_baseline(pairs, args.model)
+    engine = EntailmentEngine(
+        model_name=args.model,
+        backend=args.backend,
+        quantize=args.quantize,
+        num_threads=args.threads,
+        batch_size=args.batch_size,
+    )
+    results["engine"] = {
+        "backend": args.backend,
+        "quantize": args.quantize,
+        "threads": args.threads,
+        "batch_size": args.batch_size,
+        "pairs_per_sec": bench_engine(pairs, engine, args.batch_size),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Trace ingestion throughput: one POST /traces/ per trace versus POST /traces/batch.
+
+Run against a live API, e.g. `docker-compose up -d` and then:
+
+    python benchmarks/bench_ingest.py --api-url http://localhost:8000 --traces 500 --batch-size 100
+
+To compare with an older revision, run the same command against a server
+built from that revision (the single-trace numbers are the "current path").
+"""
+import argparse
+import json
+import time
+
+import requests
+
+from synthetic import make_traces
+
+
+def bench_single(session: requests.Session, api_url: str, traces) -> float:
+    start = time.perf_counter()
+    for trace in traces:
+        session.post(f"{api_url}/traces/", json=trace).raise_for_status()
+    return len(traces) / (time.perf_counter() - start)
+
+
+def bench_batch(session: requests.Session, api_url: str, traces, batch_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(traces), batch_size):
+        session.post(f"{api_url}/traces/batch", json=traces[i:i + batch_size]).raise_for_status()
+    return len(traces) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--traces", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--skip-batch", action="store_true", help="only measure the single-trace path")
+    args = parser.parse_args()
+
+    traces = make_traces(args.traces, dim=args.dim)
+    session = requests.Session()
+    results = {"traces": args.traces, "single_traces_per_sec": bench_single(session, args.api_url, traces)}
+    if not args.skip_batch:
+        results["batch_size"] = args.batch_size
+        results["batch_traces_per_sec"] = bench_batch(session, args.api_url, traces, args.batch_size)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
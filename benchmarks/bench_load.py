@@ -0,0 +1,100 @@
+"""
+Concurrent load test of POST /traces/ and GET /traces/{id}: throughput and p50/p95/p99 latency.
+
+    python benchmarks/bench_load.py --api-url http://localhost:8000 --requests 2000 --concurrency 32
+
+compare_stacks.py runs it against the sync stack of the last pre-async
+revision and against this tree, and reports the change.
+"""
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from synthetic import make_traces
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    idx = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def summarize(latencies, elapsed, errors):
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed if elapsed else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.mean(latencies) if latencies else None,
+    }
+
+
+def run(fn, items, concurrency):
+    latencies, errors = [], 0
+
+    def call(item):
+        start = time.perf_counter()
+        try:
+            fn(item)
+        except requests.RequestException:
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency in pool.map(call, items):
+            if latency is None:
+                errors += 1
+            else:
+                latencies.append(latency)
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--unique-traces", type=int, default=200, help="distinct payloads to cycle through")
+    parser.add_argument("--fields", default=None, help="GET /traces/{id} ?fields=, e.g. responses,telemetry")
+    parser.add_argument("--no-vectors", action="store_true", help="GET /traces/{id} with include_vectors=false")
+    args = parser.parse_args()
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=args.concurrency, pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    payloads = make_traces(args.unique_traces)
+    created = []
+    params = {}
+    if args.fields:
+        params["fields"] = args.fields
+    if args.no_vectors:
+        params["include_vectors"] = "false"
+
+    def post(i):
+        r = session.post(f"{args.api_url}/traces/", json=payloads[i % len(payloads)])
+        r.raise_for_status()
+        created.append(r.json()["id"])
+
+    def get(i):
+        session.get(f"{args.api_url}/traces/{created[i % len(created)]}", params=params).raise_for_status()
+
+    results = {"concurrency": args.concurrency}
+    results["create_trace"] = run(post, range(args.requests), args.concurrency)
+    if created:
+        results["get_trace"] = run(get, range(args.requests), args.concurrency)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
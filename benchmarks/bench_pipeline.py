@@ -0,0 +1,220 @@
+"""
+End-to-end ingestion through the SDK: throughput, p50/p95/p99 latency and server CPU/memory.
+
+Traces are synthetic (1536-dim vectors, a varying number of retrievals with
+long passages) and are sent with RAGTracer, so SDK serialization is part of
+every measurement. In sync mode each thread calls trace_complete and the
+latency of each call is recorded; in async mode the batch exporter sends
+them and only throughput is reported. --rate caps the total traces/second.
+
+    python benchmarks/local_server.py --migrate &
+    python benchmarks/bench_pipeline.py --traces 2000 --concurrency 16
+    python benchmarks/bench_pipeline.py --mode async --rate 500 --vector-encoding float32 --compression gzip
+
+Server CPU and RSS come from the process_* series of /metrics. Those are
+missing when the API runs with PROMETHEUS_MULTIPROC_DIR; pass --server-pid
+(psutil, children included) instead.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from bench_load import summarize  # noqa: E402
+from synthetic import make_trace, sdk_fields  # noqa: E402
+from tracer_sdk.tracer import RAGTracer  # noqa: E402
+
+_PROCESS_SERIES = re.compile(r"^(process_cpu_seconds_total|process_resident_memory_bytes) (\S+)$", re.M)
+
+
+class ServerProbe:
+    """CPU seconds and RSS of the API server, sampled in the background for the peak."""
+
+    def __init__(self, api_url, pid=None, interval=0.5):
+        self.api_url = api_url
+        self.interval = interval
+        self.process = None
+        if pid is not None:
+            import psutil
+            self.process = psutil.Process(pid)
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def read(self):
+        """(cpu_seconds, rss_bytes), or None if the server does not report them."""
+        if self.process is not None:
+            processes = [self.process] + self.process.children(recursive=True)
+            cpu = sum(p.cpu_times().user + p.cpu_times().system for p in processes)
+            return cpu, sum(p.memory_info().rss for p in processes)
+        try:
+            text = requests.get(f"{self.api_url}/metrics/", timeout=5).text
+        except requests.RequestException:
+            return None
+        values = dict((name, float(value)) for name, value in _PROCESS_SERIES.findall(text))
+        if len(values) < 2:
+            return None
+        return values["process_cpu_seconds_total"], values["process_resident_memory_bytes"]
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            reading = self.read()
+            if reading is not None:
+                self.peak_rss = max(self.peak_rss, reading[1])
+
+    def __enter__(self):
+        self.start = self.read()
+        if self.start is not None:
+            self.peak_rss = self.start[1]
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started_at
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        end = self.read()
+        if self.start is None or end is None:
+            self.result = None
+            return
+        self.peak_rss = max(self.peak_rss, end[1])
+        cpu = end[0] - self.start[0]
+        self.result = {
+            "cpu_seconds": cpu,
+            "cpu_utilization": cpu / elapsed if elapsed else None,
+            "rss_start_mb": self.start[1] / 2**20,
+            "rss_peak_mb": self.peak_rss / 2**20,
+        }
+
+
+def make_workload(args):
+    rng = random.Random(args.seed)
+    return [
+        sdk_fields(make_trace(
+            dim=args.dim,
+            retrievals=rng.randint(args.min_retrievals, args.max_retrievals),
+            passage_chars=rng.randint(args.min_passage_chars, args.max_passage_chars),
+            seed=args.seed + i,
+        ))
+        for i in range(args.unique_traces)
+    ]
+
+
+def paced(rate, start):
+    """Sleep until the slot of call i when --rate is set."""
+    def wait(i):
+        if rate:
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    return wait
+
+
+def run_sync(args, workload):
+    local = threading.local()
+
+    def tracer():
+        if not hasattr(local, "tracer"):
+            local.tracer = RAGTracer(
+                args.api_url, vector_encoding=args.vector_encoding, compression=args.compression
+            )
+        return local.tracer
+
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    start = time.perf_counter()
+    wait = paced(args.rate, start)
+
+    def call(i):
+        nonlocal errors
+        wait(i)
+        began = time.perf_counter()
+        result = tracer().trace_complete(**workload[i % len(workload)])
+        latency = (time.perf_counter() - began) * 1000
+        with lock:
+            if "error" in result:
+                errors += 1
+            else:
+                latencies.append(latency)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(call, range(args.traces)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def run_async(args, workload):
+    tracer = RAGTracer(
+        args.api_url,
+        async_mode=True,
+        max_queue_size=max(2048, args.batch_size * args.concurrency * 2),
+        max_batch_size=args.batch_size,
+        overflow_policy="block",
+        num_workers=args.concurrency,
+        vector_encoding=args.vector_encoding,
+        compression=args.compression,
+    )
+    start = time.perf_counter()
+    wait = paced(args.rate, start)
+    for i in range(args.traces):
+        wait(i)
+        tracer.trace_complete(**workload[i % len(workload)])
+    tracer.flush()
+    elapsed = time.perf_counter() - start
+    stats = tracer.stats()
+    tracer.shutdown()
+    return {
+        "traces": args.traces,
+        "sent": stats["sent"],
+        "failed": stats["failed"],
+        "throughput_tps": stats["sent"] / elapsed if elapsed else None,
+        "batch_size": args.batch_size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--traces", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16, help="threads (sync) or exporter workers (async)")
+    parser.add_argument("--rate", type=float, default=0, help="total traces/second; 0 sends as fast as possible")
+    parser.add_argument("--batch-size", type=int, default=100, help="async exporter batch size")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--min-retrievals", type=int, default=3)
+    parser.add_argument("--max-retrievals", type=int, default=10)
+    parser.add_argument("--min-passage-chars", type=int, default=500)
+    parser.add_argument("--max-passage-chars", type=int, default=3000)
+    parser.add_argument("--unique-traces", type=int, default=200, help="distinct payloads to cycle through")
+    parser.add_argument("--vector-encoding", default="json", choices=["json", "float32", "float16"])
+    parser.add_argument("--compression", default=None, choices=["gzip", "zstd"])
+    parser.add_argument("--server-pid", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workload = make_workload(args)
+    with ServerProbe(args.api_url, args.server_pid) as probe:
+        results = run_sync(args, workload) if args.mode == "sync" else run_async(args, workload)
+    print(json.dumps({
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "rate": args.rate or None,
+        "vector_encoding": args.vector_encoding,
+        "compression": args.compression,
+        "results": results,
+        "server": probe.result,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
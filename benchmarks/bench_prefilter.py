@@ -0,0 +1,81 @@
+"""
+Two-stage hallucination check: model calls avoided by the lexical pre-filter and
+sentence-level agreement with the full check on a fixture set.
+
+    python benchmarks/bench_prefilter.py
+    python benchmarks/bench_prefilter.py --fixtures my_cases.json --top-k 2
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(HERE, "..", "workers"))
+sys.path.insert(0, os.path.join(HERE, "..", "api"))
+from entailment import EntailmentEngine  # noqa: E402
+from prefilter import PREFILTER_ENTAIL_THRESHOLD, PREFILTER_SKIP_THRESHOLD, stage_pairs  # noqa: E402
+from app.core.segmenter import segment  # noqa: E402
+
+THRESHOLD = float(os.getenv("ENTAILMENT_THRESHOLD", "0.7"))
+
+
+def supported(sentences, pairs, predictions):
+    ok = set()
+    for (_, sent), (label, score) in zip(pairs, predictions):
+        if label == "ENTAILMENT" and score > THRESHOLD:
+            ok.add(sent)
+    return {s: s in ok for s in sentences}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", default=os.path.join(HERE, "fixtures", "hallucination_cases.json"))
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--entail-threshold", type=float, default=PREFILTER_ENTAIL_THRESHOLD)
+    parser.add_argument("--skip-threshold", type=float, default=PREFILTER_SKIP_THRESHOLD)
+    args = parser.parse_args()
+
+    with open(args.fixtures) as f:
+        cases = json.load(f)
+    engine = EntailmentEngine()
+    totals = {"sentences": 0, "agree": 0, "full_model_calls": 0, "staged_model_calls": 0}
+    full_time = staged_time = 0.0
+    for case in cases:
+        sentences = segment(case["response"])
+        docs = case["documents"]
+
+        start = time.perf_counter()
+        full_pairs = [(d, s) for s in sentences for d in docs]
+        full = supported(sentences, full_pairs, engine.predict(full_pairs))
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        model_pairs, lexical, stats = stage_pairs(
+            sentences, docs, args.top_k, args.entail_threshold, args.skip_threshold
+        )
+        staged = supported(
+            sentences,
+            list(lexical) + model_pairs,
+            list(lexical.values()) + engine.predict(model_pairs),
+        )
+        staged_time += time.perf_counter() - start
+
+        totals["sentences"] += len(sentences)
+        totals["agree"] += sum(full[s] == staged[s] for s in sentences)
+        totals["full_model_calls"] += len(full_pairs)
+        totals["staged_model_calls"] += stats["model_pairs"]
+
+    print(json.dumps({
+        "cases": len(cases),
+        **totals,
+        "agreement": totals["agree"] / max(1, totals["sentences"]),
+        "model_calls_avoided": totals["full_model_calls"] - totals["staged_model_calls"],
+        "full_seconds": full_time,
+        "staged_seconds": staged_time,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+SDK serialization cost per trace: payload build and body encoding, per vector encoding.
+
+Uses the same synthetic traces as bench_pipeline.py and runs locally
+without a server:
+
+    python benchmarks/bench_serialization.py --iterations 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from synthetic import make_traces, sdk_fields  # noqa: E402
+from tracer_sdk.compression import BodyEncoder  # noqa: E402
+from tracer_sdk.data import build_trace_payload  # noqa: E402
+
+
+def timed_us(fn, items, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (iterations * len(items)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--traces", type=int, default=20, help="distinct traces per iteration")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    traces = [sdk_fields(t) for t in make_traces(args.traces, dim=args.dim)]
+    encoder = BodyEncoder()
+    results = {}
+    for vector_encoding in ("json", "float32", "float16"):
+        payloads = [build_trace_payload(vector_encoding=vector_encoding, **t) for t in traces]
+        results[vector_encoding] = {
+            "build_us": timed_us(lambda t: build_trace_payload(vector_encoding=vector_encoding, **t), traces, args.iterations),
+            "encode_us": timed_us(encoder.encode, payloads, args.iterations),
+            "bytes": sum(len(encoder.encode(p)[0]) for p in payloads) // len(payloads),
+        }
+        results[vector_encoding]["total_us"] = results[vector_encoding]["build_us"] + results[vector_encoding]["encode_us"]
+    print(json.dumps({"dim": args.dim, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Per-span and per-trace overhead of the SDK span API (no network: payloads go to a no-op sink).
+
+    python benchmarks/bench_spans.py --iterations 200000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tracer_sdk.spans import Trace, span, traced  # noqa: E402
+
+
+def sink(payload):
+    return None
+
+
+def per_call_ns(fn, iterations):
+    start = time.perf_counter_ns()
+    fn(iterations)
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def bench_empty_loop(n):
+    for _ in range(n):
+        pass
+
+
+def bench_trace_span(n):
+    trace = Trace(sink, "q").start()
+    for _ in range(n):
+        with trace.span("retrieval"):
+            pass
+        if len(trace.spans) > 10_000:
+            trace.spans.clear()
+    trace.finish()
+
+
+def bench_context_span(n):
+    trace = Trace(sink, "q").start()
+    for _ in range(n):
+        with span("retrieval"):
+            pass
+        if len(trace.spans) > 10_000:
+            trace.spans.clear()
+    trace.finish()
+
+
+@traced("retrieval")
+def decorated():
+    pass
+
+
+def bench_decorated(n):
+    trace = Trace(sink, "q").start()
+    for _ in range(n):
+        decorated()
+        if len(trace.spans) > 10_000:
+            trace.spans.clear()
+    trace.finish()
+
+
+def bench_no_trace_span(n):
+    for _ in range(n):
+        with span("retrieval"):
+            pass
+
+
+def bench_full_trace(n):
+    # A whole trace with three stages, telemetry and payload build (small vector)
+    for _ in range(n):
+        with Trace(sink, "question") as trace:
+            with trace.span("embedding"):
+                trace.set_embedding([0.1, 0.2, 0.3, 0.4])
+            with trace.span("retrieval"):
+                pass
+            trace.set_prompt("final prompt")
+            with trace.span("llm"):
+                trace.set_response("answer")
+
+
+def bench_async_span(n):
+    @traced("llm")
+    async def call():
+        return None
+
+    async def run():
+        trace = Trace(sink, "q").start()
+        for _ in range(n):
+            await call()
+            if len(trace.spans) > 10_000:
+                trace.spans.clear()
+        trace.finish()
+
+    asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    baseline = per_call_ns(bench_empty_loop, n)
+    results = {
+        "trace.span() ns": per_call_ns(bench_trace_span, n) - baseline,
+        "span() via contextvar ns": per_call_ns(bench_context_span, n) - baseline,
+        "@traced sync call ns": per_call_ns(bench_decorated, n) - baseline,
+        "@traced async call ns": per_call_ns(bench_async_span, n) - baseline,
+        "span() without a trace ns": per_call_ns(bench_no_trace_span, n) - baseline,
+        "full 3-stage trace us": per_call_ns(bench_full_trace, max(1, n // 10)) / 1000,
+    }
+    print(json.dumps({k: round(v, 1) for k, v in results.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
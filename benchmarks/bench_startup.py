@@ -0,0 +1,54 @@
+"""
+Startup time and peak RSS of the API import path and of a worker process.
+
+Each measurement runs in a fresh interpreter:
+
+    python benchmarks/bench_startup.py            # imports only
+    python benchmarks/bench_startup.py --model    # also load + warm up the entailment model
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{setup}
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "max_rss_mb": rss_kb / 1024}}))
+"""
+
+CASES = {
+    "api_import": ("api", "import app.main"),
+    "worker_import": ("workers", "import worker"),
+    "worker_model_load": ("workers", "import worker; worker.get_entailment_engine()"),
+    "worker_model_load_and_warm_up": ("workers", "import worker; worker.load_entailment_model()"),
+}
+
+
+def measure(cwd, setup):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, cwd)]))
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(setup=setup)],
+        cwd=os.path.join(ROOT, cwd), env=env, capture_output=True, text=True,
+    )
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr else "failed"}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", action="store_true", help="include model load and warm-up")
+    args = parser.parse_args()
+    cases = CASES if args.model else {k: v for k, v in CASES.items() if "model" not in k}
+    print(json.dumps({name: measure(cwd, setup) for name, (cwd, setup) in cases.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Embedding vector encodings: payload size, SDK encode time and API parse time.
+
+Runs locally without a server:
+
+    python benchmarks/bench_vector_encoding.py --dim 1536 --iterations 2000
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tracer_sdk.encoding import embedding_payload  # noqa: E402
+
+DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+
+def parse(payload: str) -> np.ndarray:
+    """What the API does with an embedding body: JSON decode, then build the float32 array."""
+    data = json.loads(payload)
+    if "vector_b64" in data:
+        return np.frombuffer(base64.b64decode(data["vector_b64"]), dtype=DTYPES[data["vector_dtype"]]).astype(np.float32)
+    return np.asarray([float(x) for x in data["vector"]], dtype=np.float32)
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    vector = np.random.default_rng(0).uniform(-1, 1, args.dim).astype(np.float32)
+    as_list = vector.tolist()
+    results = {}
+    for encoding in ("json", "float32", "float16"):
+        payload = json.dumps(embedding_payload(vector, None, encoding))
+        results[encoding] = {
+            "bytes": len(payload),
+            "encode_from_list_us": timed(lambda: json.dumps(embedding_payload(as_list, None, encoding)), args.iterations),
+            "encode_from_numpy_us": timed(lambda: json.dumps(embedding_payload(vector, None, encoding)), args.iterations),
+            "parse_us": timed(lambda: parse(payload), args.iterations),
+            "max_abs_error": float(np.max(np.abs(parse(payload) - vector))),
+        }
+    print(json.dumps({"dim": args.dim, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Run the benchmark suite and save the results as JSON, keyed by git commit, for comparison.
+
+Each benchmark runs as its own script in a fresh interpreter; its JSON output
+is collected into one file under benchmarks/results/ together with the
+commit, host and arguments:
+
+    python benchmarks/run.py                                  # quick: SDK micro-benchmarks, no server
+    python benchmarks/run.py --groups quick server --api-url http://localhost:8000
+    python benchmarks/run.py --groups model --only entailment
+    python benchmarks/run.py --compare results/old.json results/new.json
+
+Groups: "quick" runs locally, "server" needs a running API (see
+local_server.py), "model" loads the entailment model.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (group, script and arguments); server benchmarks also get --api-url
+BENCHMARKS = {
+    "sdk_spans": ("quick", ["bench_spans.py", "--iterations", "100000"]),
+    "sdk_serialization": ("quick", ["bench_serialization.py"]),
+    "vector_encoding": ("quick", ["bench_vector_encoding.py"]),
+    "compression": ("quick", ["bench_compression.py", "--iterations", "20"]),
+    "pipeline_sync": ("server", ["bench_pipeline.py", "--mode", "sync", "--traces", "1000", "--concurrency", "16"]),
+    "pipeline_async": ("server", ["bench_pipeline.py", "--mode", "async", "--traces", "5000", "--concurrency", "4"]),
+    "load": ("server", ["bench_load.py", "--requests", "1000", "--concurrency", "32"]),
+    "load_no_vectors": ("server", ["bench_load.py", "--requests", "1000", "--concurrency", "32", "--no-vectors"]),
+    "entailment": ("model", ["bench_entailment.py", "--pairs", "200", "--skip-baseline"]),
+    "prefilter": ("model", ["bench_prefilter.py"]),
+}
+
+
+def git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=HERE, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def git_info():
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "sha": git("rev-parse", "HEAD"),
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(status) if status is not None else None,
+    }
+
+
+def run_benchmark(group, argv, api_url, timeout):
+    if group == "server":
+        argv = argv + ["--api-url", api_url]
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run([sys.executable, *argv], cwd=HERE, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"args": argv, "error": f"timed out after {timeout}s"}
+    entry = {"args": argv, "seconds": round(time.perf_counter() - start, 2)}
+    if proc.returncode != 0:
+        entry["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}"
+        return entry
+    try:
+        entry["result"] = json.loads(proc.stdout)
+    except ValueError:
+        entry["error"] = "output is not JSON"
+    return entry
+
+
+def flatten(value, prefix=""):
+    """{dotted.path: number} of every numeric leaf."""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return {prefix: value} if isinstance(value, (int, float)) and not isinstance(value, bool) else {}
+    out = {}
+    for key, child in items:
+        out.update(flatten(child, f"{prefix}.{key}" if prefix else str(key)))
+    return out
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    old_values = flatten({k: v.get("result") for k, v in old["benchmarks"].items()})
+    new_values = flatten({k: v.get("result") for k, v in new["benchmarks"].items()})
+    rows = []
+    for key in sorted(old_values.keys() & new_values.keys()):
+        a, b = old_values[key], new_values[key]
+        change = (b - a) / abs(a) * 100 if a else None
+        rows.append({"metric": key, "old": a, "new": b, "change_pct": round(change, 1) if change is not None else None})
+    return {"old": old["git"], "new": new["git"], "metrics": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--groups", nargs="+", default=["quick"], choices=["quick", "server", "model"])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run just these benchmarks")
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds per benchmark")
+    parser.add_argument("--output-dir", default=os.path.join(HERE, "results"))
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        print(json.dumps(compare(*args.compare), indent=2))
+        return
+
+    names = args.only or [name for name, (group, _) in BENCHMARKS.items() if group in args.groups]
+    report = {
+        "git": git_info(),
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "benchmarks": {},
+    }
+    for name in names:
+        group, argv = BENCHMARKS[name]
+        print(f"{name} ...", file=sys.stderr, flush=True)
+        report["benchmarks"][name] = entry = run_benchmark(group, argv, args.api_url, args.timeout)
+        if "error" in entry:
+            print(f"{name} failed: {entry['error']}", file=sys.stderr)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    sha = (report["git"]["sha"] or "unknown")[:12] + ("-dirty" if report["git"]["dirty"] else "")
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(args.output_dir, f"{sha}-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
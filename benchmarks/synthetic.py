@@ -0,0 +1,87 @@
+"""
+Synthetic trace payloads for the benchmark scripts.
+"""
+import random
+from typing import Any, Dict, List, Optional
+
+WORDS = (
+    "the model retrieved passage answer tesla company revenue quarter report "
+    "engineer battery vehicle market growth data source policy customer energy "
+    "launch orbit rocket contract research paper result method dataset"
+).split()
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+
+def _passage(rng: random.Random, chars: int) -> str:
+    parts: List[str] = []
+    total = 0
+    while total < chars:
+        s = _sentence(rng, rng.randint(8, 20))
+        parts.append(s)
+        total += len(s) + 1
+    return " ".join(parts)
+
+
+def make_trace(
+    dim: int = 1536,
+    retrievals: Optional[int] = None,
+    passage_chars: int = 1500,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Build one realistic /traces/ payload."""
+    rng = random.Random(seed)
+    n_retrievals = retrievals if retrievals is not None else rng.randint(3, 10)
+    docs = [
+        {
+            "document_id": f"doc-{rng.randrange(10**6)}",
+            "similarity_score": rng.random(),
+            "metadata": {"title": _sentence(rng, 4), "text": _passage(rng, passage_chars)},
+        }
+        for _ in range(n_retrievals)
+    ]
+    answer = " ".join(_sentence(rng, rng.randint(6, 18)) for _ in range(rng.randint(3, 8)))
+    return {
+        "user_query": _sentence(rng, 10),
+        "system_prompt": "You are a helpful assistant.",
+        "final_prompt": "Context: " + " ".join(d["metadata"]["text"] for d in docs) + " Question: " + _sentence(rng, 10),
+        "embedding": {
+            "vector": [rng.uniform(-1, 1) for _ in range(dim)],
+            "retrieval_candidates": [{"doc_id": d["document_id"], "score": d["similarity_score"]} for d in docs],
+        },
+        "retrievals": docs,
+        "response": {
+            "text": answer,
+            "token_stream": answer.split(),
+            "hallucination_check": None,
+        },
+        "telemetry": {
+            "embedding_latency_ms": rng.uniform(20, 80),
+            "retrieval_latency_ms": rng.uniform(30, 150),
+            "llm_latency_ms": rng.uniform(400, 3000),
+            "total_latency_ms": rng.uniform(500, 3500),
+            "embedding_tokens": rng.randint(5, 50),
+            "completion_tokens": rng.randint(20, 400),
+            "api_cost": rng.uniform(0.0001, 0.01),
+        },
+    }
+
+
+def make_traces(n: int, seed: int = 0, **kwargs) -> List[Dict[str, Any]]:
+    return [make_trace(seed=seed + i, **kwargs) for i in range(n)]
+
+
+def sdk_fields(trace: Dict[str, Any]) -> Dict[str, Any]:
+    """A make_trace() payload as RAGTracer.trace_complete keyword arguments."""
+    from tracer_sdk.data import EmbeddingData, ResponseData, RetrievalData, TelemetryData
+    return dict(
+        user_query=trace["user_query"],
+        system_prompt=trace["system_prompt"],
+        final_prompt=trace["final_prompt"],
+        embedding=EmbeddingData(**trace["embedding"]),
+        retrievals=[RetrievalData(**r) for r in trace["retrievals"]],
+        response=ResponseData(text=trace["response"]["text"], token_stream=trace["response"]["token_stream"]),
+        telemetry=TelemetryData(**trace["telemetry"]),
+    )
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { 
-  LineChart, Line, BarChart, Bar, ScatterChart, Scatter,
+  LineChart, Line, BarChart, Bar,
   XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer
 } from 'recharts';
 import axios from 'axios';
@@ -11,6 +11,9 @@ const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 
 function Dashboard() {
   const [traces, setTraces] = useState([]);
+  const [latencyStats, setLatencyStats] = useState([]);
+  const [usageStats, setUsageStats] = useState([]);
+  const [groundednessStats, setGroundednessStats] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -18,10 +21,31 @@ function Dashboard() {
     fetchTraces();
   }, []);
 
+  // Prepend traces as they are stored, keeping the table at its page size
+  useEffect(() => {
+    const socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/ws/traces/live`);
+    socket.onmessage = event => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'trace') {
+        setTraces(current => [message.trace, ...current].slice(0, 200));
+      }
+    };
+    return () => socket.close();
+  }, []);
+
   const fetchTraces = async () => {
     try {
-      const response = await axios.get(`${API_URL}/traces`);
-      setTraces(response.data);
+      // Charts come from the pre-aggregated /stats rollups; only the table needs raw traces
+      const [tracesRes, latencyRes, usageRes, groundednessRes] = await Promise.all([
+        axios.get(`${API_URL}/traces`, { params: { limit: 200 } }),
+        axios.get(`${API_URL}/stats/latency`, { params: { granularity: 'hour' } }),
+        axios.get(`${API_URL}/stats/usage`, { params: { granularity: 'hour' } }),
+        axios.get(`${API_URL}/stats/groundedness`),
+      ]);
+      setTraces(tracesRes.data.items);
+      setLatencyStats(latencyRes.data);
+      setUsageStats(usageRes.data);
+      setGroundednessStats(groundednessRes.data);
       setLoading(false);
     } catch (err) {
       setError('Failed to fetch traces');
@@ -30,22 +54,24 @@ function Dashboard() {
   };
 
   // Prepare data for charts
-  const latencyData = traces.map(trace => ({
-    id: trace.id,
-    retrieval: trace.telemetry?.retrieval_latency_ms || 0,
-    llm: trace.telemetry?.llm_latency_ms || 0,
-    total: trace.telemetry?.total_latency_ms || 0
+  const formatBucket = bucketStart => new Date(bucketStart).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+
+  const latencyData = latencyStats.map(bucket => ({
+    time: formatBucket(bucket.bucket_start),
+    p50: bucket.p50_ms || 0,
+    p95: bucket.p95_ms || 0,
+    p99: bucket.p99_ms || 0
   }));
 
-  const groundednessData = traces.map(trace => ({
-    id: trace.id,
-    groundedness: trace.responses[0]?.hallucination_checks[0]?.groundedness_score || 0
+  const groundednessData = groundednessStats.map(bin => ({
+    range: `${bin.lower.toFixed(1)}-${bin.upper.toFixed(1)}`,
+    count: bin.count
   }));
 
-  const tokenData = traces.map(trace => ({
-    id: trace.id,
-    embedding: trace.telemetry?.embedding_tokens || 0,
-    completion: trace.telemetry?.completion_tokens || 0
+  const tokenData = usageStats.map(bucket => ({
+    time: formatBucket(bucket.bucket_start),
+    embedding: bucket.embedding_tokens,
+    completion: bucket.completion_tokens
   }));
 
   if (loading) return <div className="loading">Loading...</div>;
@@ -57,31 +83,31 @@ function Dashboard() {
       
       <div className="charts-container">
         <div className="chart-card">
-          <h2>Latency Breakdown (ms)</h2>
+          <h2>Total Latency Percentiles (ms)</h2>
           <ResponsiveContainer width="100%" height={300}>
-            <BarChart data={latencyData}>
+            <LineChart data={latencyData}>
               <CartesianGrid strokeDasharray="3 3" />
-              <XAxis dataKey="id" />
+              <XAxis dataKey="time" />
               <YAxis />
               <Tooltip />
               <Legend />
-              <Bar dataKey="retrieval" fill="#8884d8" name="Retrieval" />
-              <Bar dataKey="llm" fill="#82ca9d" name="LLM" />
-              <Bar dataKey="total" fill="#ffc658" name="Total" />
-            </BarChart>
+              <Line type="monotone" dataKey="p50" stroke="#8884d8" name="p50" />
+              <Line type="monotone" dataKey="p95" stroke="#82ca9d" name="p95" />
+              <Line type="monotone" dataKey="p99" stroke="#ffc658" name="p99" />
+            </LineChart>
           </ResponsiveContainer>
         </div>
 
         <div className="chart-card">
-          <h2>Groundedness Score</h2>
+          <h2>Groundedness Distribution (24h)</h2>
           <ResponsiveContainer width="100%" height={300}>
-            <ScatterChart data={groundednessData}>
+            <BarChart data={groundednessData}>
               <CartesianGrid strokeDasharray="3 3" />
-              <XAxis dataKey="id" name="Trace ID" />
-              <YAxis dataKey="groundedness" name="Groundedness" domain={[0, 1]} />
+              <XAxis dataKey="range" name="Groundedness" />
+              <YAxis allowDecimals={false} />
               <Tooltip />
-              <Scatter name="Groundedness" dataKey="groundedness" fill="#ff7300" />
-            </ScatterChart>
+              <Bar dataKey="count" fill="#ff7300" name="Checks" />
+            </BarChart>
           </ResponsiveContainer>
         </div>
 
@@ -90,7 +116,7 @@ function Dashboard() {
           <ResponsiveContainer width="100%" height={300}>
             <LineChart data={tokenData}>
               <CartesianGrid strokeDasharray="3 3" />
-              <XAxis dataKey="id" />
+              <XAxis dataKey="time" />
               <YAxis />
               <Tooltip />
               <Legend />
@@ -109,7 +135,6 @@ function Dashboard() {
               <th>ID</th>
               <th>User Query</th>
               <th>System Prompt</th>
-              <th>Final Prompt</th>
               <th>Response</th>
               <th>Groundedness</th>
               <th>Total Latency (ms)</th>
@@ -121,10 +146,9 @@ function Dashboard() {
                 <td><Link to={`/trace/${trace.id}`}>{trace.id}</Link></td>
                 <td>{trace.user_query}</td>
                 <td>{trace.system_prompt || 'N/A'}</td>
-                <td>{trace.final_prompt}</td>
-                <td>{trace.responses[0]?.text || 'N/A'}</td>
-                <td>{trace.responses[0]?.hallucination_checks[0]?.groundedness_score?.toFixed(2) || 'N/A'}</td>
-                <td>{trace.telemetry?.total_latency_ms?.toFixed(2) || 'N/A'}</td>
+                <td>{trace.response_text || 'N/A'}</td>
+                <td>{trace.groundedness_score?.toFixed(2) || 'N/A'}</td>
+                <td>{trace.total_latency_ms?.toFixed(2) || 'N/A'}</td>
               </tr>
             ))}
           </tbody>
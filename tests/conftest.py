@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The SDK imports as tracer_sdk, the API as app (as in its container) and
+# the worker modules by their file names
+for path in (ROOT, os.path.join(ROOT, "api"), os.path.join(ROOT, "workers")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
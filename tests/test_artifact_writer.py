@@ -0,0 +1,95 @@
+import pytest
+from minio.error import S3Error
+
+from app.core import minio_utils
+from app.core.artifact_writer import ArtifactWriter
+
+
+class FakeMinio:
+    """The Minio calls used by minio_utils; like minio 7.2, put_object needs a stream."""
+
+    def __init__(self, failures=()):
+        self.objects = {}
+        self.buckets = set()
+        self.failures = list(failures)
+        self.puts = 0
+
+    def bucket_exists(self, bucket):
+        return bucket in self.buckets
+
+    def make_bucket(self, bucket):
+        self.buckets.add(bucket)
+
+    def put_object(self, bucket, object_name, data, length, content_type="application/octet-stream"):
+        self.puts += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        self.objects[(bucket, object_name)] = (data.read(length), content_type)
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    client = FakeMinio()
+    monkeypatch.setattr(minio_utils, "client", client)
+    monkeypatch.setattr(minio_utils, "_known_buckets", set())
+    return client
+
+
+def s3_error(code):
+    return S3Error(code, code, "resource", "request-id", "host-id", None)
+
+
+def run(writer, *uploads):
+    writer.start()
+    for upload in uploads:
+        assert writer.submit(*upload)
+    writer.stop()
+
+
+def test_uploads_bytes_and_deferred_payloads(fake):
+    writer = ArtifactWriter(num_threads=2, backoff_base=0)
+    run(writer, ("logs", "a.json.gz", b"abc", "application/gzip"), ("dumps", "b.npy", lambda: b"\x93NUMPY"))
+    assert fake.objects == {
+        ("logs", "a.json.gz"): (b"abc", "application/gzip"),
+        ("dumps", "b.npy"): (b"\x93NUMPY", "application/octet-stream"),
+    }
+    assert fake.buckets == {"logs", "dumps"}
+    assert writer.uploaded == 2 and writer.failed == 0
+
+
+def test_transient_errors_are_retried(fake):
+    fake.failures = [s3_error("SlowDown"), ConnectionError("reset")]
+    writer = ArtifactWriter(num_threads=1, backoff_base=0)
+    run(writer, ("logs", "a", b"x"))
+    assert fake.puts == 3
+    assert writer.uploaded == 1
+
+
+@pytest.mark.parametrize("error", [s3_error("AccessDenied"), TypeError("bad payload")])
+def test_permanent_errors_are_not_retried(fake, error):
+    fake.failures = [error]
+    writer = ArtifactWriter(num_threads=1, backoff_base=10)
+    run(writer, ("logs", "a", b"x"))
+    assert fake.puts == 1
+    assert writer.failed == 1 and writer.uploaded == 0
+
+
+def test_gives_up_after_max_retries(fake):
+    fake.failures = [s3_error("InternalError")] * 10
+    writer = ArtifactWriter(num_threads=1, max_retries=2, backoff_base=0)
+    run(writer, ("logs", "a", b"x"))
+    assert fake.puts == 3
+    assert writer.failed == 1
+
+
+def test_serialization_errors_fail_without_an_upload(fake):
+    writer = ArtifactWriter(num_threads=1)
+    run(writer, ("logs", "a", lambda: 1 / 0))
+    assert fake.puts == 0 and writer.failed == 1
+
+
+def test_full_queue_drops(fake):
+    writer = ArtifactWriter(max_queue_size=1)
+    assert writer.submit("logs", "a", b"x")
+    assert not writer.submit("logs", "b", b"x")
+    assert writer.dropped == 1
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import httpx
+
+from tracer_sdk.async_tracer import AsyncRAGTracer
+
+
+def test_requests_go_to_api_url_with_a_caller_client():
+    urls = []
+
+    def handler(request):
+        urls.append(str(request.url))
+        body = json.loads(request.content)
+        if request.url.path == "/traces/batch":
+            return httpx.Response(200, json={"ids": list(range(len(body)))})
+        return httpx.Response(200, json={"id": 1})
+
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        tracer = AsyncRAGTracer("http://tracing.test:8000/", client=client, flush_interval=60)
+        assert await tracer.send_trace({"user_query": "q"}) == {"id": 1}
+        tracer.enqueue({"user_query": "q"})
+        assert await tracer.flush(timeout=5)
+        stats = tracer.stats()
+        await tracer.aclose()
+        await client.aclose()
+        return stats
+
+    stats = asyncio.run(main())
+    assert urls == ["http://tracing.test:8000/traces/", "http://tracing.test:8000/traces/batch"]
+    assert stats["sent"] == 1 and stats["failed"] == 0
+
+
+def test_concurrent_flushes_do_not_cancel_each_other():
+    release = None
+    batches = []
+
+    async def handler(request):
+        await release.wait()
+        body = json.loads(request.content)
+        batches.append(len(body))
+        return httpx.Response(200, json={"ids": list(range(len(body)))})
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        tracer = AsyncRAGTracer("http://tracing.test", client=client, max_batch_size=100, flush_interval=60)
+        tracer.enqueue({"user_query": "first"})
+        waiting = asyncio.ensure_future(tracer.flush())
+        # A second flush times out while the first is still waiting
+        assert not await tracer.flush(timeout=0.05)
+        tracer.enqueue({"user_query": "second"})
+        release.set()
+        # The first flush must still drain the trace queued after the timeout
+        assert await asyncio.wait_for(waiting, 2)
+        stats = tracer.stats()
+        await tracer.aclose()
+        await client.aclose()
+        return stats
+
+    stats = asyncio.run(main())
+    assert stats["sent"] == 2 and stats["pending"] == 0
+    assert sum(batches) == 2
@@ -0,0 +1,73 @@
+from contextlib import contextmanager
+
+import fakeredis
+import pytest
+
+from app.core import tasks
+from app.schemas import traces as schemas
+from app.services.checks import check_priority
+
+
+def trace(scores=(), **fields):
+    return schemas.TraceIn(
+        user_query="q",
+        final_prompt="q",
+        retrievals=[{"document_id": str(i), "similarity_score": s} for i, s in enumerate(scores)],
+        response=fields.pop("response", {"text": "a"}),
+        **fields,
+    )
+
+
+@pytest.mark.parametrize(
+    "scores, priority",
+    [((), "high"), ((0.2, 0.49), "high"), ((0.3, 0.5), "default"), ((0.84,), "default"), ((0.1, 0.85), "low")],
+)
+def test_priority_follows_the_best_retrieval(scores, priority):
+    assert check_priority(trace(scores)) == priority
+
+
+def test_explicit_priority_wins_over_risk_and_sampling():
+    assert check_priority(trace((0.9,), check_priority="high"), stripped=True) == "high"
+    assert check_priority(trace((0.1,)), stripped=True) == "low"
+
+
+def test_traces_with_a_client_check_are_not_enqueued():
+    checked = trace(response={"text": "a", "hallucination_check": {"groundedness_score": 1.0}})
+    assert check_priority(checked, stripped=True) is None
+
+
+class FakeCelery:
+    def __init__(self, fail_for=()):
+        self.sent = []
+        self.fail_for = set(fail_for)
+
+    @contextmanager
+    def producer_or_acquire(self):
+        yield None
+
+    def send_task(self, name, args, kwargs, queue, producer, retry):
+        if args[0] in self.fail_for:
+            raise ConnectionError("broker down")
+        self.sent.append((args[0], queue))
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    celery = FakeCelery()
+    monkeypatch.setattr(tasks, "_redis", fakeredis.FakeRedis())
+    monkeypatch.setattr(tasks, "celery_client", celery)
+    return celery
+
+
+def test_checks_go_to_their_priority_queue_once(broker):
+    assert tasks.enqueue_checks([(1, "high"), (2, "low")]) == 2
+    # A retried ingest or the sweeper submits them again while still pending
+    assert tasks.enqueue_checks([(1, "high"), (3, "default")]) == 1
+    assert broker.sent == [(1, "hallucination.high"), (2, "hallucination.low"), (3, "hallucination.default")]
+
+
+def test_failed_publish_releases_the_claim(broker):
+    broker.fail_for = {1}
+    assert tasks.enqueue_checks([(1, "high")]) == 0
+    broker.fail_for = set()
+    assert tasks.enqueue_checks([(1, "high")]) == 1
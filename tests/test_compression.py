@@ -0,0 +1,72 @@
+import gzip
+import json
+import zlib
+
+import pytest
+import zstandard
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import DecompressionMiddleware, decompress
+from tracer_sdk.compression import BodyEncoder
+
+PAYLOAD = [{"user_query": "q" * 100, "retrievals": [{"document_id": str(i)} for i in range(50)]}]
+
+
+def test_small_bodies_are_not_compressed():
+    body, headers = BodyEncoder("gzip", threshold=10_000).encode({"a": 1})
+    assert body == b'{"a":1}'
+    assert "Content-Encoding" not in headers
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_sdk_bodies_decode_on_the_server(codec):
+    body, headers = BodyEncoder(codec, threshold=0).encode(PAYLOAD)
+    assert headers["Content-Encoding"] == codec
+    assert json.loads(decompress(codec, body)) == PAYLOAD
+
+
+def test_gzip_output_is_deterministic():
+    encoder = BodyEncoder("gzip", threshold=0)
+    assert encoder.encode(PAYLOAD)[0] == encoder.encode(PAYLOAD)[0]
+
+
+def test_encoder_rejects_unknown_codecs():
+    with pytest.raises(ValueError):
+        BodyEncoder("brotli")
+
+
+def test_decompress_enforces_the_limit():
+    bomb = gzip.compress(b"\0" * 100_000)
+    with pytest.raises(compression._TooLarge):
+        decompress("gzip", bomb, limit=1000)
+    assert decompress("deflate", zlib.compress(b"x" * 10)) == b"x" * 10
+    assert decompress("zstd", zstandard.ZstdCompressor().compress(b"abc")) == b"abc"
+
+
+@pytest.fixture
+def client():
+    async def echo(request: Request):
+        return JSONResponse({"body": (await request.json()), "encoding": request.headers.get("content-encoding")})
+
+    app = Starlette(routes=[Route("/echo", echo, methods=["POST"])])
+    app.add_middleware(DecompressionMiddleware)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_middleware_serves_plain_json_to_the_app(client, codec):
+    body, headers = BodyEncoder(codec, threshold=0).encode(PAYLOAD)
+    response = client.post("/echo", content=body, headers=headers)
+    assert response.json() == {"body": PAYLOAD, "encoding": None}
+
+
+def test_middleware_errors(client):
+    headers = {"Content-Type": "application/json"}
+    assert client.post("/echo", content=b"x", headers={**headers, "Content-Encoding": "br"}).status_code == 415
+    assert client.post("/echo", content=b"not gzip", headers={**headers, "Content-Encoding": "gzip"}).status_code == 400
+    assert client.post("/echo", content=b'{"a":1}', headers=headers).json()["body"] == {"a": 1}
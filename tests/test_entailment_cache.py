@@ -0,0 +1,93 @@
+import fakeredis
+import pytest
+import redis
+
+from entailment_cache import EntailmentCache, RedisTier, SqliteTier, build_cache
+
+
+class CountingEngine:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs):
+        self.calls.append(list(pairs))
+        return [("ENTAILMENT", 0.9) for _ in pairs]
+
+
+class BrokenTier:
+    name = "broken"
+
+    def get_many(self, keys):
+        raise ConnectionError("down")
+
+    def set_many(self, items):
+        raise ConnectionError("down")
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url", lambda url, **kwargs: fakeredis.FakeRedis(server=server))
+    return server
+
+
+def test_keys_ignore_whitespace_but_not_the_model_version():
+    cache = EntailmentCache("v1")
+    assert cache.key("Paris  is\nbig", "x") == cache.key("Paris is big ", "x")
+    assert cache.key("a", "b") != EntailmentCache("v2").key("a", "b")
+
+
+def test_engine_only_sees_unseen_unique_pairs():
+    cache, engine = EntailmentCache("v1"), CountingEngine()
+    assert cache.predict(engine, [("p", "h"), ("p", "h"), ("p", "g")]) == [("ENTAILMENT", 0.9)] * 3
+    cache.predict(engine, [("p", "h"), ("p", "f")])
+    assert engine.calls == [[("p", "h"), ("p", "g")], [("p", "f")]]
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = EntailmentCache("v1", max_entries=2)
+    cache.set_many({"a": ("NEUTRAL", 0.1), "b": ("NEUTRAL", 0.2)})
+    cache.get_many(["a"])
+    cache.set_many({"c": ("NEUTRAL", 0.3)})
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+
+def test_misses_fall_through_to_the_shared_tier(server):
+    writer = EntailmentCache("v1", shared=RedisTier(url="redis://cache"))
+    writer.predict(CountingEngine(), [("p", "h")])
+
+    # Another worker process: empty LRU, same Redis
+    reader, engine = EntailmentCache("v1", shared=RedisTier(url="redis://cache")), CountingEngine()
+    assert reader.predict(engine, [("p", "h")]) == [("ENTAILMENT", 0.9)]
+    assert engine.calls == []
+    # ...and the hit is now served from memory
+    reader.shared = BrokenTier()
+    assert reader.get_many([reader.key("p", "h")]) == {reader.key("p", "h"): ("ENTAILMENT", 0.9)}
+
+
+def test_redis_entries_expire(server):
+    tier = RedisTier(url="redis://cache", ttl=60)
+    tier.set_many({"k": ("CONTRADICTION", 0.7)})
+    assert tier.get_many(["k", "other"]) == {"k": ("CONTRADICTION", 0.7)}
+    assert 0 < fakeredis.FakeRedis(server=server).ttl("entail:k") <= 60
+
+
+def test_shared_tier_failures_degrade_to_the_engine():
+    cache, engine = EntailmentCache("v1", shared=BrokenTier()), CountingEngine()
+    assert cache.predict(engine, [("p", "h")]) == [("ENTAILMENT", 0.9)]
+    assert len(engine.calls) == 1
+
+
+def test_sqlite_tier_keeps_the_newest_rows(tmp_path):
+    tier = SqliteTier(path=str(tmp_path / "cache.sqlite"), max_rows=2)
+    for i in range(3):
+        tier.set_many({f"k{i}": ("NEUTRAL", i / 10)})
+    assert set(tier.get_many(["k0", "k1", "k2"])) == {"k1", "k2"}
+
+
+def test_build_cache_backends(server):
+    assert build_cache("v1", backend="off") is None
+    assert build_cache("v1", backend="none").shared is None
+    assert isinstance(build_cache("v1", backend="redis").shared, RedisTier)
+    with pytest.raises(ValueError):
+        build_cache("v1", backend="memcached")
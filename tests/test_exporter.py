@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from tracer_sdk.exporter import BatchExporter
+
+
+class Recorder:
+    """send_batch stand-in that records batches and can be held up."""
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, batch):
+        self.release.wait()
+        self.batches.append([t["i"] for t in batch])
+        return {"ids": list(range(len(batch)))}
+
+
+def traces(n, start=0):
+    return [{"i": i} for i in range(start, start + n)]
+
+
+def test_rejects_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        BatchExporter(Recorder(), overflow_policy="spill")
+
+
+def test_flush_sends_everything_in_batches():
+    send = Recorder()
+    exporter = BatchExporter(send, max_batch_size=10, flush_interval=60)
+    for trace in traces(25):
+        assert exporter.submit(trace)
+    assert exporter.flush(timeout=5)
+    assert sorted(i for batch in send.batches for i in batch) == list(range(25))
+    assert all(len(batch) <= 10 for batch in send.batches)
+    assert exporter.stats()["sent"] == 25
+    exporter.shutdown()
+
+
+def test_full_batch_is_sent_without_waiting_for_the_interval():
+    send = Recorder()
+    exporter = BatchExporter(send, max_batch_size=5, flush_interval=60)
+    for trace in traces(5):
+        exporter.submit(trace)
+    deadline = time.monotonic() + 5
+    while not send.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert send.batches == [[0, 1, 2, 3, 4]]
+    exporter.shutdown()
+
+
+def test_drop_new_keeps_the_oldest():
+    send = Recorder()
+    send.release.clear()
+    exporter = BatchExporter(send, max_queue_size=3, max_batch_size=100, flush_interval=60, overflow_policy="drop_new")
+    results = [exporter.submit(t) for t in traces(5)]
+    assert results == [True, True, True, False, False]
+    send.release.set()
+    exporter.flush(timeout=5)
+    assert send.batches == [[0, 1, 2]]
+    assert exporter.stats()["dropped"] == 2
+    exporter.shutdown()
+
+
+def test_drop_oldest_keeps_the_newest():
+    send = Recorder()
+    exporter = BatchExporter(send, max_queue_size=3, max_batch_size=100, flush_interval=60, overflow_policy="drop_oldest")
+    assert all(exporter.submit(t) for t in traces(5))
+    exporter.flush(timeout=5)
+    assert send.batches == [[2, 3, 4]]
+    assert exporter.stats()["dropped"] == 2
+    exporter.shutdown()
+
+
+def test_block_waits_for_room():
+    send = Recorder()
+    send.release.clear()
+    exporter = BatchExporter(send, max_queue_size=2, max_batch_size=2, flush_interval=0.01, overflow_policy="block")
+    exporter.submit({"i": 0})
+    exporter.submit({"i": 1})
+    done = threading.Event()
+
+    def submit_more():
+        for trace in traces(3, start=2):
+            exporter.submit(trace)
+        done.set()
+
+    threading.Thread(target=submit_more, daemon=True).start()
+    assert not done.wait(0.2)
+    send.release.set()
+    assert done.wait(5)
+    exporter.flush(timeout=5)
+    assert sorted(i for batch in send.batches for i in batch) == list(range(5))
+    assert exporter.stats()["dropped"] == 0
+    exporter.shutdown()
+
+
+def test_failed_sends_are_counted():
+    def send(batch):
+        raise ConnectionError("down")
+
+    exporter = BatchExporter(send, max_batch_size=10, flush_interval=60)
+    for trace in traces(3):
+        exporter.submit(trace)
+    assert exporter.flush(timeout=5)
+    assert exporter.stats()["failed"] == 3
+    exporter.shutdown()
+
+
+def test_timed_out_flush_does_not_stop_batching():
+    send = Recorder()
+    send.release.clear()
+    exporter = BatchExporter(send, max_batch_size=10, flush_interval=60)
+    exporter.submit({"i": 0})
+    assert not exporter.flush(timeout=0.1)
+    send.release.set()
+    deadline = time.monotonic() + 5
+    while exporter.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Without a pending flush, traces wait for a full batch again
+    for trace in traces(3, start=1):
+        exporter.submit(trace)
+    time.sleep(0.2)
+    assert send.batches == [[0]]
+    assert exporter.flush(timeout=5)
+    assert send.batches == [[0], [1, 2, 3]]
+    exporter.shutdown()
+
+
+def test_submit_after_shutdown_is_dropped():
+    exporter = BatchExporter(Recorder())
+    exporter.shutdown()
+    assert not exporter.submit({"i": 0})
+    assert exporter.stats()["dropped"] == 1
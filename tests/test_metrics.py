@@ -0,0 +1,35 @@
+import gzip
+import json
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.database import get_async_db
+from app.main import app
+from app.services import ingest
+
+
+def request_count(route):
+    labels = {"method": "POST", "route": route, "status": "200"}
+    return REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) or 0
+
+
+def test_compressed_requests_are_labelled_with_their_route(monkeypatch):
+    async def store_traces(db, traces):
+        return list(range(len(traces)))
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(ingest, "store_traces", store_traces)
+    app.dependency_overrides[get_async_db] = no_db
+    body = json.dumps([{"user_query": "q", "final_prompt": "p", "response": {"text": "t"}}]).encode()
+    try:
+        before = request_count("/traces/batch")
+        client = TestClient(app)
+        for headers, content in (({}, body), ({"Content-Encoding": "gzip"}, gzip.compress(body))):
+            response = client.post("/traces/batch", content=content, headers={"Content-Type": "application/json", **headers})
+            assert response.json() == {"ids": [0]}
+    finally:
+        app.dependency_overrides.clear()
+    assert request_count("/traces/batch") == before + 2
@@ -0,0 +1,108 @@
+import json
+import os
+import re
+import shutil
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from app.core import minio_utils
+from app.core.parquet import stream_to_minio
+from app.models.tracing import EMBEDDING_DIM
+from app.services import export
+from app.services.partitions import _arrow_type
+from tracer_sdk.analytics import embedding_matrix, load_traces
+
+
+def select_aliases(sql):
+    """Output column names of the top-level SELECT list."""
+    select_list = sql[sql.index("SELECT") + len("SELECT"):sql.index("\nFROM prompts p")]
+    items, depth, current = [], 0, ""
+    for char in select_list:
+        depth += char == "("
+        depth -= char == ")"
+        if char == "," and depth == 0:
+            items.append(current)
+            current = ""
+        else:
+            current += char
+    items.append(current)
+    return [re.search(r"(\w+)\s*$", item).group(1) for item in items]
+
+
+def test_export_sql_columns_match_the_schema():
+    # Rows are written positionally, so the orders must agree
+    assert select_aliases(export._EXPORT_SQL) == export.export_schema().names
+
+
+def test_object_name_is_hive_partitioned():
+    assert export.object_name(date(2026, 10, 5)) == "traces/date=2026-10-05/part-0.parquet"
+
+
+def row(trace_id, embedding=None, **values):
+    data = dict.fromkeys(export.export_schema().names)
+    data.update(
+        trace_id=trace_id,
+        created_at=datetime(2026, 10, 5, 12, tzinfo=timezone.utc),
+        user_query="q",
+        final_prompt="p",
+        embedding=embedding,
+        sample_rate=1.0,
+        **values,
+    )
+    return tuple(data[name] for name in export.export_schema().names)
+
+
+def test_export_rows_round_trip_through_the_sdk_reader(tmp_path, monkeypatch):
+    uploads = {}
+
+    def upload_file(bucket, object_name, file_path):
+        target = tmp_path / bucket / object_name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(file_path, target)
+        uploads[(bucket, object_name)] = target
+
+    monkeypatch.setattr(minio_utils, "upload_file", upload_file)
+    vector = np.arange(EMBEDDING_DIM, dtype=np.float32) / EMBEDDING_DIM
+    batches = [
+        [
+            row(1, embedding=vector.tolist(), retrievals=[{"document_id": "d1", "similarity_score": 0.9, "metadata": {"k": 1}}],
+                entailment_results=[{"label": "ENTAILMENT"}], unsupported_sentences=["s"], total_latency_ms=120.0),
+            row(2),
+        ],
+        [row(3, embedding=vector.tolist(), retrieval_candidates=[{"doc_id": "d1"}])],
+    ]
+    written = stream_to_minio(batches, export.export_schema(), "trace-exports",
+                              export.object_name(date(2026, 10, 5)), export._CONVERTERS)
+    assert written == 3
+
+    table = load_traces(str(tmp_path / "trace-exports" / "traces"), start="2026-10-05", end="2026-10-06")
+    assert table.num_rows == 3
+    assert table["date"].to_pylist() == ["2026-10-05"] * 3
+    first = table.slice(0, 1).to_pylist()[0]
+    assert first["retrievals"] == [{"document_id": "d1", "similarity_score": 0.9, "metadata": '{"k": 1}'}]
+    assert json.loads(first["entailment_results"]) == [{"label": "ENTAILMENT"}]
+    assert table["retrievals"][1].as_py() == []
+    assert json.loads(table["retrieval_candidates"][2].as_py()) == [{"doc_id": "d1"}]
+
+    ids, matrix = embedding_matrix(table)
+    assert ids == [1, 3]
+    assert matrix.shape == (2, EMBEDDING_DIM) and matrix.dtype == np.float32
+    np.testing.assert_array_equal(matrix[1], vector)
+
+    assert load_traces(str(tmp_path / "trace-exports" / "traces"), start="2026-10-06").num_rows == 0
+    assert os.path.getsize(uploads[("trace-exports", "traces/date=2026-10-05/part-0.parquet")]) > 0
+
+
+@pytest.mark.parametrize("data_type, udt, expected", [
+    ("USER-DEFINED", "vector", pa.list_(pa.float32())),
+    ("integer", "int4", pa.int32()),
+    ("double precision", "float8", pa.float64()),
+    ("timestamp with time zone", "timestamptz", pa.timestamp("us", tz="UTC")),
+    ("json", "json", pa.string()),
+    ("character varying", "varchar", pa.string()),
+])
+def test_archive_column_types(data_type, udt, expected):
+    assert _arrow_type(pa, data_type, udt) == expected
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+from app.services import partitions
+from app.services.partitions import (
+    PARTITIONED_TABLES,
+    drop_expired_partitions,
+    late_rows_filter,
+    partition_name,
+    retention_windows,
+)
+
+DAY = timedelta(days=1)
+JAN_1 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def daily(table, days, start=JAN_1):
+    """list_partitions() rows for consecutive daily partitions plus the default."""
+    rows = [(partition_name(table, start + DAY * i), start + DAY * i, start + DAY * (i + 1)) for i in range(days)]
+    return rows + [(f"{table}_default", None, None)]
+
+
+class Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Answers list_partitions() and records every other statement."""
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.log = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if sql == partitions._PARTITIONS_SQL:
+            return Rows(self.layout[params["table"]])
+        self.log.append((sql, params))
+        return Rows([])
+
+    def commit(self):
+        self.log.append(("COMMIT", None))
+
+    def rollback(self):
+        self.log.append(("ROLLBACK", None))
+
+
+def test_children_follow_their_prompts_partition():
+    layout = {table: daily(table, 4) for table in PARTITIONED_TABLES}
+    windows = retention_windows(layout, cutoff=JAN_1 + DAY * 2)
+
+    assert [(name, lower) for name, lower, _, _ in windows] == [
+        ("prompts_p20260101", JAN_1),
+        ("prompts_p20260102", JAN_1 + DAY),
+    ]
+    assert windows[0][3]["hallucination_checks"] == ["hallucination_checks_p20260101"]
+    assert windows[1][3]["responses"] == ["responses_p20260102"]
+
+
+def test_child_partitions_wait_for_an_expired_prompts_partition():
+    # Prompts switched to weekly ranges; the daily checks inside the week stay until the week expires
+    layout = {table: [] for table in PARTITIONED_TABLES}
+    layout["prompts"] = [("prompts_p20260105", JAN_1 + DAY * 4, JAN_1 + DAY * 11)]
+    layout["hallucination_checks"] = daily("hallucination_checks", 7, start=JAN_1 + DAY * 4)
+
+    assert retention_windows(layout, cutoff=JAN_1 + DAY * 8) == []
+    [(_, _, _, tables)] = retention_windows(layout, cutoff=JAN_1 + DAY * 11)
+    assert len(tables["hallucination_checks"]) == 7
+
+
+def test_late_rows_are_matched_through_their_prompts():
+    assert late_rows_filter("responses", "prompts_p20260101") == (
+        "created_at >= :upper AND prompt_id IN (SELECT id FROM prompts_p20260101)"
+    )
+    checks = late_rows_filter("hallucination_checks", "prompts_p20260101")
+    assert checks.startswith("checked_at >= :upper AND response_id IN (SELECT id FROM responses")
+    assert "prompt_id IN (SELECT id FROM prompts_p20260101)" in checks
+
+
+def test_drop_removes_late_children_before_their_parents():
+    db = FakeSession({table: daily(table, 3) for table in PARTITIONED_TABLES})
+    now = JAN_1 + DAY * 3
+
+    dropped = drop_expired_partitions(db, now=now, retention_days=2, archive=False)
+
+    assert dropped[-1] == "prompts_p20260101"
+    assert set(dropped) == {partition_name(table, JAN_1) for table in PARTITIONED_TABLES}
+    statements = [sql for sql, _ in db.log]
+    deletes = [sql.split()[2] for sql in statements if sql.startswith("DELETE")]
+    assert deletes == ["hallucination_checks", "embeddings", "retrievals", "telemetry", "responses"]
+    # Late rows go while the partitions they are matched through still exist
+    assert statements.index("DROP TABLE responses_p20260101") > max(
+        i for i, sql in enumerate(statements) if sql.startswith("DELETE")
+    )
+    assert all(params == {"upper": JAN_1 + DAY} for sql, params in db.log if sql.startswith("DELETE"))
+    assert statements[-1] == "COMMIT"
+
+
+def test_failed_archive_keeps_the_window_and_newer_ones(monkeypatch):
+    db = FakeSession({table: daily(table, 3) for table in PARTITIONED_TABLES})
+    archived = []
+
+    def archive_partition(db, table, name):
+        archived.append(name)
+        if name == "hallucination_checks_p20260101":
+            raise OSError("minio down")
+
+    monkeypatch.setattr(partitions, "archive_partition", archive_partition)
+    monkeypatch.setattr(partitions, "archive_rows", lambda *args: None)
+
+    assert drop_expired_partitions(db, now=JAN_1 + DAY * 4, retention_days=2, archive=True) == []
+    assert archived == ["hallucination_checks_p20260101"]
+    assert db.log == [("ROLLBACK", None)]
@@ -0,0 +1,69 @@
+from prefilter import LEXICAL_ENTAILMENT_SCORE, content_tokens, overlap_scores, stage_pairs
+
+DOCS = [
+    "Elon Musk is the chief executive of Tesla and SpaceX.",
+    "The Eiffel Tower stands in Paris and opened in 1889.",
+    "Photosynthesis converts sunlight into chemical energy.",
+]
+
+
+def test_content_tokens_drop_stopwords_and_case():
+    assert content_tokens("The CEO of Tesla is Elon Musk.") == {"ceo", "tesla", "elon", "musk"}
+
+
+def test_overlap_scores():
+    scores = overlap_scores(["Tesla is run by Elon Musk", "Paris has the Eiffel Tower"], DOCS)
+    assert scores.shape == (2, 3)
+    assert scores[0, 0] == 0.75  # tesla, elon, musk of tesla, run, elon, musk
+    assert scores[1, 1] == 1.0
+    assert scores[0, 2] == 0.0
+    assert overlap_scores([], DOCS).shape == (0, 3)
+    assert overlap_scores(["x"], []).shape == (1, 0)
+
+
+def test_near_verbatim_sentences_are_decided_lexically():
+    sentence = "The Eiffel Tower opened in 1889."
+    model_pairs, lexical, stats = stage_pairs([sentence], DOCS)
+    assert model_pairs == []
+    assert lexical == {(DOCS[1], sentence): ("ENTAILMENT", 1.0)}
+    assert stats == {"total_pairs": 3, "model_pairs": 0, "lexical_pairs": 1, "avoided_model_calls": 3}
+
+
+def test_partial_overlap_goes_to_the_model_top_k_only():
+    sentence = "Elon Musk founded Tesla near the Eiffel Tower."
+    model_pairs, lexical, stats = stage_pairs([sentence], DOCS, top_k=1)
+    assert lexical == {}
+    assert model_pairs == [(DOCS[0], sentence)]
+    assert stats["avoided_model_calls"] == 2
+    assert stage_pairs([sentence], DOCS, top_k=3)[0] == [(DOCS[0], sentence), (DOCS[1], sentence)]
+
+
+def test_unrelated_documents_are_skipped():
+    model_pairs, lexical, stats = stage_pairs(["Bananas are yellow fruit."], DOCS)
+    assert model_pairs == [] and lexical == {}
+    assert stats["avoided_model_calls"] == 3
+
+
+def test_pairs_of_a_sentence_do_not_depend_on_its_neighbours():
+    # Streaming prechecks rely on this to reuse cached predictions
+    sentence = "Elon Musk runs Tesla and also paints."
+    alone = stage_pairs([sentence], DOCS)
+    together = stage_pairs(["The Eiffel Tower opened in 1889.", sentence], DOCS)
+    assert set(alone[0]) <= set(together[0])
+    assert [p for p in together[0] if p[1] == sentence] == alone[0]
+
+
+def test_no_documents():
+    model_pairs, lexical, stats = stage_pairs(["Anything."], [])
+    assert (model_pairs, lexical, stats["total_pairs"]) == ([], {}, 0)
+
+
+def test_lexical_entailment_clears_the_model_threshold_whatever_the_overlap():
+    # summarize_entailment counts a sentence as supported only above ENTAILMENT_THRESHOLD
+    # (0.7 by default); an accepted pair must not fall below it at a low entail threshold
+    sentence = "Elon Musk runs Tesla and paints."  # overlap 3/5 with DOCS[0]
+    model_pairs, lexical, _ = stage_pairs([sentence], DOCS, entail_threshold=0.6)
+    assert model_pairs == []
+    label, score = lexical[(DOCS[0], sentence)]
+    assert label == "ENTAILMENT" and score == LEXICAL_ENTAILMENT_SCORE > 0.7
+    assert stage_pairs([sentence], DOCS, entail_threshold=0.61)[1] == {}
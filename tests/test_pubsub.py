@@ -0,0 +1,47 @@
+import asyncio
+
+import fakeredis
+
+from app.core.pubsub import PubSub, RedisRelay
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_subscribers_see_traces_stored_by_other_processes():
+    async def main():
+        server = fakeredis.FakeServer()
+        # Two API workers, each with its own in-process subscribers
+        ingesting, serving = PubSub(), PubSub()
+        relays = [RedisRelay(ingesting, poll_seconds=0.05), RedisRelay(serving, poll_seconds=0.05)]
+        for relay in relays:
+            await relay.start(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+        try:
+            assert not relays[0].listening
+            subscription = serving.subscribe()
+            await wait_for(lambda: relays[0].listening)
+
+            relays[0].publish('{"type": "trace"}')
+            assert await asyncio.wait_for(subscription.get(), 2) == '{"type": "trace"}'
+
+            serving.unsubscribe(subscription)
+            await wait_for(lambda: not relays[0].listening)
+        finally:
+            for relay in relays:
+                await relay.stop()
+
+    asyncio.run(main())
+
+
+def test_unstarted_relay_publishes_in_process():
+    local = PubSub()
+    relay = RedisRelay(local, url="")
+    assert not relay.listening
+    subscription = local.subscribe()
+    assert relay.listening
+    relay.publish("summary")
+    assert subscription.queue.get_nowait() == "summary"
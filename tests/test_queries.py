@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import get_async_db
+from app.main import app
+from app.services.queries import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2026, 10, 1, 12, 30, 5, 123456, tzinfo=timezone.utc),
+    datetime(2026, 10, 1, 12, 30, tzinfo=timezone(timedelta(hours=2))),
+])
+def test_cursor_round_trip(created_at):
+    cursor = encode_cursor(created_at, 42)
+    assert decode_cursor(cursor) == (created_at, 42)
+    assert cursor.isascii() and "/" not in cursor and "+" not in cursor
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "bm9waXBl", encode_cursor(datetime(2026, 1, 1), 1)[:-4] + "!!!!"])
+def test_invalid_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_invalid_cursor_is_a_400():
+    async def no_db():
+        yield None
+
+    app.dependency_overrides[get_async_db] = no_db
+    try:
+        response = TestClient(app).get("/traces", params={"cursor": "bm9waXBl"})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_trace_documents_without_vectors_match_the_schemas():
+    from app.schemas.traces import TraceFieldsOut, TraceOut
+
+    embedding = {"vector": None, "vector_b64": None, "vector_dtype": None, "retrieval_candidates": None, "id": 3}
+    document = {
+        "id": 1, "user_query": "q", "system_prompt": None, "final_prompt": "p",
+        "embeddings": [embedding], "retrievals": [], "responses": [], "telemetry": None,
+    }
+    assert TraceOut.parse_obj(document).embeddings[0].vector is None
+    assert TraceFieldsOut.parse_obj({"id": 1, "embeddings": [embedding]}).user_query is None
+
+
+def test_trace_routes_document_their_raw_responses():
+    paths = TestClient(app).get("/openapi.json").json()["paths"]
+    assert paths["/traces/"]["post"]["responses"]["200"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/TraceOut"
+    }
+    assert paths["/traces/{prompt_id}"]["get"]["responses"]["200"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/TraceFieldsOut"
+    }
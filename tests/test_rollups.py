@@ -0,0 +1,78 @@
+import pytest
+
+from app.services.rollups import GRANULARITIES, histogram_percentiles, latency_bin_value, refresh_rollups
+
+
+def test_percentiles_pick_the_bin_holding_the_quantile():
+    bins = [(10, 50), (20, 40), (30, 10)]
+    assert histogram_percentiles(bins, [0.0, 0.5, 0.9, 0.95, 1.0]) == [
+        latency_bin_value(10), latency_bin_value(10), latency_bin_value(20), latency_bin_value(30), latency_bin_value(30),
+    ]
+    assert histogram_percentiles([], [0.5]) == [None]
+
+
+def test_percentiles_of_weighted_counts():
+    # Traces kept at sample_rate 0.4 count 2.5 times each
+    bins = [(5, 0.5), (6, 2.5)]
+    assert histogram_percentiles(bins, [0.1, 0.5, 1.0]) == [
+        latency_bin_value(5), latency_bin_value(6), latency_bin_value(6),
+    ]
+    bins = [(5, 1 / 3)] * 3
+    assert histogram_percentiles(bins, [1.0]) == [latency_bin_value(5)]
+
+
+def test_bins_are_about_ten_percent_apart():
+    assert latency_bin_value(1) / latency_bin_value(0) == pytest.approx(1.1)
+
+
+class Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one(self):
+        return self.value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeSession:
+    """Serves watermarks and pending max ids; records the rollup statements."""
+
+    def __init__(self, watermarks, pending):
+        self.watermarks = watermarks
+        self.pending = pending
+        self.rollups = []
+        self.commits = 0
+
+    def execute(self, statement, params):
+        sql = str(statement)
+        if sql.startswith("SELECT last_id"):
+            return Result(self.watermarks.get(params["source"], 0))
+        if sql.startswith("SELECT max(id)"):
+            source = sql.split(" FROM ")[2].split()[0]
+            assert params["lo"] == self.watermarks.get(source, 0)
+            return Result(self.pending[source])
+        if sql.startswith("UPDATE rollup_watermarks"):
+            self.watermarks[params["source"]] = params["hi"]
+        elif "INSERT INTO rollup_watermarks" not in sql:
+            self.rollups.append((params["granularity"], params["lo"], params["hi"]))
+        return Result(None)
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_refresh_folds_the_pending_id_range_and_advances_the_watermark():
+    db = FakeSession({"telemetry": 100}, {"telemetry": 250, "hallucination_checks": None})
+
+    assert refresh_rollups(db) == {"telemetry": 150, "hallucination_checks": 0}
+    # Telemetry feeds the latency rollup and the histogram, each per granularity
+    assert db.rollups == [(g, 100, 250) for g in GRANULARITIES] * 2
+    assert db.watermarks == {"telemetry": 250}
+    assert db.commits == 2
+
+    db.pending["telemetry"] = None
+    db.rollups = []
+    assert refresh_rollups(db) == {"telemetry": 0, "hallucination_checks": 0}
+    assert db.rollups == []
@@ -0,0 +1,79 @@
+import pytest
+
+from tracer_sdk.data import EmbeddingData, HallucinationCheckData, ResponseData, TelemetryData
+from tracer_sdk.sampling import Sampler
+
+
+def build(sampler, sampled, telemetry=None, response=None, route=None):
+    return sampler.build_payload(
+        sampled,
+        user_query="q",
+        final_prompt="p",
+        embedding=EmbeddingData(vector=[0.1, 0.2]),
+        retrievals=[],
+        response=response or ResponseData(text="t", token_stream=["t"]),
+        telemetry=telemetry,
+        route=route,
+    )
+
+
+@pytest.mark.parametrize("kwargs", [{"rate": 1.5}, {"route_rates": {"chat": -0.1}}, {"unsampled": "keep"}])
+def test_rejects_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        Sampler(**kwargs)
+
+
+def test_head_rate_is_respected():
+    sampler = Sampler(rate=0.25, seed=1)
+    share = sum(sampler.sample() for _ in range(20000)) / 20000
+    assert 0.23 < share < 0.27
+    assert all(Sampler(rate=1.0).sample() for _ in range(100))
+    assert not any(Sampler(rate=0.0, seed=1).sample() for _ in range(100))
+
+
+def test_route_rates_override_the_default():
+    sampler = Sampler(rate=0.0, route_rates={"search": 1.0}, seed=1)
+    assert sampler.rate_for("search") == 1.0
+    assert sampler.rate_for("other") == 0.0
+    assert sampler.sample("search") and not sampler.sample("other")
+
+
+def test_strip_keeps_unsampled_traces_without_heavy_fields():
+    sampler = Sampler(rate=0.0)
+    payload = build(sampler, sampled=False)
+    assert "embedding" not in payload
+    assert "token_stream" not in payload["response"]
+    assert payload["check_priority"] == "low"
+    assert "sample_rate" not in payload
+
+    full = build(sampler, sampled=True)
+    assert full["embedding"]["vector"] == [0.1, 0.2]
+    assert full["response"]["token_stream"] == ["t"]
+    assert sampler.stats() == {"sampled": 1, "tail_kept": 0, "stripped": 1, "sampled_out": 0}
+
+
+def test_drop_weights_kept_traces_by_their_rate():
+    sampler = Sampler(rate=0.1, route_rates={"chat": 0.5}, unsampled="drop")
+    assert build(sampler, sampled=False) is None
+    assert build(sampler, sampled=True)["sample_rate"] == 0.1
+    assert build(sampler, sampled=True, route="chat")["sample_rate"] == 0.5
+    assert sampler.stats()["sampled_out"] == 1
+
+
+@pytest.mark.parametrize("telemetry, response", [
+    (TelemetryData(total_latency_ms=5000), None),
+    (TelemetryData(api_cost=0.5), None),
+    (None, ResponseData(text="t", hallucination_check=HallucinationCheckData(groundedness_score=0.2))),
+])
+def test_tail_rules_keep_unsampled_traces_in_full(telemetry, response):
+    sampler = Sampler(rate=0.0, keep_latency_ms=1000, keep_cost=0.1, keep_groundedness_below=0.5, unsampled="drop")
+    payload = build(sampler, sampled=False, telemetry=telemetry, response=response)
+    assert payload is not None
+    assert "embedding" in payload and "sample_rate" not in payload
+    assert sampler.stats()["tail_kept"] == 1
+
+
+def test_tail_rules_ignore_traces_under_the_thresholds():
+    sampler = Sampler(rate=0.0, keep_latency_ms=1000, keep_cost=0.1, keep_groundedness_below=0.5, unsampled="drop")
+    grounded = ResponseData(text="t", hallucination_check=HallucinationCheckData(groundedness_score=0.9))
+    assert build(sampler, False, TelemetryData(total_latency_ms=10, api_cost=0.01), grounded) is None
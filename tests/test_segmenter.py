@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from app.core.segmenter import IncrementalSegmenter, segment
+
+TEXT = (
+    "Dr. Smith moved to the U.S. in 1999. The rate rose 3.14% (see example.com/a.html) last year! "
+    "Was it J. K. Rowling? Yes.\n\n"
+    "Steps:\n1. Install it.\n2. Run it.\n- Check the logs\n"
+    "\"Quoted sentence.\" Then more text… And the end"
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("One. Two! Three?", ["One.", "Two!", "Three?"]),
+    ("Pi is 3.14 exactly. Next.", ["Pi is 3.14 exactly.", "Next."]),
+    ("Mr. and Mrs. Smith e.g. left. Done.", ["Mr. and Mrs. Smith e.g. left.", "Done."]),
+    ("Read J. R. R. Tolkien. Now.", ["Read J. R. R. Tolkien.", "Now."]),
+    ("Visit example.com/x.html today. Ok.", ["Visit example.com/x.html today.", "Ok."]),
+    ("it ended. then lowercase.", ["it ended. then lowercase."]),
+    ("He said \"Stop.\" Then left.", ["He said \"Stop.\"", "Then left."]),
+    ("Intro\n\nSecond paragraph", ["Intro", "Second paragraph"]),
+    ("List:\n1. First item\n2. Second item", ["List:", "1. First item", "2. Second item"]),
+    ("Items\n- a\n- b", ["Items", "- a", "- b"]),
+    ("   ", []),
+    ("...", []),
+])
+def test_segment(text, expected):
+    assert segment(text) == expected
+
+
+def test_whitespace_is_normalized():
+    assert segment("A  sentence\nwrapped   here. Next one.") == ["A sentence wrapped here.", "Next one."]
+
+
+def test_incremental_waits_for_the_next_character():
+    segmenter = IncrementalSegmenter()
+    assert segmenter.feed("Hello there.") == []
+    assert segmenter.feed(" ") == []
+    assert segmenter.feed("Next") == ["Hello there."]
+    assert segmenter.finish() == ["Next"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_matches_whole_text(seed):
+    rng = random.Random(seed)
+    segmenter = IncrementalSegmenter()
+    sentences, i = [], 0
+    while i < len(TEXT):
+        step = rng.randint(1, 12)
+        sentences += segmenter.feed(TEXT[i:i + step])
+        i += step
+    sentences += segmenter.finish()
+    assert sentences == segment(TEXT)
+
+
+def test_segmenter_is_reusable_after_finish():
+    segmenter = IncrementalSegmenter()
+    segmenter.feed("First. Sec")
+    segmenter.finish()
+    assert segmenter.feed("1. Item\n2. Other") == ["1. Item"]
+    assert segmenter.finish() == ["2. Other"]
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from tracer_sdk.spans import Trace, current_trace, span, traced
+
+
+def emitted():
+    payloads = []
+    return payloads, payloads.append
+
+
+@traced("retrieval")
+async def retrieve(delay):
+    await asyncio.sleep(delay)
+    return current_trace()
+
+
+def test_spans_join_the_trace_across_await():
+    payloads, emit = emitted()
+
+    async def main():
+        async with Trace(emit, "q") as trace:
+            assert await retrieve(0.01) is trace
+            with span("llm"):
+                await asyncio.sleep(0.01)
+            # Tasks created inside the trace inherit it
+            assert await asyncio.create_task(retrieve(0)) is trace
+        assert current_trace() is None
+        return trace
+
+    trace = asyncio.run(main())
+    assert [s.name for s in trace.spans] == ["retrieval", "llm", "retrieval"]
+    assert len(payloads) == 1
+
+
+def test_concurrent_traces_keep_their_own_spans():
+    _, emit = emitted()
+
+    async def handle(query, delay):
+        async with Trace(emit, query) as trace:
+            await retrieve(delay)
+            await retrieve(0)
+        return trace
+
+    async def main():
+        return await asyncio.gather(handle("a", 0.02), handle("b", 0.01))
+
+    for trace in asyncio.run(main()):
+        assert [s.name for s in trace.spans] == ["retrieval", "retrieval"]
+
+
+def test_span_without_a_trace_is_a_no_op():
+    with span("llm") as timer:
+        pass
+    assert timer.trace is None and timer.duration_ms >= 0
+
+
+def test_telemetry_sums_stages_and_keeps_overrides():
+    _, emit = emitted()
+    with Trace(emit, "q") as trace:
+        for _ in range(2):
+            with span("embedding"):
+                time.sleep(0.005)
+        with span("rerank"):
+            pass
+        trace.set_telemetry(llm_latency_ms=42.0, api_cost=0.1)
+
+    telemetry = trace.telemetry()
+    assert sum(s.duration_ms for s in trace.spans if s.name == "embedding") == telemetry.embedding_latency_ms
+    assert telemetry.embedding_latency_ms >= 10
+    assert telemetry.retrieval_latency_ms is None
+    assert telemetry.llm_latency_ms == 42.0
+    assert telemetry.total_latency_ms >= telemetry.embedding_latency_ms
+    assert telemetry.api_cost == 0.1
+
+
+def test_unknown_telemetry_fields_are_rejected():
+    trace = Trace(lambda payload: None, "q")
+    with pytest.raises(TypeError, match="cost"):
+        trace.set_telemetry(cost=0.1)
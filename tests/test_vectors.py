@@ -0,0 +1,91 @@
+import io
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.core import vectors
+from app.models.tracing import EMBEDDING_DIM
+from app.schemas.traces import EmbeddingIn
+from tracer_sdk import encoding
+
+
+@pytest.fixture
+def vector():
+    return np.random.default_rng(0).uniform(-1, 1, EMBEDDING_DIM).astype(np.float32)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_sdk_encoding_round_trips_through_the_api(vector, dtype):
+    decoded = vectors.decode_vector(encoding.encode_vector(vector, dtype), dtype)
+    assert decoded.dtype == np.float32
+    np.testing.assert_allclose(decoded, vector, rtol=1e-3 if dtype == "float16" else 0)
+
+
+def test_sdk_struct_fallback_matches_numpy(vector, monkeypatch):
+    expected = encoding.encode_vector(vector, "float32")
+    monkeypatch.setattr(encoding, "np", None)
+    assert encoding.encode_vector(vector.tolist(), "float32") == expected
+
+
+def test_embedding_payload():
+    assert encoding.embedding_payload(np.array([1.0, 2.0]), None) == {"retrieval_candidates": None, "vector": [1.0, 2.0]}
+    payload = encoding.embedding_payload([1.0, 2.0], [], "float16")
+    assert payload["vector_dtype"] == "float16"
+    assert vectors.decode_vector(payload["vector_b64"], "float16").tolist() == [1.0, 2.0]
+    with pytest.raises(ValueError):
+        encoding.embedding_payload([1.0], None, "int8")
+
+
+def test_decode_rejects_bad_input():
+    with pytest.raises(ValueError):
+        vectors.decode_vector("AAAA", "int8")
+    with pytest.raises(ValueError):
+        vectors.decode_vector("not base64!")
+    with pytest.raises(ValueError):
+        vectors.decode_vector("AAAAAAA=")  # 5 bytes
+    assert vectors.decode_vector("AAAAAA==", "float16").size == 2
+
+
+def test_to_npy(vector):
+    assert np.array_equal(np.load(io.BytesIO(vectors.to_npy(vector))), vector)
+
+
+def test_embedding_in_decodes_once(vector, monkeypatch):
+    calls = []
+    decode = vectors.decode_vector
+    monkeypatch.setattr("app.schemas.traces.decode_vector", lambda *a: calls.append(a) or decode(*a))
+    embedding = EmbeddingIn(vector_b64=vectors.encode_vector(vector, "float16"), vector_dtype="float16")
+    embedding.array()
+    embedding.array()
+    assert len(calls) == 1
+    np.testing.assert_allclose(embedding.array(), vector, rtol=1e-3)
+
+
+def test_embedding_in_json_and_empty(vector):
+    assert np.array_equal(EmbeddingIn(vector=vector.tolist()).array(), vector)
+    assert EmbeddingIn(vector=[]).array().size == 0
+
+
+@pytest.mark.parametrize("fields", [
+    {},
+    {"vector": [0.1, 0.2]},
+    {"vector_b64": vectors.encode_vector(np.zeros(8))},
+    {"vector_b64": vectors.encode_vector(np.zeros(EMBEDDING_DIM)), "vector_dtype": "int8"},
+    {"vector_b64": "%%%"},
+])
+def test_embedding_in_rejects(fields):
+    with pytest.raises(ValidationError):
+        EmbeddingIn(**fields)
+
+
+def test_similar_traces_query(vector):
+    from app.schemas.traces import SimilarTracesIn
+
+    query = SimilarTracesIn(vector_b64=vectors.encode_vector(vector), k=5)
+    assert np.array_equal(query.array(), vector)
+    assert SimilarTracesIn(vector=[1.0, 2.0]).array().tolist() == [1.0, 2.0]
+    assert SimilarTracesIn(trace_id=7).array() is None
+    for fields in ({}, {"trace_id": 1, "vector": [1.0]}, {"vector_b64": "AAAA", "vector_dtype": "int8"}, {"vector_b64": "%%"}):
+        with pytest.raises(ValidationError):
+            SimilarTracesIn(**fields)
@@ -0,0 +1,108 @@
+"""
+Offline analysis of traces exported to Parquet by the API's export job.
+
+Reads the date-partitioned files (``<prefix>/date=YYYY-MM-DD/*.parquet``)
+straight from MinIO/S3 or a local copy, without touching Postgres. Needs the
+``analytics`` extra: ``pip install rag-tracer-sdk[analytics]``.
+"""
+from datetime import date
+from typing import List, Optional, Sequence, Tuple, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+except ImportError:  # optional dependency
+    pa = None
+
+DateLike = Union[date, str]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("analytics requires pyarrow: pip install rag-tracer-sdk[analytics]")
+
+
+def minio_filesystem(
+    endpoint: str = "localhost:9000",
+    access_key: str = "minioadmin",
+    secret_key: str = "minioadmin",
+    secure: bool = False,
+):
+    """An Arrow S3 filesystem pointed at a MinIO server."""
+    _require_pyarrow()
+    return fs.S3FileSystem(
+        endpoint_override=endpoint,
+        access_key=access_key,
+        secret_key=secret_key,
+        scheme="https" if secure else "http",
+    )
+
+
+def open_traces(path: str = "trace-exports/traces", filesystem=None):
+    """
+    Open the export as a pyarrow Dataset with a string "date" partition column.
+
+    Args:
+        path: "<bucket>/<prefix>" on the given filesystem, or a local directory
+        filesystem: e.g. minio_filesystem(); None reads the local filesystem
+    """
+    _require_pyarrow()
+    partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+    return ds.dataset(path, format="parquet", partitioning=partitioning, filesystem=filesystem)
+
+
+def load_traces(
+    path: str = "trace-exports/traces",
+    filesystem=None,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    columns: Optional[Sequence[str]] = None,
+    filter=None,
+):
+    """
+    Load exported traces into an Arrow table.
+
+    Only the partitions of days in [start, end) are read, and only the
+    requested columns are decoded; leave out "embedding" unless you need it.
+
+    Args:
+        path: "<bucket>/<prefix>" on the filesystem, or a local directory
+        filesystem: Arrow filesystem (see minio_filesystem); None for local files
+        start: First UTC day to include
+        end: Day after the last one to include
+        columns: Columns to read (default all)
+        filter: Extra pyarrow.dataset expression, e.g. ds.field("total_latency_ms") > 2000
+    """
+    dataset = open_traces(path, filesystem)
+    expression = None
+    if start is not None:
+        expression = ds.field("date") >= str(start)
+    if end is not None:
+        upper = ds.field("date") < str(end)
+        expression = upper if expression is None else expression & upper
+    if filter is not None:
+        expression = filter if expression is None else expression & filter
+    return dataset.to_table(columns=list(columns) if columns else None, filter=expression)
+
+
+def load_traces_pandas(*args, **kwargs):
+    """load_traces() as a pandas DataFrame (needs pandas)."""
+    return load_traces(*args, **kwargs).to_pandas()
+
+
+def embedding_matrix(table) -> Tuple[List[int], "object"]:
+    """
+    The trace ids and a (n, dim) float32 NumPy matrix of their embeddings.
+
+    Traces without an embedding are skipped. The table must include the
+    "trace_id" and "embedding" columns.
+    """
+    _require_pyarrow()
+    import pyarrow.compute as pc
+
+    table = table.filter(pc.is_valid(table["embedding"]))
+    embeddings = table["embedding"].combine_chunks()
+    dim = embeddings.type.list_size
+    matrix = embeddings.flatten().to_numpy(zero_copy_only=False).reshape(-1, dim)
+    return table["trace_id"].to_pylist(), matrix
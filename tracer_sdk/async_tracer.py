@@ -0,0 +1,305 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+try:
+    import httpx
+except ImportError:  # only needed for AsyncRAGTracer
+    httpx = None
+
+from .compression import DEFAULT_COMPRESSION_THRESHOLD, BodyEncoder
+from .data import (
+    EmbeddingData,
+    ResponseData,
+    RetrievalData,
+    TelemetryData,
+    build_trace_payload,
+)
+from .sampling import Sampler
+from .spans import Trace
+
+ASYNC_OVERFLOW_POLICIES = ("drop_oldest", "drop_new")
+
+
+class AsyncRAGTracer:
+    def __init__(
+        self,
+        api_url: str = "http://localhost:8000",
+        max_queue_size: int = 2048,
+        max_batch_size: int = 100,
+        flush_interval: float = 1.0,
+        overflow_policy: str = "drop_oldest",
+        max_concurrent_requests: int = 4,
+        timeout: float = 10.0,
+        vector_encoding: str = "json",
+        client: Optional["httpx.AsyncClient"] = None,
+        sampler: Optional[Sampler] = None,
+        compression: Optional[str] = None,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+        compression_level: Optional[int] = None,
+    ):
+        """
+        asyncio client for the tracing API.
+
+        Traces are queued without blocking the event loop and sent in batches
+        by a background task over a pooled keep-alive HTTP connection. The
+        task starts on the first enqueue, so create the tracer anywhere but
+        use it inside a running event loop. Close it with ``await aclose()``
+        or ``async with AsyncRAGTracer(...)``.
+
+        Args:
+            api_url: URL of the tracing API server
+            max_queue_size: Maximum number of traces buffered in memory
+            max_batch_size: Maximum number of traces sent per batch request
+            flush_interval: Seconds a trace may wait in the queue before being sent
+            overflow_policy: "drop_oldest" or "drop_new" when the queue is full
+            max_concurrent_requests: Batch requests in flight at once (and pooled connections)
+            timeout: Seconds per HTTP request
+            vector_encoding: "json" float lists, or "float32"/"float16" base64 binary vectors
+            client: An existing httpx.AsyncClient to use instead of creating one; requests
+                still go to api_url, whatever base_url the client has
+            sampler: Head/tail sampling rules; every trace is sent in full without one
+            compression: None, "gzip" or "zstd" (needs zstandard) to compress request bodies
+            compression_threshold: Minimum body size in bytes before it is compressed
+            compression_level: Codec compression level (gzip 6 and zstd 3 by default)
+        """
+        if httpx is None:
+            raise ImportError("AsyncRAGTracer requires httpx: pip install rag-tracer-sdk[async]")
+        if overflow_policy not in ASYNC_OVERFLOW_POLICIES:
+            raise ValueError(f"overflow_policy must be one of {ASYNC_OVERFLOW_POLICIES}")
+        self.api_url = api_url.rstrip("/")
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
+        self.timeout = timeout
+        self.vector_encoding = vector_encoding
+        self.sampler = sampler
+        self.encoder = BodyEncoder(compression, compression_threshold, compression_level)
+
+        self._client = client
+        self._owns_client = client is None
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._in_flight = 0
+        self._closed = False
+        # Callers awaiting flush(); while any are, batches are sent without waiting to fill
+        self._flush_waiters = 0
+        self._flusher: Optional[asyncio.Task] = None
+        self._send_tasks: Set[asyncio.Task] = set()
+        # Created on first use so they bind to the running loop
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._send_slots: Optional[asyncio.Semaphore] = None
+
+        self.queued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+    async def __aenter__(self) -> "AsyncRAGTracer":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    # Recording
+    def trace_complete(
+        self,
+        user_query: str,
+        final_prompt: str,
+        embedding: Optional[EmbeddingData],
+        retrievals: List[RetrievalData],
+        response: ResponseData,
+        system_prompt: Optional[str] = None,
+        telemetry: Optional[TelemetryData] = None,
+        route: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Queue a complete RAG pipeline execution; never blocks or awaits.
+
+        Returns:
+            {"status": "submitted_async"}, {"status": "dropped"} or {"status": "sampled_out"}
+        """
+        fields = dict(
+            user_query=user_query,
+            final_prompt=final_prompt,
+            embedding=embedding,
+            retrievals=retrievals,
+            response=response,
+            system_prompt=system_prompt,
+            telemetry=telemetry,
+            vector_encoding=self.vector_encoding,
+        )
+        if self.sampler is None:
+            return self.enqueue(build_trace_payload(**fields))
+        trace_data = self.sampler.build_payload(self.sampler.sample(route), route=route, **fields)
+        if trace_data is None:
+            return {"status": "sampled_out"}
+        return self.enqueue(trace_data)
+
+    def trace(
+        self,
+        user_query: str,
+        system_prompt: Optional[str] = None,
+        final_prompt: Optional[str] = None,
+        route: Optional[str] = None,
+    ) -> Trace:
+        """Start an incremental trace (``async with tracer.trace(...) as t``); queued on exit."""
+        return Trace(
+            self.enqueue,
+            user_query=user_query,
+            system_prompt=system_prompt,
+            final_prompt=final_prompt,
+            vector_encoding=self.vector_encoding,
+            sampler=self.sampler,
+            route=route,
+        )
+
+    async def send_trace(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one payload right away and return the API response (the stored trace)."""
+        self._ensure_started()
+        try:
+            body, headers = await self._encode(trace_data)
+            response = await self._client.post(f"{self.api_url}/traces/", content=body, headers=headers)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
+
+    def enqueue(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a trace payload for batched export."""
+        if self._closed:
+            self.dropped += 1
+            return {"status": "dropped"}
+        self._ensure_started()
+        if len(self._queue) >= self.max_queue_size:
+            self.dropped += 1
+            if self.overflow_policy == "drop_new":
+                return {"status": "dropped"}
+            self._queue.popleft()
+        self._queue.append(trace_data)
+        self.queued += 1
+        self._idle.clear()
+        # Wake the flusher to start its interval timer, or to send a full batch
+        if len(self._queue) == 1 or len(self._queue) >= self.max_batch_size:
+            self._wakeup.set()
+        return {"status": "submitted_async"}
+
+    # Lifecycle
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Send everything queued so far. Returns False if the timeout expired first."""
+        if self._flusher is None or (not self._queue and not self._in_flight):
+            return True
+        self._flush_waiters += 1
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._flush_waiters -= 1
+
+    async def aclose(self, timeout: Optional[float] = 5.0) -> None:
+        """Flush pending traces, stop the flusher task and close the HTTP client."""
+        if self._closed:
+            return
+        await self.flush(timeout)
+        self._closed = True
+        if self._flusher is not None:
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._flusher, timeout)
+            except asyncio.TimeoutError:
+                self._flusher.cancel()
+            if self._send_tasks:
+                await asyncio.wait(self._send_tasks, timeout=timeout)
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        """Return queued/sent/dropped/failed counters, plus sampling counters."""
+        stats = {
+            "queued": self.queued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "pending": len(self._queue) + self._in_flight,
+        }
+        if self.sampler is not None:
+            stats.update(self.sampler.stats())
+        return stats
+
+    # Internals
+    def _ensure_started(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrent_requests,
+                    max_keepalive_connections=self.max_concurrent_requests,
+                ),
+            )
+        if self._flusher is None:
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._idle.set()
+            self._send_slots = asyncio.Semaphore(self.max_concurrent_requests)
+            self._flusher = asyncio.get_running_loop().create_task(self._run())
+
+    async def _next_batch(self) -> Optional[List[Dict[str, Any]]]:
+        loop = asyncio.get_running_loop()
+        while not self._queue:
+            if self._closed:
+                return None
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        # Wait for a full batch, the flush interval, or an explicit flush
+        deadline = loop.time() + self.flush_interval
+        while len(self._queue) < self.max_batch_size and not self._flush_waiters and not self._closed:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        count = min(self.max_batch_size, len(self._queue))
+        batch = [self._queue.popleft() for _ in range(count)]
+        self._in_flight += len(batch)
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+            await self._send_slots.acquire()
+            task = asyncio.get_running_loop().create_task(self._send_batch(batch))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    async def _encode(self, payload: Any) -> Tuple[bytes, Dict[str, str]]:
+        if self.encoder.compression is None:
+            return self.encoder.encode(payload)
+        # Compressing a large batch takes milliseconds; keep it off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, self.encoder.encode, payload)
+
+    async def _send_batch(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            body, headers = await self._encode(batch)
+            response = await self._client.post(f"{self.api_url}/traces/batch", content=body, headers=headers)
+            response.raise_for_status()
+            self.sent += len(batch)
+        except Exception:
+            self.failed += len(batch)
+        finally:
+            self._in_flight -= len(batch)
+            self._send_slots.release()
+            if not self._queue and not self._in_flight:
+                self._idle.set()
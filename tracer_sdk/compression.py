@@ -0,0 +1,52 @@
+import gzip
+import json
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # only needed for compression="zstd"
+    zstandard = None
+
+COMPRESSION_CODECS = ("gzip", "zstd")
+# Bodies smaller than this are sent as-is; compressing them costs more than it saves
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+
+class BodyEncoder:
+    def __init__(
+        self,
+        compression: Optional[str] = None,
+        threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+        level: Optional[int] = None,
+    ):
+        """
+        Serialize request bodies to compact JSON, compressed when large enough.
+
+        Args:
+            compression: None, "gzip" or "zstd" (needs zstandard)
+            threshold: Minimum JSON size in bytes before the body is compressed
+            level: Codec compression level (gzip 6 and zstd 3 by default)
+        """
+        if compression is not None and compression not in COMPRESSION_CODECS:
+            raise ValueError(f"compression must be None or one of {COMPRESSION_CODECS}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("compression='zstd' requires zstandard: pip install rag-tracer-sdk[zstd]")
+        self.compression = compression
+        self.threshold = threshold
+        self.level = level if level is not None else DEFAULT_LEVELS.get(compression)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=self.level, mtime=0)
+        # A compressor per call: ZstdCompressor is not thread-safe and exporter threads share the encoder
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def encode(self, payload: Any) -> Tuple[bytes, Dict[str, str]]:
+        """Return (body, headers) for a JSON payload."""
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.compression is not None and len(body) >= self.threshold:
+            body = self.compress(body)
+            headers["Content-Encoding"] = self.compression
+        return body, headers
@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .encoding import embedding_payload
+
+
+@dataclass
+class EmbeddingData:
+    vector: List[float]  # a list of floats or a NumPy array
+    retrieval_candidates: Optional[List[Dict[str, Any]]] = None
+
+
+@dataclass
+class RetrievalData:
+    document_id: str
+    similarity_score: float
+    metadata: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class HallucinationCheckData:
+    groundedness_score: float
+    unsupported_sentences: Optional[List[str]] = None
+    entailment_results: Optional[List[Dict[str, Any]]] = None
+
+
+@dataclass
+class ResponseData:
+    text: str
+    token_stream: Optional[List[str]] = None
+    hallucination_check: Optional[HallucinationCheckData] = None
+
+
+@dataclass
+class TelemetryData:
+    embedding_latency_ms: Optional[float] = None
+    retrieval_latency_ms: Optional[float] = None
+    llm_latency_ms: Optional[float] = None
+    total_latency_ms: Optional[float] = None
+    embedding_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    api_cost: Optional[float] = None
+
+
+def _compact(obj: Any) -> Dict[str, Any]:
+    """
+    Non-None fields of a dataclass (or dict); the API fills in the same defaults.
+
+    Shallow on purpose: dataclasses.asdict deep-copies every nested value,
+    which dominates payload build time for large metadata or token streams.
+    """
+    data = obj if isinstance(obj, dict) else vars(obj)
+    return {k: v for k, v in data.items() if v is not None}
+
+
+def build_trace_payload(
+    user_query: str,
+    final_prompt: str,
+    embedding: Optional[EmbeddingData],
+    retrievals: List[RetrievalData],
+    response: ResponseData,
+    system_prompt: Optional[str] = None,
+    telemetry: Optional[TelemetryData] = None,
+    vector_encoding: str = "json",
+) -> Dict[str, Any]:
+    """The POST /traces/ body for one trace, shared by the sync, async and span APIs."""
+    payload = {
+        "user_query": user_query,
+        "final_prompt": final_prompt,
+        "retrievals": [_compact(r) for r in retrievals],
+        "response": _compact(response),
+        "telemetry": _compact(telemetry) if telemetry else {},
+    }
+    if response.hallucination_check is not None:
+        payload["response"]["hallucination_check"] = vars(response.hallucination_check).copy()
+    if system_prompt is not None:
+        payload["system_prompt"] = system_prompt
+    if embedding is not None:
+        payload["embedding"] = _compact(embedding_payload(
+            embedding.vector, embedding.retrieval_candidates, vector_encoding
+        ))
+    return payload
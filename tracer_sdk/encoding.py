@@ -0,0 +1,43 @@
+import base64
+import struct
+from typing import Any, Dict
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the struct fallback handles plain lists
+    np = None
+
+
+VECTOR_ENCODINGS = ("json", "float32", "float16")
+
+_STRUCT_CODES = {"float32": "f", "float16": "e"}
+_NUMPY_DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+
+def encode_vector(vector: Any, encoding: str = "float32") -> str:
+    """
+    Encode a vector as base64 little-endian float32/float16 bytes.
+
+    NumPy arrays (and lists, when NumPy is installed) are converted in one
+    call without touching individual elements from Python.
+    """
+    if encoding not in _STRUCT_CODES:
+        raise ValueError(f"binary encoding must be one of {tuple(_STRUCT_CODES)}")
+    if np is not None:
+        raw = np.asarray(vector, dtype=_NUMPY_DTYPES[encoding]).tobytes()
+    else:
+        raw = struct.pack(f"<{len(vector)}{_STRUCT_CODES[encoding]}", *vector)
+    return base64.b64encode(raw).decode("ascii")
+
+
+def embedding_payload(vector: Any, retrieval_candidates: Any, encoding: str = "json") -> Dict[str, Any]:
+    """Build the "embedding" part of a trace payload in the requested encoding."""
+    if encoding not in VECTOR_ENCODINGS:
+        raise ValueError(f"vector_encoding must be one of {VECTOR_ENCODINGS}")
+    payload: Dict[str, Any] = {"retrieval_candidates": retrieval_candidates}
+    if encoding == "json":
+        payload["vector"] = vector.tolist() if hasattr(vector, "tolist") else list(vector)
+    else:
+        payload["vector_b64"] = encode_vector(vector, encoding)
+        payload["vector_dtype"] = encoding
+    return payload
@@ -0,0 +1,180 @@
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_new")
+
+
+class BatchExporter:
+    def __init__(
+        self,
+        send_batch: Callable[[List[Dict[str, Any]]], Any],
+        max_queue_size: int = 2048,
+        max_batch_size: int = 100,
+        flush_interval: float = 1.0,
+        overflow_policy: str = "drop_oldest",
+        num_workers: int = 1,
+    ):
+        """
+        Buffer traces in memory and send them in batches from background threads.
+
+        Args:
+            send_batch: Callable that delivers a list of trace payloads in one request
+            max_queue_size: Maximum number of traces held in memory
+            max_batch_size: Maximum number of traces sent per request
+            flush_interval: Maximum age in seconds of a queued trace before it is sent
+            overflow_policy: What to do when the queue is full ("block", "drop_oldest" or "drop_new")
+            num_workers: Number of background exporter threads
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow_policy must be one of {OVERFLOW_POLICIES}")
+        self.send_batch = send_batch
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._closed = False
+        # Callers blocked in flush(); while any are, workers send without waiting to fill a batch
+        self._flush_waiters = 0
+
+        self.queued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._workers = [
+            threading.Thread(target=self._run, name=f"rag-tracer-exporter-{i}", daemon=True)
+            for i in range(max(1, num_workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+        atexit.register(self.shutdown)
+
+    def submit(self, trace_data: Dict[str, Any]) -> bool:
+        """Queue a trace for export. Returns False if the trace was dropped."""
+        with self._lock:
+            if self._closed:
+                self.dropped += 1
+                return False
+            if len(self._queue) >= self.max_queue_size:
+                if self.overflow_policy == "drop_new":
+                    self.dropped += 1
+                    return False
+                if self.overflow_policy == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._queue) >= self.max_queue_size and not self._closed:
+                        self._not_full.wait()
+                    if self._closed:
+                        self.dropped += 1
+                        return False
+            self._queue.append(trace_data)
+            self.queued += 1
+            if len(self._queue) >= self.max_batch_size:
+                self._not_empty.notify()
+            elif len(self._queue) == 1:
+                # Wake an idle worker so it starts the flush_interval timer
+                self._not_empty.notify()
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Send everything queued so far. Returns False if the timeout expired first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._flush_waiters += 1
+            self._not_empty.notify_all()
+            try:
+                while self._queue or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._idle.wait(remaining)
+                return True
+            finally:
+                self._flush_waiters -= 1
+
+    def shutdown(self, timeout: Optional[float] = 5.0) -> None:
+        """Flush pending traces and stop the background threads."""
+        with self._lock:
+            if self._closed:
+                return
+        self.flush(timeout)
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        try:
+            atexit.unregister(self.shutdown)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        """Return exporter counters."""
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "sent": self.sent,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "pending": len(self._queue) + self._in_flight,
+            }
+
+    def _next_batch(self) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            while not self._queue:
+                if self._closed:
+                    return None
+                self._not_empty.wait()
+            # Wait for a full batch, the flush interval, or an explicit flush
+            deadline = time.monotonic() + self.flush_interval
+            while (
+                len(self._queue) < self.max_batch_size
+                and not self._flush_waiters
+                and not self._closed
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._not_empty.wait(remaining)
+            if not self._queue:
+                return []
+            count = min(self.max_batch_size, len(self._queue))
+            batch = [self._queue.popleft() for _ in range(count)]
+            self._in_flight += len(batch)
+            self._not_full.notify_all()
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+            ok = False
+            try:
+                result = self.send_batch(batch)
+                ok = not (isinstance(result, dict) and "error" in result)
+            except Exception:
+                ok = False
+            with self._lock:
+                if ok:
+                    self.sent += len(batch)
+                else:
+                    self.failed += len(batch)
+                self._in_flight -= len(batch)
+                if not self._queue and not self._in_flight:
+                    self._idle.notify_all()
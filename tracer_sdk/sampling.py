@@ -0,0 +1,160 @@
+import random
+import threading
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+from .data import (
+    EmbeddingData,
+    ResponseData,
+    RetrievalData,
+    TelemetryData,
+    build_trace_payload,
+)
+
+UNSAMPLED_POLICIES = ("strip", "drop")
+
+
+class Sampler:
+    def __init__(
+        self,
+        rate: float = 1.0,
+        route_rates: Optional[Dict[str, float]] = None,
+        keep_latency_ms: Optional[float] = None,
+        keep_cost: Optional[float] = None,
+        keep_groundedness_below: Optional[float] = None,
+        unsampled: str = "strip",
+        seed: Optional[int] = None,
+    ):
+        """
+        Head- and tail-based sampling for traces.
+
+        The head decision is made when a trace starts: it is sampled with
+        probability ``rate`` (or ``route_rates[route]``). When it completes, the
+        tail rules keep any trace that is slow, expensive or poorly grounded
+        whatever the head decision was. Everything else is either sent
+        without its heavy fields (embedding vector and token stream) or not
+        sent at all, depending on ``unsampled``.
+
+        Kept traces carry the probability they were kept with as
+        ``sample_rate``, so the API can weight them by 1/sample_rate and the
+        stats still estimate the full traffic.
+
+        Args:
+            rate: Head sampling probability for traces without a route rate
+            route_rates: Per-route head sampling probabilities
+            keep_latency_ms: Always keep traces whose total latency is at least this
+            keep_cost: Always keep traces whose API cost is at least this
+            keep_groundedness_below: Always keep traces with a lower groundedness score
+            unsampled: "strip" sends unsampled traces without heavy fields,
+                "drop" does not send them
+            seed: Seed for the sampling random generator
+        """
+        if unsampled not in UNSAMPLED_POLICIES:
+            raise ValueError(f"unsampled must be one of {UNSAMPLED_POLICIES}")
+        for value in (rate, *(route_rates or {}).values()):
+            if not 0.0 <= value <= 1.0:
+                raise ValueError("sampling rates must be between 0 and 1")
+        self.rate = rate
+        self.route_rates = dict(route_rates or {})
+        self.keep_latency_ms = keep_latency_ms
+        self.keep_cost = keep_cost
+        self.keep_groundedness_below = keep_groundedness_below
+        self.unsampled = unsampled
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.sampled = 0
+        self.tail_kept = 0
+        self.stripped = 0
+        self.sampled_out = 0
+
+    def rate_for(self, route: Optional[str] = None) -> float:
+        return self.route_rates.get(route, self.rate) if route is not None else self.rate
+
+    def sample(self, route: Optional[str] = None) -> bool:
+        """The head decision for a new trace."""
+        rate = self.rate_for(route)
+        return rate >= 1.0 or self._random.random() < rate
+
+    def tail_keep(self, telemetry: Optional[TelemetryData], response: Optional[ResponseData]) -> bool:
+        """Whether a completed trace matches one of the always-keep rules."""
+        if telemetry is not None:
+            if (self.keep_latency_ms is not None and telemetry.total_latency_ms is not None
+                    and telemetry.total_latency_ms >= self.keep_latency_ms):
+                return True
+            if (self.keep_cost is not None and telemetry.api_cost is not None
+                    and telemetry.api_cost >= self.keep_cost):
+                return True
+        check = response.hallucination_check if response is not None else None
+        return (self.keep_groundedness_below is not None and check is not None
+                and check.groundedness_score < self.keep_groundedness_below)
+
+    def build_payload(
+        self,
+        sampled: bool,
+        user_query: str,
+        final_prompt: str,
+        embedding: Optional[EmbeddingData],
+        retrievals: List[RetrievalData],
+        response: ResponseData,
+        system_prompt: Optional[str] = None,
+        telemetry: Optional[TelemetryData] = None,
+        vector_encoding: str = "json",
+        route: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Apply the tail rules to a completed trace and build its payload.
+
+        Heavy fields are left out before encoding, so stripped traces never pay
+        for vector serialization. Returns None when the trace is sampled out.
+        """
+        sample_rate = 1.0
+        stripped = False
+        if self.tail_keep(telemetry, response):
+            self._count("tail_kept")
+        elif self.unsampled == "strip":
+            # Every trace is still stored, so stats need no reweighting
+            if not sampled:
+                embedding = None
+                response = replace(response, token_stream=None)
+                stripped = True
+                self._count("stripped")
+            else:
+                self._count("sampled")
+        elif sampled:
+            sample_rate = self.rate_for(route)
+            self._count("sampled")
+        else:
+            self._count("sampled_out")
+            return None
+
+        payload = build_trace_payload(
+            user_query=user_query,
+            final_prompt=final_prompt,
+            embedding=embedding,
+            retrievals=retrievals,
+            response=response,
+            system_prompt=system_prompt,
+            telemetry=telemetry,
+            vector_encoding=vector_encoding,
+        )
+        if sample_rate < 1.0:
+            payload["sample_rate"] = sample_rate
+        if stripped:
+            # Its hallucination check can wait behind full-fidelity traces
+            payload["check_priority"] = "low"
+        return payload
+
+    def stats(self) -> Dict[str, int]:
+        """Return sampled/tail_kept/stripped/sampled_out counters."""
+        with self._lock:
+            return {
+                "sampled": self.sampled,
+                "tail_kept": self.tail_kept,
+                "stripped": self.stripped,
+                "sampled_out": self.sampled_out,
+            }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
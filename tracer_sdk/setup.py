@@ -29,6 +29,22 @@ setup(
         "requests>=2.25.0",
     ],
     extras_require={
+        "numpy": [
+            "numpy>=1.20",
+        ],
+        "async": [
+            "httpx>=0.23",
+        ],
+        "analytics": [
+            "pyarrow>=10",
+            "pandas>=1.3",
+        ],
+        "ws": [
+            "websocket-client>=1.0",
+        ],
+        "zstd": [
+            "zstandard>=0.15",
+        ],
         "dev": [
             "pytest>=6.0",
             "black>=21.0",
@@ -0,0 +1,215 @@
+import functools
+import inspect
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, List, Optional
+
+from .data import (
+    EmbeddingData,
+    HallucinationCheckData,
+    ResponseData,
+    RetrievalData,
+    TelemetryData,
+    build_trace_payload,
+)
+from .sampling import Sampler
+
+# Span names whose durations fill in TelemetryData latencies
+STAGE_FIELDS = {
+    "embedding": "embedding_latency_ms",
+    "retrieval": "retrieval_latency_ms",
+    "llm": "llm_latency_ms",
+}
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("rag_tracer_trace", default=None)
+
+
+def current_trace() -> Optional["Trace"]:
+    """The trace active in this thread or asyncio task, if any."""
+    return _current_trace.get()
+
+
+class Span:
+    """One timed stage of a trace; also usable as a context manager."""
+
+    __slots__ = ("trace", "name", "start_ns", "end_ns")
+
+    def __init__(self, trace: Optional["Trace"], name: str):
+        self.trace = trace
+        self.name = name
+        self.start_ns = 0
+        self.end_ns = 0
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self) -> "Span":
+        self.start_ns = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = perf_counter_ns()
+        if self.trace is not None:
+            self.trace.spans.append(self)
+
+
+class Trace:
+    """
+    A trace under construction: stages are recorded as spans and data is
+    buffered locally until the trace ends, then one payload is emitted.
+
+    Use it as a (sync or async) context manager. While it is open it is the
+    current trace of the thread or asyncio task, so span() and @traced find
+    it without passing it around. Tasks created inside inherit it; threads
+    do not unless run with contextvars.copy_context().
+    """
+
+    __slots__ = (
+        "emit", "vector_encoding", "user_query", "system_prompt", "final_prompt",
+        "embedding", "retrievals", "response", "telemetry_overrides", "spans",
+        "start_ns", "end_ns", "result", "sampler", "route", "sampled", "_token",
+    )
+
+    def __init__(
+        self,
+        emit: Callable[[Dict[str, Any]], Any],
+        user_query: str,
+        system_prompt: Optional[str] = None,
+        final_prompt: Optional[str] = None,
+        vector_encoding: str = "json",
+        sampler: Optional[Sampler] = None,
+        route: Optional[str] = None,
+    ):
+        self.emit = emit
+        self.vector_encoding = vector_encoding
+        self.user_query = user_query
+        self.system_prompt = system_prompt
+        self.final_prompt = final_prompt
+        self.embedding: Optional[EmbeddingData] = None
+        self.retrievals: List[RetrievalData] = []
+        self.response: Optional[ResponseData] = None
+        self.telemetry_overrides: Dict[str, Any] = {}
+        self.spans: List[Span] = []
+        self.start_ns = 0
+        self.end_ns = 0
+        self.result = None
+        self.sampler = sampler
+        self.route = route
+        # Head sampling decision; when False, recording heavy fields can be skipped
+        self.sampled = sampler.sample(route) if sampler is not None else True
+        self._token = None
+
+    # Recording
+    def span(self, name: str) -> Span:
+        return Span(self, name)
+
+    def set_prompt(self, final_prompt: str, system_prompt: Optional[str] = None) -> None:
+        self.final_prompt = final_prompt
+        if system_prompt is not None:
+            self.system_prompt = system_prompt
+
+    def set_embedding(self, vector: Any, retrieval_candidates: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.embedding = EmbeddingData(vector=vector, retrieval_candidates=retrieval_candidates)
+
+    def add_retrievals(self, retrievals: List[RetrievalData]) -> None:
+        self.retrievals.extend(retrievals)
+
+    def set_response(
+        self,
+        text: str,
+        token_stream: Optional[List[str]] = None,
+        hallucination_check: Optional[HallucinationCheckData] = None,
+    ) -> None:
+        self.response = ResponseData(text=text, token_stream=token_stream, hallucination_check=hallucination_check)
+
+    def set_telemetry(self, **fields: Any) -> None:
+        """Set token counts and cost, or override a measured latency."""
+        unknown = set(fields) - set(TelemetryData.__dataclass_fields__)
+        if unknown:
+            raise TypeError(f"unknown telemetry fields: {sorted(unknown)}")
+        self.telemetry_overrides.update(fields)
+
+    # Results
+    def telemetry(self) -> TelemetryData:
+        """Stage latencies summed per span name, total from trace start to end."""
+        latencies = {}
+        for span in self.spans:
+            field = STAGE_FIELDS.get(span.name)
+            if field is not None:
+                latencies[field] = latencies.get(field, 0.0) + span.duration_ms
+        end_ns = self.end_ns or perf_counter_ns()
+        latencies["total_latency_ms"] = (end_ns - self.start_ns) / 1e6
+        latencies.update(self.telemetry_overrides)
+        return TelemetryData(**latencies)
+
+    def payload(self) -> Optional[Dict[str, Any]]:
+        """The trace payload, or None if sampling drops the trace."""
+        fields = dict(
+            user_query=self.user_query,
+            final_prompt=self.final_prompt if self.final_prompt is not None else self.user_query,
+            embedding=self.embedding,
+            retrievals=self.retrievals,
+            response=self.response or ResponseData(text=""),
+            system_prompt=self.system_prompt,
+            telemetry=self.telemetry(),
+            vector_encoding=self.vector_encoding,
+        )
+        if self.sampler is not None:
+            return self.sampler.build_payload(self.sampled, route=self.route, **fields)
+        return build_trace_payload(**fields)
+
+    # Context management
+    def start(self) -> "Trace":
+        self._token = _current_trace.set(self)
+        self.start_ns = perf_counter_ns()
+        return self
+
+    def finish(self) -> Any:
+        """End the trace, emit its payload and return the emit result."""
+        self.end_ns = perf_counter_ns()
+        if self._token is not None:
+            _current_trace.reset(self._token)
+            self._token = None
+        payload = self.payload()
+        self.result = self.emit(payload) if payload is not None else {"status": "sampled_out"}
+        return self.result
+
+    def __enter__(self) -> "Trace":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.finish()
+
+    async def __aenter__(self) -> "Trace":
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        result = self.finish()
+        if inspect.isawaitable(result):
+            self.result = await result
+
+
+def span(name: str) -> Span:
+    """Time a stage of the current trace; a no-op timer when no trace is active."""
+    return Span(_current_trace.get(), name)
+
+
+def traced(name: str) -> Callable:
+    """Decorator recording each call of a sync or async function as a span."""
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with Span(_current_trace.get(), name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(_current_trace.get(), name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,151 @@
+import itertools
+import json
+import threading
+from typing import List, Optional
+
+from .data import RetrievalData, _compact
+
+try:
+    import websocket  # websocket-client
+except ImportError:  # only needed for stream_response
+    websocket = None
+
+# The API can only close a sentence once it has seen the character after its terminator
+TERMINATORS = frozenset(".!?…\n")
+
+
+class StreamChannel:
+    def __init__(self, ws_url: str, timeout: float = 10.0):
+        """
+        Thread-local /ws/stream connections shared by the response streams of a tracer.
+
+        Streaming is best effort: a failed send closes the connection and the
+        stream that hit it stops sending, the next stream reconnects.
+
+        Args:
+            ws_url: URL of the streaming websocket, e.g. ws://localhost:8000/ws/stream
+            timeout: Seconds to wait when connecting and sending
+        """
+        if websocket is None:
+            raise ImportError("stream_response requires websocket-client: pip install rag-tracer-sdk[ws]")
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def send(self, frame: dict) -> bool:
+        try:
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = websocket.create_connection(self.ws_url, timeout=self.timeout)
+                self._local.conn = conn
+                with self._lock:
+                    self._connections.append(conn)
+            conn.send(json.dumps(frame, separators=(",", ":")))
+            return True
+        except Exception:
+            self._reset()
+            return False
+
+    def _reset(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class ResponseStream:
+    """
+    Collects an LLM response token by token and forwards the text to the API
+    while it is generated, so completed sentences are checked early.
+
+    Deltas are sent as soon as a sentence or line end is followed by more
+    text, and at least every flush_every tokens. Use it as a context
+    manager; on exit the rest is sent and the stream is closed. Record the
+    result with
+    Trace.set_response(stream.text, token_stream=stream.tokens): the text
+    must match what was streamed for the early work to be reused.
+    """
+
+    def __init__(
+        self,
+        channel: Optional[StreamChannel],
+        retrievals: List[RetrievalData],
+        separator: str = "",
+        flush_every: int = 16,
+    ):
+        self.channel = channel
+        self.separator = separator
+        self.flush_every = flush_every
+        self.tokens: List[str] = []
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._after_terminator = False
+        self._id = None
+        if channel is not None:
+            self._id = channel.next_id()
+            started = channel.send({
+                "type": "stream_start",
+                "stream": self._id,
+                "retrievals": [_compact(r) for r in retrievals],
+            })
+            if not started:
+                self.channel = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def add(self, token: str) -> None:
+        """Append one token (or delta) of the response."""
+        delta = self.separator + token if self.tokens and self.separator else token
+        self.tokens.append(token)
+        self._parts.append(delta)
+        if self.channel is None:
+            return
+        self._pending.append(delta)
+        sentence_done = self._after_terminator or any(c in TERMINATORS for c in delta[:-1])
+        self._after_terminator = bool(delta) and delta[-1] in TERMINATORS
+        if sentence_done or len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.channel is None or not self._pending:
+            return
+        text, self._pending = "".join(self._pending), []
+        if not self.channel.send({"type": "tokens", "stream": self._id, "text": text}):
+            self.channel = None
+
+    def close(self) -> None:
+        if self.channel is None:
+            return
+        self.flush()
+        if self.channel is not None:
+            self.channel.send({"type": "stream_end", "stream": self._id})
+        self.channel = None
+
+    def __enter__(self) -> "ResponseStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
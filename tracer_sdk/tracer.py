@@ -1,61 +1,83 @@
 import requests
-import json
-import time
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
-from threading import Thread
 
-
-@dataclass
-class EmbeddingData:
-    vector: List[float]
-    retrieval_candidates: Optional[List[Dict[str, Any]]] = None
-
-
-@dataclass
-class RetrievalData:
-    document_id: str
-    similarity_score: float
-    metadata: Optional[Dict[str, Any]] = None
-
-
-@dataclass
-class HallucinationCheckData:
-    groundedness_score: float
-    unsupported_sentences: Optional[List[str]] = None
-    entailment_results: Optional[List[Dict[str, Any]]] = None
-
-
-@dataclass
-class ResponseData:
-    text: str
-    token_stream: Optional[List[str]] = None
-    hallucination_check: Optional[HallucinationCheckData] = None
-
-
-@dataclass
-class TelemetryData:
-    embedding_latency_ms: Optional[float] = None
-    retrieval_latency_ms: Optional[float] = None
-    llm_latency_ms: Optional[float] = None
-    total_latency_ms: Optional[float] = None
-    embedding_tokens: Optional[int] = None
-    completion_tokens: Optional[int] = None
-    api_cost: Optional[float] = None
+from .compression import DEFAULT_COMPRESSION_THRESHOLD, BodyEncoder
+from .data import (
+    EmbeddingData,
+    HallucinationCheckData,
+    ResponseData,
+    RetrievalData,
+    TelemetryData,
+    build_trace_payload,
+)
+from .exporter import BatchExporter
+from .sampling import Sampler
+from .spans import Trace, current_trace
+from .streaming import ResponseStream, StreamChannel
+from .ws_transport import WebSocketSender
 
 
 class RAGTracer:
-    def __init__(self, api_url: str = "http://localhost:8000", async_mode: bool = False):
+    def __init__(
+        self,
+        api_url: str = "http://localhost:8000",
+        async_mode: bool = False,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 100,
+        flush_interval: float = 1.0,
+        overflow_policy: str = "drop_oldest",
+        num_workers: int = 1,
+        vector_encoding: str = "json",
+        transport: str = "http",
+        sampler: Optional[Sampler] = None,
+        compression: Optional[str] = None,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+        compression_level: Optional[int] = None,
+    ):
         """
         Initialize the RAG Tracer client.
         
         Args:
             api_url: URL of the tracing API server
             async_mode: Whether to send traces asynchronously
+            max_queue_size: Maximum number of traces buffered in async mode
+            max_batch_size: Maximum number of traces sent per batch request
+            flush_interval: Seconds a trace may wait in the queue before being sent
+            overflow_policy: "block", "drop_oldest" or "drop_new" when the queue is full
+            num_workers: Number of background exporter threads
+            vector_encoding: "json" float lists, or "float32"/"float16" base64 binary vectors
+            transport: "http" batch requests, or "ws" to send async batches over
+                persistent /ws/traces connections (needs websocket-client)
+            sampler: Head/tail sampling rules; every trace is sent in full without one
+            compression: None, "gzip" or "zstd" (needs zstandard) to compress HTTP request bodies
+            compression_threshold: Minimum body size in bytes before it is compressed
+            compression_level: Codec compression level (gzip 6 and zstd 3 by default)
         """
+        if transport not in ("http", "ws"):
+            raise ValueError("transport must be 'http' or 'ws'")
         self.api_url = api_url.rstrip("/")
         self.async_mode = async_mode
+        self.vector_encoding = vector_encoding
+        self.sampler = sampler
+        self.encoder = BodyEncoder(compression, compression_threshold, compression_level)
         self.session = requests.Session()
+        self.exporter = None
+        self.ws_sender = None
+        self.stream_channel = None
+        self.ws_url = "ws" + self.api_url[len("http"):] if self.api_url.startswith("http") else self.api_url
+        if async_mode:
+            send_batch = self._send_batch
+            if transport == "ws":
+                self.ws_sender = WebSocketSender(f"{self.ws_url}/ws/traces")
+                send_batch = self.ws_sender.send
+            self.exporter = BatchExporter(
+                send_batch,
+                max_queue_size=max_queue_size,
+                max_batch_size=max_batch_size,
+                flush_interval=flush_interval,
+                overflow_policy=overflow_policy,
+                num_workers=num_workers,
+            )
 
     def trace_complete(
         self,
@@ -65,7 +87,8 @@ class RAGTracer:
         retrievals: List[RetrievalData],
         response: ResponseData,
         system_prompt: Optional[str] = None,
-        telemetry: Optional[TelemetryData] = None
+        telemetry: Optional[TelemetryData] = None,
+        route: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Trace a complete RAG pipeline execution.
@@ -78,35 +101,147 @@ class RAGTracer:
             retrievals: List of retrieved documents
             response: Model response with optional hallucination check
             telemetry: Performance and cost metrics
+            route: Route name, for per-route sampling rates
             
         Returns:
-            API response with trace data
-        """
-        trace_data = {
-            "user_query": user_query,
-            "system_prompt": system_prompt,
-            "final_prompt": final_prompt,
-            "embedding": asdict(embedding),
-            "retrievals": [asdict(r) for r in retrievals],
-            "response": asdict(response),
-            "telemetry": asdict(telemetry) if telemetry else {}
-        }
+            API response with trace data, or {"status": "sampled_out"}
+        """
+        fields = dict(
+            user_query=user_query,
+            final_prompt=final_prompt,
+            embedding=embedding,
+            retrievals=retrievals,
+            response=response,
+            system_prompt=system_prompt,
+            telemetry=telemetry,
+            vector_encoding=self.vector_encoding,
+        )
+        if self.sampler is None:
+            return self._submit(build_trace_payload(**fields))
+        trace_data = self.sampler.build_payload(self.sampler.sample(route), route=route, **fields)
+        if trace_data is None:
+            return {"status": "sampled_out"}
+        return self._submit(trace_data)
+
+    def trace(
+        self,
+        user_query: str,
+        system_prompt: Optional[str] = None,
+        final_prompt: Optional[str] = None,
+        route: Optional[str] = None,
+    ) -> Trace:
+        """
+        Start an incremental trace, used as a context manager.
+
+        Stages are timed with spans and their latencies fill in TelemetryData;
+        the payload is sent once when the block exits:
+
+            with tracer.trace(user_query=question) as t:
+                with t.span("embedding"):
+                    vector = embed(question)
+                t.set_embedding(vector)
+                ...
+
+        Args:
+            user_query: Original user query
+            system_prompt: System prompt used (optional)
+            final_prompt: Final prompt, if already known (see Trace.set_prompt)
+            route: Route name, for per-route sampling rates
+
+        Returns:
+            The Trace; its result attribute holds the API response after exit
+        """
+        return Trace(
+            self._submit,
+            user_query=user_query,
+            system_prompt=system_prompt,
+            final_prompt=final_prompt,
+            vector_encoding=self.vector_encoding,
+            sampler=self.sampler,
+            route=route,
+        )
+
+    def stream_response(
+        self,
+        retrievals: List[RetrievalData],
+        separator: str = "",
+        flush_every: int = 16,
+        enabled: bool = True,
+    ) -> ResponseStream:
+        """
+        Collect a response as the LLM generates it, forwarding the text over
+        /ws/stream so the API checks completed sentences early (needs
+        websocket-client):
+
+            with tracer.trace(user_query=question) as t:
+                ...
+                with tracer.stream_response(docs) as stream:
+                    for token in llm.stream(prompt):
+                        stream.add(token)
+                t.set_response(stream.text, token_stream=stream.tokens)
+
+        Args:
+            retrievals: The documents the response is checked against
+            separator: Joined between tokens, e.g. " " for word tokens
+            flush_every: Send pending text at least every this many tokens
+            enabled: False only collects tokens, e.g. for sampled-out traces (pass t.sampled)
+
+        Returns:
+            The ResponseStream, used as a context manager
+        """
+        if enabled and self.stream_channel is None:
+            self.stream_channel = StreamChannel(f"{self.ws_url}/ws/stream")
+        return ResponseStream(self.stream_channel if enabled else None, retrievals, separator, flush_every)
 
+    def _submit(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue the payload in async mode, otherwise send it right away."""
         if self.async_mode:
-            thread = Thread(target=self._send_trace, args=(trace_data,))
-            thread.start()
-            return {"status": "submitted_async"}
+            if self.exporter.submit(trace_data):
+                return {"status": "submitted_async"}
+            return {"status": "dropped"}
+        return self._send_trace(trace_data)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued traces have been sent."""
+        if self.exporter is None:
+            return True
+        return self.exporter.flush(timeout)
+
+    def shutdown(self, timeout: Optional[float] = 5.0) -> None:
+        """Flush queued traces and stop the background exporter."""
+        if self.exporter is not None:
+            self.exporter.shutdown(timeout)
+        if self.ws_sender is not None:
+            self.ws_sender.close()
+        if self.stream_channel is not None:
+            self.stream_channel.close()
+        self.session.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Return queued/sent/dropped/failed counters of the async exporter, plus sampling counters."""
+        if self.exporter is None:
+            stats = {"queued": 0, "sent": 0, "dropped": 0, "failed": 0, "pending": 0}
         else:
-            return self._send_trace(trace_data)
+            stats = self.exporter.stats()
+        if self.sampler is not None:
+            stats.update(self.sampler.stats())
+        return stats
 
     def _send_trace(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
         """Send trace data to the API."""
         try:
-            response = self.session.post(
-                f"{self.api_url}/traces/",
-                json=trace_data,
-                headers={"Content-Type": "application/json"}
-            )
+            body, headers = self.encoder.encode(trace_data)
+            response = self.session.post(f"{self.api_url}/traces/", data=body, headers=headers)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            return {"error": str(e)}
+
+    def _send_batch(self, traces: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Send a batch of traces to the API in a single request."""
+        try:
+            body, headers = self.encoder.encode(traces)
+            response = self.session.post(f"{self.api_url}/traces/batch", data=body, headers=headers)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -119,7 +254,7 @@ class RAGTracer:
         system_prompt: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Trace prompt construction phase.
+        Record the prompt construction phase in the current trace.
         
         Args:
             user_query: Original user query
@@ -127,19 +262,14 @@ class RAGTracer:
             final_prompt: Final prompt sent to the model
             
         Returns:
-            API response
+            Status of the recording
         """
-        # In a more complete implementation, this would create a partial trace
-        # For now, we'll just use trace_complete with minimal data
-        return self.trace_complete(
-            user_query=user_query,
-            system_prompt=system_prompt,
-            final_prompt=final_prompt,
-            embedding=EmbeddingData(vector=[]),
-            retrievals=[],
-            response=ResponseData(text=""),
-            telemetry=TelemetryData()
-        )
+        trace = current_trace()
+        if trace is None:
+            return {"error": "no active trace; start one with tracer.trace(...)"}
+        trace.user_query = user_query
+        trace.set_prompt(final_prompt, system_prompt)
+        return {"status": "prompt_traced"}
 
     def trace_embedding(
         self,
@@ -147,17 +277,19 @@ class RAGTracer:
         retrieval_candidates: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         """
-        Trace embedding generation phase.
+        Record the embedding generation phase in the current trace.
         
         Args:
             vector: Embedding vector
             retrieval_candidates: Candidate documents with similarity scores
             
         Returns:
-            API response
+            Status of the recording
         """
-        # This would typically be used in conjunction with other trace methods
-        # For now, we'll just return a placeholder
+        trace = current_trace()
+        if trace is None:
+            return {"error": "no active trace; start one with tracer.trace(...)"}
+        trace.set_embedding(vector, retrieval_candidates)
         return {"status": "embedding_traced", "vector_length": len(vector)}
 
     def trace_retrieval(
@@ -165,16 +297,18 @@ class RAGTracer:
         retrievals: List[RetrievalData]
     ) -> Dict[str, Any]:
         """
-        Trace document retrieval phase.
+        Record the document retrieval phase in the current trace.
         
         Args:
             retrievals: List of retrieved documents
             
         Returns:
-            API response
+            Status of the recording
         """
-        # This would typically be used in conjunction with other trace methods
-        # For now, we'll just return a placeholder
+        trace = current_trace()
+        if trace is None:
+            return {"error": "no active trace; start one with tracer.trace(...)"}
+        trace.add_retrievals(retrievals)
         return {"status": "retrieval_traced", "document_count": len(retrievals)}
 
     def trace_response(
@@ -184,7 +318,7 @@ class RAGTracer:
         hallucination_check: Optional[HallucinationCheckData] = None
     ) -> Dict[str, Any]:
         """
-        Trace model response phase.
+        Record the model response phase in the current trace.
         
         Args:
             text: Model response text
@@ -192,8 +326,10 @@ class RAGTracer:
             hallucination_check: Hallucination check results (optional)
             
         Returns:
-            API response
+            Status of the recording
         """
-        # This would typically be used in conjunction with other trace methods
-        # For now, we'll just return a placeholder
-        return {"status": "response_traced", "response_length": len(text)}
\ No newline at end of file
+        trace = current_trace()
+        if trace is None:
+            return {"error": "no active trace; start one with tracer.trace(...)"}
+        trace.set_response(text, token_stream, hallucination_check)
+        return {"status": "response_traced", "response_length": len(text)}
@@ -0,0 +1,86 @@
+import json
+import threading
+from typing import Any, Dict, List
+
+try:
+    import websocket  # websocket-client
+except ImportError:  # only needed for transport="ws"
+    websocket = None
+
+
+class WebSocketSender:
+    def __init__(self, ws_url: str, timeout: float = 10.0):
+        """
+        Send trace batches over persistent /ws/traces connections.
+
+        Each exporter thread keeps its own connection and waits for the ack of
+        one batch before sending the next. A failed batch closes the connection;
+        the next call reconnects.
+
+        Args:
+            ws_url: URL of the ingestion websocket, e.g. ws://localhost:8000/ws/traces
+            timeout: Seconds to wait when connecting and for each ack
+        """
+        if websocket is None:
+            raise ImportError("transport='ws' requires websocket-client: pip install rag-tracer-sdk[ws]")
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = websocket.create_connection(self.ws_url, timeout=self.timeout)
+            ready = json.loads(conn.recv())
+            if ready.get("type") != "ready":
+                conn.close()
+                raise ConnectionError(f"unexpected handshake frame: {ready}")
+            self._local.conn = conn
+            self._local.seq = 0
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _reset(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def send(self, traces: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Send one batch frame and return the API's {"ids": [...]} or {"error": ...}."""
+        try:
+            conn = self._connection()
+            self._local.seq += 1
+            seq = self._local.seq
+            conn.send(json.dumps({"type": "batch", "seq": seq, "traces": traces}))
+            while True:
+                frame = json.loads(conn.recv())
+                if frame.get("seq") != seq:
+                    # Errors about earlier frames; nothing is waiting for them
+                    continue
+                if frame.get("type") == "ack":
+                    return {"ids": frame["ids"]}
+                return {"error": frame.get("detail")}
+        except Exception as e:
+            self._reset()
+            return {"error": str(e)}
+
+    __call__ = send
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
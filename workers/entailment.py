@@ -0,0 +1,126 @@
+import os
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import torch
+from prometheus_client import Histogram
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+ENTAILMENT_MODEL = os.getenv("ENTAILMENT_MODEL", "roberta-large-mnli")
+# "torch" or "onnx" (ONNX Runtime through optimum)
+ENTAILMENT_BACKEND = os.getenv("ENTAILMENT_BACKEND", "torch")
+# Dynamic int8 quantization of the Linear layers (torch backend only)
+ENTAILMENT_QUANTIZE = os.getenv("ENTAILMENT_QUANTIZE", "false").lower() in ("1", "true", "yes")
+# Intra-op CPU threads; 0 keeps the torch default
+ENTAILMENT_THREADS = int(os.getenv("ENTAILMENT_THREADS", "0"))
+ENTAILMENT_BATCH_SIZE = int(os.getenv("ENTAILMENT_BATCH_SIZE", "16"))
+ENTAILMENT_MAX_LENGTH = int(os.getenv("ENTAILMENT_MAX_LENGTH", "512"))
+# Warm-up inference run when a worker process loads the model
+ENTAILMENT_WARMUP = os.getenv("ENTAILMENT_WARMUP", "true").lower() in ("1", "true", "yes")
+
+MODEL_BATCH_SIZE = Histogram(
+    "entailment_model_batch_size",
+    "Pairs per forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+MODEL_BATCH_LENGTH = Histogram(
+    "entailment_model_batch_tokens",
+    "Padded sequence length of each forward pass",
+    buckets=(32, 64, 128, 256, 384, 512, 1024),
+)
+MODEL_FORWARD_DURATION = Histogram(
+    "entailment_model_forward_seconds",
+    "Duration of one forward pass, padding included",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+class EntailmentEngine:
+    """
+    Batched NLI classifier for (premise, hypothesis) pairs.
+
+    Pairs are tokenized once, sorted by length and run through the model in
+    padded batches so each batch pads to a similar length.
+    """
+
+    def __init__(
+        self,
+        model_name: str = ENTAILMENT_MODEL,
+        backend: str = ENTAILMENT_BACKEND,
+        quantize: bool = ENTAILMENT_QUANTIZE,
+        num_threads: int = ENTAILMENT_THREADS,
+        batch_size: int = ENTAILMENT_BATCH_SIZE,
+        max_length: int = ENTAILMENT_MAX_LENGTH,
+    ):
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.model_name = model_name
+        self.backend = backend
+        self.quantize = quantize
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if backend == "onnx":
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            self.model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        elif backend == "torch":
+            model = AutoModelForSequenceClassification.from_pretrained(model_name)
+            model.eval()
+            if quantize:
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.model = model
+        else:
+            raise ValueError(f"Unknown entailment backend: {backend}")
+        self.id2label = {int(k): v for k, v in self.model.config.id2label.items()}
+
+    @property
+    def version(self) -> str:
+        """Identifies the exact weights and runtime, for cache keys."""
+        revision = getattr(self.model.config, "_commit_hash", None) or "local"
+        suffix = "-int8" if self.quantize and self.backend == "torch" else ""
+        return f"{self.model_name}@{revision}/{self.backend}{suffix}"
+
+    def predict(self, pairs: Sequence[Tuple[str, str]], batch_size: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Classify (premise, hypothesis) pairs. Returns (label, score) per pair in input order."""
+        if not pairs:
+            return []
+        batch_size = batch_size or self.batch_size
+        premises = [p for p, _ in pairs]
+        hypotheses = [h for _, h in pairs]
+        # Truncate the (long) premise document, never the hypothesis sentence
+        encodings = self.tokenizer(
+            premises,
+            hypotheses,
+            truncation="only_first",
+            max_length=self.max_length,
+        )
+        keys = list(encodings.keys())
+        order = sorted(range(len(pairs)), key=lambda i: len(encodings["input_ids"][i]))
+        results: List[Optional[Tuple[str, float]]] = [None] * len(pairs)
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                batch_idx = order[start:start + batch_size]
+                started = time.perf_counter()
+                features = self.tokenizer.pad(
+                    [{k: encodings[k][i] for k in keys} for i in batch_idx],
+                    return_tensors="pt",
+                )
+                logits = self.model(**features).logits
+                scores, labels = torch.softmax(logits, dim=-1).max(dim=-1)
+                MODEL_FORWARD_DURATION.observe(time.perf_counter() - started)
+                MODEL_BATCH_SIZE.observe(len(batch_idx))
+                MODEL_BATCH_LENGTH.observe(features["input_ids"].shape[1])
+                for i, label, score in zip(batch_idx, labels.tolist(), scores.tolist()):
+                    results[i] = (self.id2label[label], score)
+        return results
+
+    def warm_up(self):
+        """
+        Run throwaway batches at a short and the maximum sequence length so
+        the first real task does not pay for lazy initialization and buffer
+        allocation.
+        """
+        short = ("The company reported revenue.", "Revenue was reported.")
+        long_premise = " ".join(["The company reported quarterly revenue growth."] * (self.max_length // 8))
+        self.predict([short] * self.batch_size)
+        self.predict([(long_premise, short[1])] * self.batch_size)
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from prometheus_client import Counter, Gauge
+
+# In-process LRU entries per worker process
+ENTAILMENT_CACHE_SIZE = int(os.getenv("ENTAILMENT_CACHE_SIZE", "100000"))
+# Shared tier: "none", "redis" or "sqlite"
+ENTAILMENT_CACHE_BACKEND = os.getenv("ENTAILMENT_CACHE_BACKEND", "none")
+ENTAILMENT_CACHE_REDIS_URL = os.getenv(
+    "ENTAILMENT_CACHE_REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+)
+ENTAILMENT_CACHE_TTL = int(os.getenv("ENTAILMENT_CACHE_TTL", str(7 * 24 * 3600)))
+ENTAILMENT_CACHE_SQLITE_PATH = os.getenv("ENTAILMENT_CACHE_SQLITE_PATH", "/tmp/entailment_cache.sqlite")
+ENTAILMENT_CACHE_SQLITE_MAX_ROWS = int(os.getenv("ENTAILMENT_CACHE_SQLITE_MAX_ROWS", "5000000"))
+
+CACHE_LOOKUPS = Counter(
+    "entailment_cache_lookups_total",
+    "Entailment cache lookups by tier and outcome",
+    ["tier", "result"],
+)
+CACHE_ENTRIES = Gauge(
+    "entailment_cache_entries",
+    "Entries in the in-process entailment cache",
+    multiprocess_mode="livesum",
+)
+
+Prediction = Tuple[str, float]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class RedisTier:
+    name = "redis"
+
+    def __init__(self, url: str = ENTAILMENT_CACHE_REDIS_URL, ttl: int = ENTAILMENT_CACHE_TTL):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get_many(self, keys: List[str]) -> Dict[str, Prediction]:
+        values = self.client.mget([f"entail:{k}" for k in keys])
+        return {k: tuple(json.loads(v)) for k, v in zip(keys, values) if v is not None}
+
+    def set_many(self, items: Dict[str, Prediction]):
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            # TTL bounds the shared tier's size together with Redis' maxmemory policy
+            pipe.setex(f"entail:{key}", self.ttl, json.dumps(value))
+        pipe.execute()
+
+
+class SqliteTier:
+    name = "sqlite"
+
+    def __init__(self, path: str = ENTAILMENT_CACHE_SQLITE_PATH, max_rows: int = ENTAILMENT_CACHE_SQLITE_MAX_ROWS):
+        self.max_rows = max_rows
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entailment (key TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL)"
+        )
+        self.lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Prediction]:
+        found = {}
+        with self.lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, label, score FROM entailment WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update({key: (label, score) for key, label, score in rows})
+        return found
+
+    def set_many(self, items: Dict[str, Prediction]):
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO entailment (key, label, score) VALUES (?, ?, ?)",
+                [(k, label, score) for k, (label, score) in items.items()],
+            )
+            # Evict the oldest rows once the table outgrows its bound
+            self.conn.execute(
+                "DELETE FROM entailment WHERE rowid <= (SELECT MAX(rowid) FROM entailment) - ?",
+                (self.max_rows,),
+            )
+            self.conn.execute("COMMIT")
+
+
+class EntailmentCache:
+    """
+    Content-addressed cache of entailment predictions.
+
+    Keys hash the model version with the normalized premise and hypothesis,
+    so a model change never serves stale labels. Lookups go through an
+    in-process LRU first and then the optional shared tier.
+    """
+
+    def __init__(self, model_version: str, max_entries: int = ENTAILMENT_CACHE_SIZE, shared=None):
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.shared = shared
+        self._lru: "OrderedDict[str, Prediction]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, premise: str, hypothesis: str) -> str:
+        data = "\0".join((self.model_version, normalize(premise), normalize(hypothesis)))
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Prediction]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._lru.get(key)
+                if value is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = value
+        CACHE_LOOKUPS.labels("memory", "hit").inc(len(found))
+        CACHE_LOOKUPS.labels("memory", "miss").inc(len(keys) - len(found))
+        missing = [k for k in keys if k not in found]
+        if missing and self.shared is not None:
+            try:
+                shared = self.shared.get_many(missing)
+            except Exception:
+                shared = {}
+            CACHE_LOOKUPS.labels(self.shared.name, "hit").inc(len(shared))
+            CACHE_LOOKUPS.labels(self.shared.name, "miss").inc(len(missing) - len(shared))
+            self._remember(shared)
+            found.update(shared)
+        return found
+
+    def set_many(self, items: Dict[str, Prediction]):
+        self._remember(items)
+        if items and self.shared is not None:
+            try:
+                self.shared.set_many(items)
+            except Exception:
+                pass
+
+    def _remember(self, items: Dict[str, Prediction]):
+        with self._lock:
+            for key, value in items.items():
+                self._lru[key] = value
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+            CACHE_ENTRIES.set(len(self._lru))
+
+    def predict(self, engine, pairs: Sequence[Tuple[str, str]]) -> List[Prediction]:
+        """Serve cached predictions and run the engine only on unseen (and de-duplicated) pairs."""
+        keys = [self.key(p, h) for p, h in pairs]
+        unique_keys = list(dict.fromkeys(keys))
+        found = self.get_many(unique_keys)
+        pending: Dict[str, Tuple[str, str]] = {}
+        for key, pair in zip(keys, pairs):
+            if key not in found and key not in pending:
+                pending[key] = pair
+        if pending:
+            computed = dict(zip(pending.keys(), engine.predict(list(pending.values()))))
+            self.set_many(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+
+def build_cache(model_version: str, backend: str = ENTAILMENT_CACHE_BACKEND) -> Optional[EntailmentCache]:
+    if backend == "off":
+        return None
+    shared = None
+    if backend == "redis":
+        shared = RedisTier()
+    elif backend == "sqlite":
+        shared = SqliteTier()
+    elif backend != "none":
+        raise ValueError(f"Unknown entailment cache backend: {backend}")
+    return EntailmentCache(model_version, shared=shared)
@@ -0,0 +1,99 @@
+import os
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from prometheus_client import Counter
+
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() in ("1", "true", "yes")
+# Share of a sentence's content words found in a document to accept it as entailed without the model
+PREFILTER_ENTAIL_THRESHOLD = float(os.getenv("PREFILTER_ENTAIL_THRESHOLD", "0.9"))
+# Below this share a document is treated as unrelated to the sentence and never sent to the model
+PREFILTER_SKIP_THRESHOLD = float(os.getenv("PREFILTER_SKIP_THRESHOLD", "0.1"))
+# Candidate documents per sentence that go to the NLI model
+PREFILTER_TOP_K = int(os.getenv("PREFILTER_TOP_K", "3"))
+# Score recorded for lexically accepted pairs. The overlap share is not a model
+# probability and may be below ENTAILMENT_THRESHOLD, which would count the
+# sentence as unsupported; an accepted pair is certain entailment.
+LEXICAL_ENTAILMENT_SCORE = 1.0
+
+_TOKEN = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by for from has have in is it its of on or that the "
+    "this to was were will with which who what when where".split()
+)
+
+PREFILTER_PAIRS = Counter(
+    "hallucination_prefilter_pairs_total",
+    "Sentence/document pairs by how the two-stage check resolved them",
+    ["stage"],
+)
+
+Pair = Tuple[str, str]
+Prediction = Tuple[str, float]
+
+
+def content_tokens(text: str) -> set:
+    return {t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS}
+
+
+def overlap_scores(sentences: Sequence[str], docs: Sequence[str]) -> np.ndarray:
+    """
+    [sentences x docs] matrix of the share of each sentence's content tokens
+    that appear in each document, computed as one binary matrix product.
+    """
+    sentence_tokens = [content_tokens(s) for s in sentences]
+    vocab = {t: i for i, t in enumerate(set().union(*sentence_tokens))} if sentence_tokens else {}
+    if not vocab or not docs:
+        return np.zeros((len(sentences), len(docs)), dtype=np.float32)
+    s_matrix = np.zeros((len(sentences), len(vocab)), dtype=np.float32)
+    for i, tokens in enumerate(sentence_tokens):
+        s_matrix[i, [vocab[t] for t in tokens]] = 1.0
+    d_matrix = np.zeros((len(docs), len(vocab)), dtype=np.float32)
+    for j, doc in enumerate(docs):
+        idx = [vocab[t] for t in content_tokens(doc) if t in vocab]
+        d_matrix[j, idx] = 1.0
+    lengths = np.maximum(s_matrix.sum(axis=1, keepdims=True), 1.0)
+    return (s_matrix @ d_matrix.T) / lengths
+
+
+def stage_pairs(
+    sentences: Sequence[str],
+    docs: Sequence[str],
+    top_k: int = PREFILTER_TOP_K,
+    entail_threshold: float = PREFILTER_ENTAIL_THRESHOLD,
+    skip_threshold: float = PREFILTER_SKIP_THRESHOLD,
+) -> Tuple[List[Pair], Dict[Pair, Prediction], Dict[str, int]]:
+    """
+    First stage of the hallucination check.
+
+    Returns the (document, sentence) pairs that still need the NLI model,
+    the pairs decided lexically (near-verbatim support) with their
+    predictions (ENTAILMENT with LEXICAL_ENTAILMENT_SCORE), and counts of
+    how the full pair grid was resolved.
+    """
+    scores = overlap_scores(sentences, docs)
+    model_pairs: List[Pair] = []
+    lexical: Dict[Pair, Prediction] = {}
+    for i, sent in enumerate(sentences):
+        if not len(docs):
+            break
+        ranked = np.argsort(-scores[i])
+        best = ranked[0]
+        if scores[i, best] >= entail_threshold:
+            lexical[(docs[best], sent)] = ("ENTAILMENT", LEXICAL_ENTAILMENT_SCORE)
+            continue
+        for j in ranked[:top_k]:
+            if scores[i, j] >= skip_threshold:
+                model_pairs.append((docs[j], sent))
+    total = len(sentences) * len(docs)
+    stats = {
+        "total_pairs": total,
+        "model_pairs": len(model_pairs),
+        "lexical_pairs": len(lexical),
+        "avoided_model_calls": total - len(model_pairs),
+    }
+    PREFILTER_PAIRS.labels("model").inc(len(model_pairs))
+    PREFILTER_PAIRS.labels("lexical").inc(len(lexical))
+    PREFILTER_PAIRS.labels("skipped").inc(total - len(model_pairs) - len(lexical))
+    return model_pairs, lexical, stats
@@ -0,0 +1,64 @@
+import base64
+import json
+import logging
+import time
+from typing import List, Optional
+
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+
+def _enqueued_at(raw: bytes) -> Optional[float]:
+    """The enqueued_at kwarg of a raw kombu/Redis task message, if it has one."""
+    try:
+        message = json.loads(raw)
+        body = message["body"]
+        if message.get("properties", {}).get("body_encoding") == "base64":
+            body = base64.b64decode(body)
+        _, kwargs, _ = json.loads(body)
+        return kwargs.get("enqueued_at")
+    except Exception:
+        return None
+
+
+class QueueDepthCollector:
+    """
+    Report the backlog of the hallucination check queues on every scrape.
+
+    Reads the broker directly (LLEN, and the oldest message with LINDEX), so
+    the numbers are current without a polling task. Messages a worker has
+    already prefetched are not counted.
+    """
+
+    def __init__(self, broker_url: str, queues: List[str]):
+        import redis
+        self.client = redis.Redis.from_url(broker_url, socket_timeout=2, socket_connect_timeout=2)
+        self.queues = queues
+
+    def collect(self):
+        depth = GaugeMetricFamily(
+            "hallucination_queue_depth", "Check tasks waiting in the broker", labels=["queue"]
+        )
+        oldest = GaugeMetricFamily(
+            "hallucination_queue_oldest_age_seconds",
+            "Age of the oldest waiting check task (0 when the queue is empty)",
+            labels=["queue"],
+        )
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                for queue in self.queues:
+                    pipe.llen(queue)
+                    pipe.lindex(queue, -1)  # kombu pushes on the left and pops on the right
+                replies = pipe.execute()
+        except Exception:
+            logger.warning("Could not read queue depth from the broker", exc_info=True)
+            return
+        now = time.time()
+        for i, queue in enumerate(self.queues):
+            length, head = replies[2 * i], replies[2 * i + 1]
+            enqueued_at = _enqueued_at(head) if head is not None else None
+            depth.add_metric([queue], length)
+            oldest.add_metric([queue], max(0.0, now - enqueued_at) if enqueued_at else 0.0)
+        yield depth
+        yield oldest
@@ -1,17 +1,38 @@
 import os
+import time
 from celery import Celery
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from celery.schedules import crontab
+from celery.signals import task_postrun, task_prerun, worker_init, worker_process_init, worker_process_shutdown
+from datetime import date, datetime, timedelta, timezone
+import threading
+from kombu import Queue
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, start_http_server
+from prometheus_client import multiprocess
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import selectinload, sessionmaker
+from celery_batches import Batches
 from api.app.models import tracing
 from api.app.core.database import Base
+from api.app.core.segmenter import segment
+from api.app.core.tasks import HALLUCINATION_QUEUES, enqueue_checks
+from api.app.services.checks import HALLUCINATION_AUTO_CHECK, missing_checks
+from api.app.services.export import export_traces
+from api.app.services.partitions import maintain_partitions
+from api.app.services.rollups import refresh_rollups
 from minio import Minio
-from transformers import pipeline
+from entailment_cache import build_cache
+from prefilter import PREFILTER_ENABLED, stage_pairs
+from queue_metrics import QueueDepthCollector
+import logging
 
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+psycopg2://postgres:postgres@db:5432/rag_tracer")
 MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio:9000")
 MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
 MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY", "minioadmin")
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9100"))
+
+logger = logging.getLogger(__name__)
 
 celery_app = Celery('worker', broker=CELERY_BROKER_URL)
 engine = create_engine(DATABASE_URL)
@@ -23,48 +44,334 @@ minio_client = Minio(
     secure=False
 )
 
-# Load entailment pipeline (RoBERTa-MNLI)
-entailment_pipe = pipeline("text-classification", model="roberta-large-mnli")
+# Micro-batching of check_hallucination_batch: flush after N ids or T milliseconds
+HALLUCINATION_BATCH_SIZE = int(os.getenv("HALLUCINATION_BATCH_SIZE", "32"))
+HALLUCINATION_BATCH_INTERVAL_MS = int(os.getenv("HALLUCINATION_BATCH_INTERVAL_MS", "200"))
+# celery-batches can only fill a batch with messages the worker has prefetched
+celery_app.conf.worker_prefetch_multiplier = int(
+    os.getenv("CELERY_PREFETCH_MULTIPLIER", str(max(4, HALLUCINATION_BATCH_SIZE)))
+)
+
+# Ingest publishes checks to one queue per priority. The worker consumes them in
+# declaration order: with the "priority" strategy Redis is polled high queue
+# first instead of round-robin, so low-priority checks wait for idle capacity.
+# Run dedicated workers with -Q to size pools per queue.
+celery_app.conf.task_queues = [Queue(name) for name in HALLUCINATION_QUEUES.values()] + [Queue("celery")]
+celery_app.conf.broker_transport_options = {"queue_order_strategy": "priority"}
+
+# How often celery beat folds new telemetry/checks into the /stats rollup tables
+ROLLUP_INTERVAL_SECONDS = float(os.getenv("ROLLUP_INTERVAL_SECONDS", "30"))
+# ...and how often it creates upcoming trace table partitions and drops expired ones
+PARTITION_MAINTENANCE_SECONDS = float(os.getenv("PARTITION_MAINTENANCE_SECONDS", "3600"))
+# ...and how often it re-enqueues responses whose check was never published
+HALLUCINATION_SWEEP_SECONDS = float(os.getenv("HALLUCINATION_SWEEP_SECONDS", "300"))
+celery_app.conf.beat_schedule = {
+    "refresh-stats-rollups": {
+        "task": "worker.refresh_stats_rollups",
+        "schedule": ROLLUP_INTERVAL_SECONDS,
+    },
+    "maintain-trace-partitions": {
+        "task": "worker.maintain_trace_partitions",
+        "schedule": PARTITION_MAINTENANCE_SECONDS,
+    },
+}
+if HALLUCINATION_AUTO_CHECK:
+    celery_app.conf.beat_schedule["enqueue-missing-checks"] = {
+        "task": "worker.enqueue_missing_checks",
+        "schedule": HALLUCINATION_SWEEP_SECONDS,
+    }
+# Nightly Parquet export of the previous UTC day to MinIO
+if os.getenv("EXPORT_DAILY", "false").lower() in ("1", "true", "yes"):
+    celery_app.conf.beat_schedule["export-traces-parquet"] = {
+        "task": "worker.export_traces_parquet",
+        "schedule": crontab(hour=0, minute=30),
+    }
+
+
+# Minimum entailment probability for a sentence to count as supported
+ENTAILMENT_THRESHOLD = float(os.getenv("ENTAILMENT_THRESHOLD", "0.7"))
+
+# Advisory lock namespace for check writes ("HC"), keyed by response id
+CHECK_LOCK_CLASS = 0x4843
+
+CHECK_QUEUE_LAG = Histogram(
+    "hallucination_check_queue_lag_seconds",
+    "Time from enqueue at ingest to the start of the check, by priority",
+    ["priority"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+CHECK_INFERENCE_DURATION = Histogram(
+    "hallucination_check_inference_seconds",
+    "Entailment time per check job (cache lookups and model passes)",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+CHECK_JOB_PAIRS = Histogram(
+    "hallucination_check_model_pairs",
+    "Pairs sent to predict_pairs per check job, after the pre-filter",
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+)
+CHECK_JOB_RESPONSES = Histogram(
+    "hallucination_check_responses",
+    "Responses checked per job (micro-batch size)",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Run time of each Celery task, by task name and final state",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900),
+)
+PRECHECK_SENTENCES = Counter(
+    "hallucination_precheck_sentences_total",
+    "Streamed response sentences scored before their trace was stored",
+)
+
+# Batched entailment engine (RoBERTa-MNLI) and its result cache. Loaded lazily,
+# once per worker process, so importing this module (and torch) stays cheap.
+_entailment_engine = None
+_entailment_cache = None
+_entailment_lock = threading.Lock()
+
+def get_entailment_engine():
+    global _entailment_engine, _entailment_cache
+    if _entailment_engine is None:
+        with _entailment_lock:
+            if _entailment_engine is None:
+                from entailment import EntailmentEngine
+                engine = EntailmentEngine()
+                _entailment_cache = build_cache(engine.version)
+                _entailment_engine = engine
+    return _entailment_engine
+
+@worker_process_init.connect
+def load_entailment_model(**kwargs):
+    # Runs in each prefork child after the fork, so the parent never holds the weights
+    from entailment import ENTAILMENT_WARMUP
+    engine = get_entailment_engine()
+    if ENTAILMENT_WARMUP:
+        engine.warm_up()
+
+@worker_init.connect
+def start_metrics_server(**kwargs):
+    # Prefork children write to PROMETHEUS_MULTIPROC_DIR; the parent serves the aggregate
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    # Queue depth is read from the broker at scrape time, in this process only
+    registry.register(QueueDepthCollector(CELERY_BROKER_URL, list(HALLUCINATION_QUEUES.values())))
+    start_http_server(WORKER_METRICS_PORT, registry=registry)
+
+@worker_process_shutdown.connect
+def remove_process_metrics(**kwargs):
+    # Live gauges of an exited child must not stay in the multiprocess aggregate
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+# Per-process start times of running tasks, keyed by task id
+_task_started = {}
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+@task_postrun.connect
+def observe_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+def predict_pairs(pairs):
+    engine = get_entailment_engine()
+    if _entailment_cache is None:
+        return engine.predict(pairs)
+    return _entailment_cache.predict(engine, pairs)
+
+def build_pairs(sentences, docs):
+    # NLI premise is the retrieved document, hypothesis is the response sentence
+    return [(doc, sent) for sent in sentences for doc in docs]
+
+def summarize_entailment(sentences, pairs, predictions):
+    """Turn pair predictions into groundedness, unsupported sentences and per-pair results."""
+    supported = set()
+    entailment_results = []
+    for (doc, sent), (label, score) in zip(pairs, predictions):
+        entailment_results.append({"sentence": sent, "doc": doc, "label": label, "score": score})
+        if label == "ENTAILMENT" and score > ENTAILMENT_THRESHOLD:
+            supported.add(sent)
+    groundedness = sum(1 for s in sentences if s in supported) / max(1, len(sentences))
+    unsupported_sentences = [s for s in sentences if s not in supported]
+    return groundedness, unsupported_sentences, entailment_results
+
+def existing_checks(db, response_ids):
+    """{response_id: groundedness} of the latest stored check of each response that has one."""
+    rows = (
+        db.query(tracing.HallucinationCheck.response_id, tracing.HallucinationCheck.groundedness_score)
+        .filter(tracing.HallucinationCheck.response_id.in_(response_ids))
+        .order_by(tracing.HallucinationCheck.checked_at)
+        .all()
+    )
+    return dict(rows)
+
+def run_checks(response_ids):
+    """
+    Check a set of responses as one job: one query for the responses and their
+    retrievals, one batched inference pass over every pair that survives the
+    lexical pre-filter, one commit.
+
+    Idempotent: responses that already have a check are skipped, and the
+    writes take a per-response advisory lock and re-check, so a retried or
+    re-enqueued task never adds a second HallucinationCheck row.
+    Returns {response_id: groundedness}.
+    """
+    db = SessionLocal()
+    try:
+        results = existing_checks(db, set(response_ids))
+        pending = set(response_ids) - set(results)
+        if not pending:
+            return results
+        responses = (
+            db.query(tracing.Response)
+            .options(selectinload(tracing.Response.prompt).selectinload(tracing.Prompt.retrievals))
+            .filter(tracing.Response.id.in_(pending))
+            .all()
+        )
+        jobs = []
+        model_pairs = []
+        for response in responses:
+            retrieved_texts = [r.meta_data.get("text", "") for r in response.prompt.retrievals if r.meta_data]
+            sentences = segment(response.text)
+            if PREFILTER_ENABLED:
+                # Stage one: settle near-verbatim and unrelated pairs lexically
+                pairs, lexical, stats = stage_pairs(sentences, retrieved_texts)
+                logger.info("Response %s: %d of %d pairs need the model", response.id, stats["model_pairs"], stats["total_pairs"])
+            else:
+                pairs, lexical = build_pairs(sentences, retrieved_texts), {}
+            jobs.append((response, sentences, lexical, len(model_pairs), len(pairs)))
+            model_pairs.extend(pairs)
+        # Score the remaining pairs of every response in batched forward passes
+        started = time.perf_counter()
+        predictions = predict_pairs(model_pairs)
+        CHECK_INFERENCE_DURATION.observe(time.perf_counter() - started)
+        CHECK_JOB_PAIRS.observe(len(model_pairs))
+        CHECK_JOB_RESPONSES.observe(len(jobs))
+
+        # Lock in id order so concurrent batches cannot deadlock, then drop
+        # responses another worker checked in the meantime
+        checked_ids = sorted(response.id for response, *_ in jobs)
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:cls, id) FROM (SELECT unnest(CAST(:ids AS int[])) AS id ORDER BY 1) AS locked"),
+            {"cls": CHECK_LOCK_CLASS, "ids": checked_ids},
+        )
+        concurrent = existing_checks(db, checked_ids)
+        results.update(concurrent)
+        for response, sentences, lexical, offset, count in jobs:
+            if response.id in concurrent:
+                continue
+            pairs = list(lexical) + model_pairs[offset:offset + count]
+            pair_predictions = list(lexical.values()) + predictions[offset:offset + count]
+            groundedness, unsupported_sentences, entailment_results = summarize_entailment(
+                sentences, pairs, pair_predictions
+            )
+            db.add(tracing.HallucinationCheck(
+                response_id=response.id,
+                groundedness_score=groundedness,
+                unsupported_sentences=unsupported_sentences,
+                entailment_results=entailment_results
+            ))
+            results[response.id] = groundedness
+        db.commit()
+        return results
+    finally:
+        db.close()
+
+def observe_queue_lag(enqueued_at, priority):
+    if enqueued_at is not None:
+        CHECK_QUEUE_LAG.labels(priority or "default").observe(max(0.0, time.time() - enqueued_at))
 
 @celery_app.task
-def check_hallucination(response_id: int):
+def check_hallucination(response_id: int, enqueued_at: float = None, priority: str = None):
+    observe_queue_lag(enqueued_at, priority)
+    return run_checks([response_id]).get(response_id)
+
+@celery_app.task(
+    base=Batches,
+    flush_every=HALLUCINATION_BATCH_SIZE,
+    flush_interval=HALLUCINATION_BATCH_INTERVAL_MS / 1000.0,
+)
+def check_hallucination_batch(requests):
+    """
+    Micro-batched variant of check_hallucination. Enqueue it the same way
+    (check_hallucination_batch.delay(response_id)); the worker accumulates ids
+    until HALLUCINATION_BATCH_SIZE arrive or HALLUCINATION_BATCH_INTERVAL_MS
+    passes, then checks them together. Ingest publishes it automatically
+    (app.core.tasks.enqueue_checks).
+    """
+    response_ids = []
+    for request in requests:
+        response_ids.append(request.args[0] if request.args else request.kwargs["response_id"])
+        observe_queue_lag(request.kwargs.get("enqueued_at"), request.kwargs.get("priority"))
+    return run_checks(response_ids)
+
+@celery_app.task(name="worker.precheck_sentences", ignore_result=True)
+def precheck_sentences(sentences, docs):
+    """
+    Score the pairs of sentences completed while a response is still streaming
+    (see /ws/stream) into the entailment cache. Pairs depend only on their own
+    sentence, so the check that runs once the trace is stored finds the same
+    pairs already cached. Needs a shared cache tier (ENTAILMENT_CACHE_BACKEND)
+    to help when the check lands on another worker process.
+    """
+    get_entailment_engine()
+    if _entailment_cache is None:
+        return 0
+    if PREFILTER_ENABLED:
+        pairs, _, _ = stage_pairs(sentences, docs)
+    else:
+        pairs = build_pairs(sentences, docs)
+    predict_pairs(pairs)
+    PRECHECK_SENTENCES.inc(len(sentences))
+    return len(pairs)
+
+@celery_app.task(name="worker.enqueue_missing_checks", ignore_result=True)
+def enqueue_missing_checks():
+    """Publish checks for recent responses that still have none (lost or failed enqueues)."""
     db = SessionLocal()
-    response = db.query(tracing.Response).filter(tracing.Response.id == response_id).first()
-    if not response:
+    try:
+        response_ids = missing_checks(db)
+    finally:
+        db.close()
+    sent = enqueue_checks([(response_id, "default") for response_id in response_ids])
+    if sent:
+        logger.info("Re-enqueued %d hallucination checks", sent)
+    return sent
+
+@celery_app.task(name="worker.refresh_stats_rollups", ignore_result=True)
+def refresh_stats_rollups():
+    db = SessionLocal()
+    try:
+        return refresh_rollups(db)
+    finally:
+        db.close()
+
+@celery_app.task(name="worker.maintain_trace_partitions", ignore_result=True)
+def maintain_trace_partitions():
+    db = SessionLocal()
+    try:
+        result = maintain_partitions(db)
+        if result["created"] or result["dropped"]:
+            logger.info("Partitions created: %s, dropped: %s", result["created"], result["dropped"])
+        return result
+    finally:
+        db.close()
+
+@celery_app.task(name="worker.export_traces_parquet")
+def export_traces_parquet(start: str = None, end: str = None):
+    """Export traces of the UTC days in [start, end) to Parquet; defaults to yesterday."""
+    first = date.fromisoformat(start) if start else datetime.now(timezone.utc).date() - timedelta(days=1)
+    db = SessionLocal()
+    try:
+        return export_traces(db, first, date.fromisoformat(end) if end else None)
+    finally:
         db.close()
-        return
-    # Retrieve associated prompt and retrievals
-    prompt = response.prompt
-    retrievals = db.query(tracing.Retrieval).filter(tracing.Retrieval.prompt_id == prompt.id).all()
-    retrieved_texts = [r.metadata.get("text", "") for r in retrievals if r.metadata]
-    # Split response into sentences
-    sentences = response.text.split('.')
-    supported = 0
-    entailment_results = []
-    for sent in sentences:
-        sent = sent.strip()
-        if not sent:
-            continue
-        # Check entailment against all retrieved docs
-        is_supported = False
-        for doc in retrieved_texts:
-            result = entailment_pipe(f"{sent} </s></s> {doc}")[0]
-            entailment_results.append({"sentence": sent, "doc": doc, "label": result["label"], "score": result["score"]})
-            if result["label"] == "ENTAILMENT" and result["score"] > 0.7:
-                is_supported = True
-                break
-        if is_supported:
-            supported += 1
-    groundedness = supported / max(1, len(sentences))
-    unsupported_sentences = [e["sentence"] for e in entailment_results if e["label"] != "ENTAILMENT"]
-    # Store hallucination check
-    hallucination = tracing.HallucinationCheck(
-        response_id=response.id,
-        groundedness_score=groundedness,
-        unsupported_sentences=unsupported_sentences,
-        entailment_results=entailment_results
-    )
-    db.add(hallucination)
-    db.commit()
-    db.close()
-    return groundedness